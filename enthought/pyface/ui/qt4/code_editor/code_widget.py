@@ -10,8 +10,11 @@
 #------------------------------------------------------------------------------
 
 # Standard library imports
+from bisect import bisect_left, bisect_right
 import math
+import re
 import sys
+import threading
 
 # System library imports
 from enthought.qt import QtCore, QtGui
@@ -19,6 +22,7 @@ from enthought.qt import QtCore, QtGui
 # Local imports
 from find_widget import FindWidget
 from gutters import LineNumberWidget, StatusGutterWidget
+from mapped_file import MappedFile
 from replace_widget import ReplaceWidget
 from pygments_highlighter import PygmentsHighlighter
 
@@ -32,13 +36,31 @@ class CodeWidget(QtGui.QPlainTextEdit):
     ###########################################################################
 
     def __init__(self, parent, should_highlight_current_line=True, font=None,
-                 lexer=None):
+                 lexer=None, background_lexing=False):
         super(CodeWidget, self).__init__(parent)
 
-        self.highlighter = PygmentsHighlighter(self.document(), lexer)
+        # With background lexing, large changes (such as loading a file) are
+        # lexed on a worker thread and highlighted visible blocks first.
+        self.highlighter = PygmentsHighlighter(self.document(), lexer,
+                                               background=background_lexing)
         self.line_number_widget = LineNumberWidget(self)
         self.status_widget = StatusGutterWidget(self)
 
+        # The file being shown by 'view_file' (or None), the number of its
+        # first line in the document, and the scroll bar used to move through
+        # it.
+        self.mapped_file = None
+        self.line_offset = 0
+        self.file_scroll_bar = QtGui.QScrollBar(QtCore.Qt.Vertical, self)
+        self.file_scroll_bar.hide()
+        self.file_scroll_bar.valueChanged.connect(self._show_file_lines)
+
+        # The anchor and position of the cursor in the viewed file, as (line,
+        # column) pairs, which are kept when the lines in the document change.
+        self._file_cursor = None
+        self._showing_file_lines = False
+        self.cursorPositionChanged.connect(self._file_cursor_moved)
+
         if font is None:
             # Set a decent fixed width font for this platform.
             font = QtGui.QFont()
@@ -60,6 +82,14 @@ class CodeWidget(QtGui.QPlainTextEdit):
         # What that highlight color should be.
         self.line_highlight_color = QtGui.QColor(QtCore.Qt.yellow).lighter(160)
 
+        # The start and end positions of the matches to mark, and the color to
+        # mark them with. The matches from the index in 'match_shift' on are
+        # all stored the delta in 'match_shift' before their true positions.
+        self.match_starts = []
+        self.match_ends = []
+        self.match_shift = (0, 0)
+        self.match_color = QtGui.QColor(100, 150, 255).lighter(140)
+
         # Auto-indentation behavior
         self.auto_indent = True
         self.smart_backspace = True
@@ -91,8 +121,54 @@ class CodeWidget(QtGui.QPlainTextEdit):
     def lines(self):
         """ Return the number of lines.
         """
+        if self.mapped_file is not None:
+            return self.mapped_file.line_count
         return self.blockCount()
 
+    def view_file(self, path, encoding='utf-8'):
+        """ Show a (possibly very large) file read-only.
+
+        The file is memory-mapped and indexed by line in the background, and
+        only the lines in view are put into the document.
+        """
+        self.close_file()
+        self.mapped_file = MappedFile(path, encoding)
+        self.mapped_file.lines_indexed.connect(self._file_lines_indexed)
+        self._file_cursor = ((0, 0), (0, 0))
+        self.setReadOnly(True)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.file_scroll_bar.setValue(0)
+        self.file_scroll_bar.show()
+        self.mapped_file.start_indexing()
+        self.update_line_number_width()
+        self._place_file_scroll_bar()
+
+    def close_file(self):
+        """ Stop showing the file shown by 'view_file'.
+        """
+        if self.mapped_file is None:
+            return
+
+        self.mapped_file.lines_indexed.disconnect(self._file_lines_indexed)
+        self.mapped_file.close()
+        self.mapped_file = None
+        self.line_offset = 0
+        self._file_cursor = None
+        self.file_scroll_bar.hide()
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
+        self.setReadOnly(False)
+        self.setPlainText('')
+        self.update_line_number_width()
+
+    def show_file_line(self, line):
+        """ Make sure that a (0-indexed) line of the file being viewed is in
+        the document, returning its block.
+        """
+        window = self._file_window_size()
+        if not (self.line_offset <= line < self.line_offset + window - 1):
+            self.file_scroll_bar.setValue(max(0, line - window // 2))
+        return self.document().findBlockByNumber(line - self.line_offset)
+
     def set_line_column(self, line, column):
         """ Move the cursor to a particular line/column number.
 
@@ -106,6 +182,9 @@ class CodeWidget(QtGui.QPlainTextEdit):
             column = col0
         line -= 1
         column -= 1
+        if self.mapped_file is not None:
+            self.show_file_line(line)
+            line -= self.line_offset
         block = self.document().findBlockByLineNumber(line)
         line_start = block.position()
         position = line_start + column
@@ -120,7 +199,7 @@ class CodeWidget(QtGui.QPlainTextEdit):
         """
         cursor = self.textCursor()
         pos = cursor.position()
-        line = cursor.blockNumber() + 1
+        line = cursor.blockNumber() + self.line_offset + 1
         line_start = cursor.block().position()
         column = pos - line_start + 1
         return line, column
@@ -143,7 +222,10 @@ class CodeWidget(QtGui.QPlainTextEdit):
         left = 0
         if not self.line_number_widget.isHidden():
             left = self.line_number_widget.digits_width()
-        self.setViewportMargins(left, 0, 0, 0)
+        right = 0
+        if self.mapped_file is not None:
+            right = self.file_scroll_bar.sizeHint().width()
+        self.setViewportMargins(left, 0, right, 0)
 
     def update_line_numbers(self, rect, dy):
         """ Update the line numbers.
@@ -154,6 +236,24 @@ class CodeWidget(QtGui.QPlainTextEdit):
             0, rect.y(), self.line_number_widget.width(), rect.height())
         if rect.contains(self.viewport().rect()):
             self.update_line_number_width()
+        if dy or rect.contains(self.viewport().rect()):
+            self.update_visible_blocks()
+            if dy and self.match_starts:
+                self.update_extra_selections()
+
+    def update_visible_blocks(self):
+        """ Tell the highlighter which blocks are visible.
+        """
+        block = self.firstVisibleBlock()
+        first = last = block.blockNumber()
+        top = self.blockBoundingGeometry(block).translated(
+            self.contentOffset()).top()
+        bottom = self.viewport().rect().bottom()
+        while block.isValid() and top <= bottom:
+            last = block.blockNumber()
+            top += self.blockBoundingRect(block).height()
+            block = block.next()
+        self.highlighter.set_visible_blocks(first, last)
 
     def set_info_lines(self, info_lines):
         self.status_widget.info_lines = info_lines
@@ -167,9 +267,40 @@ class CodeWidget(QtGui.QPlainTextEdit):
         self.status_widget.error_lines = error_lines
         self.status_widget.update()
 
+    def set_match_lines(self, match_lines):
+        if self.line_offset:
+            match_lines = [line + self.line_offset for line in match_lines]
+        self.status_widget.match_lines = match_lines
+        self.status_widget.update()
+
+    def change_match_lines(self, removed, added):
+        """ Replace some of the lines with matches with others.
+        """
+        if self.line_offset:
+            removed = [line + self.line_offset for line in removed]
+            added = [line + self.line_offset for line in added]
+        self.status_widget.change_lines('match', removed, added)
+        self.status_widget.update()
+
+    def set_matches(self, starts, ends, shift=(0, 0)):
+        """ Set the (sorted) start and end positions of the matches to mark.
+            The positions from the index in 'shift' on are all the delta in
+            'shift' before their true positions.
+        """
+        self.match_starts = starts
+        self.match_ends = ends
+        self.match_shift = shift
+        self.update_extra_selections()
+
     def highlight_current_line(self):
         """ Highlight the line with the cursor.
         """
+        self.update_extra_selections()
+
+    def update_extra_selections(self):
+        """ Update the current line highlight and the marked matches in view.
+        """
+        selections = []
         if self.should_highlight_current_line:
             selection = QtGui.QTextEdit.ExtraSelection()
             selection.format.setBackground(self.line_highlight_color)
@@ -177,7 +308,31 @@ class CodeWidget(QtGui.QPlainTextEdit):
                 QtGui.QTextFormat.FullWidthSelection, True)
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
-            self.setExtraSelections([selection])
+            selections.append(selection)
+
+        if self.match_starts:
+            # Only mark the matches that can be seen.
+            first = self.firstVisibleBlock().position()
+            viewport = self.viewport().rect()
+            last = self.cursorForPosition(viewport.bottomRight()).block()
+            last = last.position() + last.length()
+            document = self.document()
+            shift_index, delta = self.match_shift
+            index = max(shifted_bisect(bisect_right, self.match_ends, first,
+                                       shift_index, delta) - 1, 0)
+            end = shifted_bisect(bisect_left, self.match_starts, last,
+                                 shift_index, delta)
+            for index in xrange(index, end):
+                offset = delta if index >= shift_index else 0
+                selection = QtGui.QTextEdit.ExtraSelection()
+                selection.format.setBackground(self.match_color)
+                selection.cursor = QtGui.QTextCursor(document)
+                selection.cursor.setPosition(self.match_starts[index] + offset)
+                selection.cursor.setPosition(self.match_ends[index] + offset,
+                                             QtGui.QTextCursor.KeepAnchor)
+                selections.append(selection)
+
+        self.setExtraSelections(selections)
 
     def autoindent_newline(self):
         tab = '\t'
@@ -373,6 +528,10 @@ class CodeWidget(QtGui.QPlainTextEdit):
 
         self.keyPressEvent_action(event) # FIXME: see above
 
+        if self.mapped_file is not None and self._scroll_file(event):
+            event.accept()
+            return
+
         # If the cursor is in the middle of the first line, pressing the "up"
         # key causes the cursor to go to the start of the first line, i.e. the
         # beginning of the document. Likewise, if the cursor is somewhere in the
@@ -425,6 +584,18 @@ class CodeWidget(QtGui.QPlainTextEdit):
             contents.top(), self.status_widget.sizeHint().width(),
             contents.height()))
 
+        if self.mapped_file is not None:
+            self._place_file_scroll_bar()
+
+    def wheelEvent(self, event):
+        if self.mapped_file is not None:
+            lines = int(-event.delta() / 120.0 *
+                        QtGui.QApplication.wheelScrollLines())
+            self.file_scroll_bar.setValue(self.file_scroll_bar.value() + lines)
+            event.accept()
+        else:
+            super(CodeWidget, self).wheelEvent(event)
+
     def sizeHint(self):
         # Suggest a size that is 80 characters wide and 40 lines tall.
         style = self.style()
@@ -441,6 +612,153 @@ class CodeWidget(QtGui.QPlainTextEdit):
     # Private methods
     ###########################################################################
 
+    def _file_window_size(self):
+        """ The number of lines of the viewed file to put in the document.
+        """
+        font_metrics = QtGui.QFontMetrics(self.document().defaultFont())
+        return self.viewport().height() // font_metrics.lineSpacing() + 1
+
+    def _place_file_scroll_bar(self):
+        """ Position the scroll bar for the viewed file and fill the view.
+        """
+        contents = self.contentsRect()
+        width = self.file_scroll_bar.sizeHint().width()
+        self.file_scroll_bar.setGeometry(QtCore.QRect(
+            contents.right() - width + 1, contents.top(), width,
+            contents.height()))
+        self._update_file_scroll_bar()
+        self._show_file_lines(self.file_scroll_bar.value())
+
+    def _update_file_scroll_bar(self):
+        window = self._file_window_size()
+        self.file_scroll_bar.setPageStep(window)
+        self.file_scroll_bar.setRange(
+            0, max(0, self.mapped_file.line_count - window + 1))
+
+    def _show_file_lines(self, first):
+        """ Put the lines of the viewed file from 'first' into the document.
+        """
+        if self.mapped_file is None:
+            return
+        lines = self.mapped_file.lines(first, self._file_window_size())
+        self._showing_file_lines = True
+        try:
+            self.line_offset = first
+            self.setPlainText(u'\n'.join(lines))
+            self._restore_file_cursor()
+        finally:
+            self._showing_file_lines = False
+        self.line_number_widget.update()
+
+    def _file_position(self, position):
+        """ Returns the (line, column) in the viewed file of a position in the
+        document.
+        """
+        block = self.document().findBlock(position)
+        return (block.blockNumber() + self.line_offset,
+                position - block.position())
+
+    def _document_position(self, line, column):
+        """ Returns the position in the document of a (line, column) in the
+        viewed file, moved to the nearest end of the document if the line is
+        not in it.
+        """
+        document = self.document()
+        line -= self.line_offset
+        if line < 0:
+            return 0
+        if line >= document.blockCount():
+            return document.characterCount() - 1
+        block = document.findBlockByNumber(line)
+        return block.position() + min(column, block.length() - 1)
+
+    def _restore_file_cursor(self):
+        """ Show the saved cursor of the viewed file in the document.
+        """
+        if self._file_cursor is None:
+            return
+        anchor, position = self._file_cursor
+        cursor = self.textCursor()
+        cursor.setPosition(self._document_position(*anchor))
+        cursor.setPosition(self._document_position(*position),
+                           QtGui.QTextCursor.KeepAnchor)
+        self.setTextCursor(cursor)
+
+    def _file_cursor_moved(self):
+        """ Save the position in the viewed file of a cursor moved by the
+        user.
+        """
+        if self.mapped_file is None or self._showing_file_lines:
+            return
+        cursor = self.textCursor()
+        self._file_cursor = (self._file_position(cursor.anchor()),
+                             self._file_position(cursor.position()))
+
+    def _file_lines_indexed(self, count):
+        """ Handle more of the viewed file being indexed.
+        """
+        if self.mapped_file is None:
+            return
+        self._update_file_scroll_bar()
+        self.update_line_number_width()
+        self.status_widget.update()
+        if self.line_offset + self.blockCount() < min(
+                count, self.line_offset + self._file_window_size()):
+            # Fill in the lines that were not available before.
+            self._show_file_lines(self.line_offset)
+
+    def _scroll_file(self, event):
+        """ Move the cursor through the viewed file for the vertical
+        navigation keys, scrolling the lines in the document if it would
+        leave them. Returns whether the key was handled.
+        """
+        keys = QtGui.QKeySequence
+        page = self.file_scroll_bar.pageStep()
+        end = self.mapped_file.line_count
+        actions = [
+            (keys.MoveToPreviousLine, -1, False),
+            (keys.SelectPreviousLine, -1, True),
+            (keys.MoveToNextLine, 1, False),
+            (keys.SelectNextLine, 1, True),
+            (keys.MoveToPreviousPage, -page, False),
+            (keys.SelectPreviousPage, -page, True),
+            (keys.MoveToNextPage, page, False),
+            (keys.SelectNextPage, page, True),
+            (keys.MoveToStartOfDocument, -end, False),
+            (keys.SelectStartOfDocument, -end, True),
+            (keys.MoveToEndOfDocument, end, False),
+            (keys.SelectEndOfDocument, end, True) ]
+        for key, delta, select in actions:
+            if event.matches(key):
+                break
+        else:
+            return False
+
+        anchor, (line, column) = self._file_cursor
+        target = max(0, min(line + delta, end - 1))
+        first = self.line_offset
+        window = max(1, self._file_window_size() - 1)
+        if abs(delta) == 1 and first <= target < first + window:
+            # The cursor stays in the document, so move it as usual.
+            return False
+
+        # Scroll by pages along with the cursor, otherwise just far enough to
+        # show the line that the cursor moves to.
+        if abs(delta) > 1:
+            first += delta
+        first = max(target - window + 1, min(first, target))
+        self.file_scroll_bar.setValue(first)
+
+        if not select:
+            anchor = (target, column)
+        self._file_cursor = (anchor, (target, column))
+        self._showing_file_lines = True
+        try:
+            self._restore_file_cursor()
+        finally:
+            self._showing_file_lines = False
+        return True
+
     def _get_indent_position(self, line):
         trimmed = line.rstrip()
         if len(trimmed) != 0:
@@ -499,19 +817,122 @@ class CodeWidget(QtGui.QPlainTextEdit):
             return column == self._get_indent_position(cursor.block().text())
 
 
+def shifted_bisect(bisect, values, value, index, delta):
+    """ Uses a bisect function to find where a value goes in a sorted list
+        whose items from 'index' on are all 'delta' less than their true
+        values.
+    """
+    position = bisect(values, value, 0, index)
+    if position < index:
+        return position
+    return bisect(values, value - delta, index)
+
+
+if sys.maxunicode > 0xFFFF:
+    _astral_re = re.compile(u'[\U00010000-\U0010FFFF]')
+else:
+    # Narrow builds already count characters as UTF-16 does.
+    _astral_re = None
+
+def _same(value):
+    return value
+
+def utf16_converters(text):
+    """ Returns a pair of functions that convert indices into some text to and
+        from positions in a QTextDocument holding it. Qt counts a character
+        outside the Basic Multilingual Plane as two (UTF-16) code units, which
+        a wide Python build does not.
+    """
+    if _astral_re is None:
+        return _same, _same
+    astral = [ match.start() for match in _astral_re.finditer(text) ]
+    if not astral:
+        return _same, _same
+    positions = [ index + i for i, index in enumerate(astral) ]
+
+    def to_position(index):
+        return index + bisect_left(astral, index)
+
+    def to_index(position):
+        return position - bisect_left(positions, position)
+
+    return to_position, to_index
+
+
+class MatchFinder(QtCore.QObject):
+    """ Finds all of the matches of a regular expression in some text on a
+        worker thread.
+    """
+
+    # Emitted (on the worker thread) with the generation of the search and
+    # lists of the start and end positions and line numbers of the matches.
+    matches_found = QtCore.Signal(int, object, object, object)
+
+    def __init__(self):
+        super(MatchFinder, self).__init__()
+
+        # The generation of the current search. Starting a new search makes
+        # any running one stop.
+        self.generation = 0
+
+    def start(self, pattern, text):
+        """ Starts searching some text, returning the generation of the search.
+        """
+        self.generation += 1
+        thread = threading.Thread(target=self._run,
+                                  args=(self.generation, pattern, text))
+        thread.setDaemon(True)
+        thread.start()
+        return self.generation
+
+    def cancel(self):
+        """ Stops any running search.
+        """
+        self.generation += 1
+
+    def _run(self, generation, pattern, text):
+        starts, ends, lines = [], [], []
+        line = last = 0
+        to_position = utf16_converters(text)[0]
+        for count, match in enumerate(pattern.finditer(text)):
+            if count % 1000 == 0 and generation != self.generation:
+                return
+            start = match.start()
+            line += text.count(u'\n', last, start)
+            last = start
+            starts.append(to_position(start))
+            ends.append(to_position(match.end()))
+            lines.append(line)
+        try:
+            self.matches_found.emit(generation, starts, ends, lines)
+        except RuntimeError:
+            # The widget has been destroyed.
+            pass
+
+
 class AdvancedCodeWidget(QtGui.QWidget):
     """ Advanced widget for viewing and editing code, with support
         for search & replace
     """
 
+    # Emitted with the number of matches whenever the matches found by
+    # 'find_all' change.
+    matches_changed = QtCore.Signal(int)
+
+    # Changes adding or removing at least this many characters cause the
+    # matches found by 'find_all' to be looked for again from scratch, rather
+    # than just in the changed lines.
+    find_all_threshold = 100000
+
     ###########################################################################
     # AdvancedCodeWidget interface
     ###########################################################################
 
-    def __init__(self, parent, font=None, lexer=None):
+    def __init__(self, parent, font=None, lexer=None, background_lexing=False):
         super(AdvancedCodeWidget, self).__init__(parent)
 
-        self.code = CodeWidget(self, font=font, lexer=lexer)
+        self.code = CodeWidget(self, font=font, lexer=lexer,
+                               background_lexing=background_lexing)
         self.find = FindWidget(self)
         self.find.hide()
         self.replace = ReplaceWidget(self)
@@ -522,17 +943,41 @@ class AdvancedCodeWidget(QtGui.QWidget):
         self.active_find_widget = None
         self.previous_find_widget = None
 
+        # The index of the matches found by 'find_all': the pattern searched
+        # for, and the start and end positions and line numbers of each match.
+        self._match_pattern = None
+        self._match_starts = []
+        self._match_ends = []
+        self._match_lines = []
+        # The index from which the matches are stored shifted, and the delta
+        # to add to their positions and line numbers, so that a change to the
+        # document does not have to move all of the later matches at once.
+        self._match_shift = (0, 0, 0)
+        self._match_finder = MatchFinder()
+        self._match_finder.matches_found.connect(self._matches_found)
+        self._block_count = 0
+        self._finding_all = False
+        # The span (start, end, delta) of the document that has changed since
+        # the text being searched by the worker thread was taken (or None).
+        self._pending_change = None
+        self.code.document().contentsChange.connect(self._update_matches)
+
+        # The mapped file (if any) whose searches are being listened to.
+        self._searched_file = None
+
         self.code.selectionChanged.connect(self._update_replace_enabled)
 
         self.find.line_edit.returnPressed.connect(self.find_next)
         self.find.next_button.clicked.connect(self.find_next)
         self.find.prev_button.clicked.connect(self.find_prev)
+        self.find.find_all_button.clicked.connect(self.find_all)
 
         self.replace.line_edit.returnPressed.connect(self.find_next)
         self.replace.line_edit.textChanged.connect(
             self._update_replace_all_enabled)
         self.replace.next_button.clicked.connect(self.find_next)
         self.replace.prev_button.clicked.connect(self.find_prev)
+        self.replace.find_all_button.clicked.connect(self.find_all)
         self.replace.replace_button.clicked.connect(self.replace_next)
         self.replace.replace_all_button.clicked.connect(self.replace_all)
 
@@ -603,29 +1048,38 @@ class AdvancedCodeWidget(QtGui.QWidget):
             the value of 'replace'.
 
             Returns the number of occurances found (0 or 1)
+
+            When viewing a file, the search is done in the background and None
+            is returned.
         """
 
         if not search_text:
             return
         wrap = self.active_find_widget.wrap_action.isChecked()
 
+        if self.code.mapped_file is not None:
+            return self._find_in_file(search_text, direction, wrap)
+
         document = self.code.document()
         find_cursor = None
 
-        flags = QtGui.QTextDocument.FindFlags(0)
-        if self.active_find_widget.case_action.isChecked():
-            flags |= QtGui.QTextDocument.FindCaseSensitively
-        if self.active_find_widget.word_action.isChecked():
-            flags |= QtGui.QTextDocument.FindWholeWords
-        if direction == 'backward':
-            flags |= QtGui.QTextDocument.FindBackward
-
-        find_cursor = document.find(search_text, self.code.textCursor(), flags)
-        if find_cursor.isNull() and wrap:
+        if self.active_find_widget.regex_action.isChecked():
+            find_cursor = self._find_pattern(search_text, direction, wrap)
+        else:
+            flags = QtGui.QTextDocument.FindFlags(0)
+            if self.active_find_widget.case_action.isChecked():
+                flags |= QtGui.QTextDocument.FindCaseSensitively
+            if self.active_find_widget.word_action.isChecked():
+                flags |= QtGui.QTextDocument.FindWholeWords
             if direction == 'backward':
-                find_cursor = document.find(search_text, document.characterCount()-1, flags)
-            else:
-                find_cursor = document.find(search_text, 0, flags)
+                flags |= QtGui.QTextDocument.FindBackward
+
+            find_cursor = document.find(search_text, self.code.textCursor(), flags)
+            if find_cursor.isNull() and wrap:
+                if direction == 'backward':
+                    find_cursor = document.find(search_text, document.characterCount()-1, flags)
+                else:
+                    find_cursor = document.find(search_text, 0, flags)
 
         if not find_cursor.isNull():
             if replace is not None:
@@ -665,12 +1119,53 @@ class AdvancedCodeWidget(QtGui.QWidget):
             return 1
         return 0
 
+    def find_all(self):
+        """ Finds and marks every match of the search text. The matches are
+            found on a worker thread, and 'matches_changed' is emitted when
+            they are ready.
+        """
+        if not self.active_find_widget:
+            self.enable_find()
+        search_text = unicode(self.active_find_widget.line_edit.text())
+        pattern = self._search_pattern(search_text, self.active_find_widget)
+        if pattern is None:
+            self.clear_matches()
+            return
+
+        self._match_pattern = pattern
+        self._start_find_all()
+
+    def clear_matches(self):
+        """ Removes the marks made by 'find_all'.
+        """
+        self._match_finder.cancel()
+        self._match_pattern = None
+        self._finding_all = False
+        self._pending_change = None
+        self._set_matches([], [], [])
+
+    def matches(self):
+        """ Returns a list of the (start, end, line) of the matches found by
+            'find_all'. Line numbers are 0-indexed.
+        """
+        self._shift_matches(len(self._match_starts))
+        return zip(self._match_starts, self._match_ends, self._match_lines)
+
     def replace_next(self):
-        search_text = self.replace.line_edit.text()
-        replace_text = self.replace.replace_edit.text()
+        if self.code.isReadOnly():
+            return 0
+        search_text = unicode(self.replace.line_edit.text())
+        replace_text = unicode(self.replace.replace_edit.text())
 
         cursor = self.code.textCursor()
-        if cursor.selectedText() == search_text:
+        selection = unicode(cursor.selectedText())
+        if self._selection_matches(selection, search_text):
+            if self.replace.regex_action.isChecked():
+                pattern = self._search_pattern(search_text, self.replace)
+                try:
+                    replace_text = pattern.match(selection).expand(replace_text)
+                except (re.error, IndexError):
+                    return 0
             cursor.beginEditBlock()
             cursor.removeSelectedText()
             cursor.insertText(replace_text)
@@ -679,17 +1174,47 @@ class AdvancedCodeWidget(QtGui.QWidget):
         return 0
 
     def replace_all(self):
+        """ Replaces every occurrence of the search text in one pass over the
+            document, as a single edit. Returns the number of occurrences
+            replaced.
+        """
+        if self.code.isReadOnly():
+            return 0
         search_text = unicode(self.replace.line_edit.text())
         replace_text = unicode(self.replace.replace_edit.text())
 
-        count = 0
-        cursor = self.code.textCursor()
+        pattern = self._search_pattern(search_text, self.replace)
+        if pattern is None:
+            return 0
+
+        text = unicode(self.code.toPlainText())
+        matches = list(pattern.finditer(text))
+        if not matches:
+            return 0
+        to_position = utf16_converters(text)[0]
+
+        # Work out all of the replacements before changing anything, so that
+        # a bad reference to a group does not leave the job half done.
+        if self.replace.regex_action.isChecked():
+            try:
+                replacements = [ match.expand(replace_text)
+                                 for match in matches ]
+            except (re.error, IndexError):
+                return 0
+        else:
+            replacements = [ replace_text ] * len(matches)
+
+        # Replace from the end backwards, so that the positions of the
+        # remaining matches are not affected.
+        cursor = QtGui.QTextCursor(self.code.document())
         cursor.beginEditBlock()
-        while self.find_in_document(search_text=search_text,
-                                    replace=replace_text) != None:
-            count += 1
+        for match, replacement in reversed(zip(matches, replacements)):
+            cursor.setPosition(to_position(match.start()))
+            cursor.setPosition(to_position(match.end()),
+                               QtGui.QTextCursor.KeepAnchor)
+            cursor.insertText(replacement)
         cursor.endEditBlock()
-        return count
+        return len(matches)
 
     def print_(self, printer):
         """ Convenience method to call 'print_' on the CodeWidget.
@@ -715,6 +1240,9 @@ class AdvancedCodeWidget(QtGui.QWidget):
             self.enable_replace()
         elif key_sequence.matches(QtCore.Qt.Key_Escape):
             if self.active_find_widget:
+                self.clear_matches()
+                if self.code.mapped_file is not None:
+                    self.code.mapped_file.cancel_search()
                 self.find.hide()
                 self.replace.hide()
                 self.code.setFocus()
@@ -727,10 +1255,333 @@ class AdvancedCodeWidget(QtGui.QWidget):
     # Private methods
     ###########################################################################
 
+    def _matches_found(self, generation, starts, ends, lines):
+        """ Handles the worker thread finding all the matches.
+        """
+        if generation == self._match_finder.generation:
+            self._finding_all = False
+            self._set_matches(starts, ends, lines)
+
+            # Bring the matches up to date with any changes made while they
+            # were being found.
+            if self._pending_change is not None:
+                start, end, delta = self._pending_change
+                self._pending_change = None
+                self._update_matches(start, end - start - delta, end - start)
+
+    def _start_find_all(self):
+        """ Starts finding all of the matches in the document from scratch.
+        """
+        self._block_count = self.code.blockCount()
+        self._finding_all = True
+        self._pending_change = None
+        self._match_finder.start(self._match_pattern,
+                                 unicode(self.code.toPlainText()))
+
+    def _set_matches(self, starts, ends, lines):
+        self._match_starts = starts
+        self._match_ends = ends
+        self._match_lines = lines
+        self._match_shift = (0, 0, 0)
+        self.code.set_matches(starts, ends)
+        self.code.set_match_lines(lines)
+        self.matches_changed.emit(len(starts))
+
+    def _shift_matches(self, index):
+        """ Moves the index from which the matches are stored shifted,
+            adjusting the matches in between.
+        """
+        old, delta, line_delta = self._match_shift
+        if delta or line_delta:
+            starts, ends, lines = \
+                self._match_starts, self._match_ends, self._match_lines
+            if index < old:
+                indices = xrange(index, old)
+                delta, line_delta = -delta, -line_delta
+            else:
+                indices = xrange(old, index)
+            for i in indices:
+                starts[i] += delta
+                ends[i] += delta
+                lines[i] += line_delta
+        self._match_shift = (index,) + self._match_shift[1:]
+
+    def _match_bisect(self, bisect, values, position):
+        """ Finds where a (true) position goes in the match starts or ends.
+        """
+        index, delta, line_delta = self._match_shift
+        return shifted_bisect(bisect, values, position, index, delta)
+
+    def _match_position(self, values, i):
+        """ Returns the true position of a match start or end.
+        """
+        index, delta, line_delta = self._match_shift
+        if i >= index:
+            return values[i] + delta
+        return values[i]
+
+    def _update_matches(self, position, removed, added):
+        """ Updates the matches found by 'find_all' after the document has
+            changed, by looking for matches again in just the changed lines.
+        """
+        if self._match_pattern is None:
+            return
+
+        if max(removed, added) >= self.find_all_threshold:
+            self._start_find_all()
+            return
+
+        if self._finding_all:
+            # Just note the change, and apply it once the worker thread has
+            # finished searching the text as it was before.
+            self._pending_change = self._merge_change(
+                self._pending_change, position, removed, added)
+            return
+
+        document = self.code.document()
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        if not last.isValid():
+            last = document.lastBlock()
+        start = first.position()
+        end = last.position() + last.length() - 1
+        delta = added - removed
+        line_delta = self.code.blockCount() - self._block_count
+        self._block_count = self.code.blockCount()
+
+        # The matches before and after the changed lines are kept, with the
+        # ones after moved along. A match that runs into the changed lines
+        # from before them is looked for again from the start of its line, and
+        # one that runs out of them up to the end of its line.
+        starts, ends, lines = \
+            self._match_starts, self._match_ends, self._match_lines
+        lo = min(self._match_bisect(bisect_left, starts, start),
+                 self._match_bisect(bisect_right, ends, start))
+        while lo < len(starts) and self._match_position(starts, lo) < start:
+            first = document.findBlock(self._match_position(starts, lo))
+            start = first.position()
+            lo = min(self._match_bisect(bisect_left, starts, start),
+                     self._match_bisect(bisect_right, ends, start))
+        hi = self._match_bisect(bisect_right, starts, end - delta)
+        while hi > lo and self._match_position(ends, hi - 1) > end - delta:
+            last = document.findBlock(self._match_position(ends, hi - 1) +
+                                      delta)
+            if not last.isValid():
+                last = document.lastBlock()
+            end = last.position() + last.length() - 1
+            hi = self._match_bisect(bisect_right, starts, end - delta)
+
+        cursor = QtGui.QTextCursor(document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+        text = unicode(cursor.selectedText()).replace(u'\u2029', u'\n')
+        to_position = utf16_converters(text)[0]
+        new_starts, new_ends, new_lines = [], [], []
+        line = first.blockNumber()
+        last_start = 0
+        for match in self._match_pattern.finditer(text):
+            line += text.count(u'\n', last_start, match.start())
+            last_start = match.start()
+            new_starts.append(start + to_position(match.start()))
+            new_ends.append(start + to_position(match.end()))
+            new_lines.append(line)
+
+        # Only the matches up to the changed lines need to be in their true
+        # positions.
+        self._shift_matches(hi)
+        if (delta == 0 and line_delta == 0 and starts[lo:hi] == new_starts and
+            ends[lo:hi] == new_ends):
+            # Nothing has changed (e.g. the lines have just been highlighted).
+            return
+
+        # Replace the matches in the changed lines, and shift the ones after
+        # them by adding the change to the pending delta.
+        old_lines = lines[lo:hi]
+        starts[lo:hi] = new_starts
+        ends[lo:hi] = new_ends
+        lines[lo:hi] = new_lines
+        index, shift, line_shift = self._match_shift
+        index = lo + len(new_starts)
+        shift += delta
+        line_shift += line_delta
+        self._match_shift = (index, shift, line_shift)
+
+        self.code.set_matches(starts, ends, (index, shift))
+        if line_delta:
+            # The gutter places all of its markers again whenever the number
+            # of lines changes anyway.
+            self.code.set_match_lines(
+                lines[:index] + [ l + line_shift for l in lines[index:] ])
+        else:
+            self.code.change_match_lines(old_lines, new_lines)
+        self.matches_changed.emit(len(starts))
+
+    def _merge_change(self, change, position, removed, added):
+        """ Combines a change to the document with the (start, end, delta) of
+            earlier changes, returning the span of the document that covers
+            both (in current positions) and the total change in length.
+        """
+        if change is None:
+            return (position, position + added, added - removed)
+
+        start, end, delta = change
+        if end >= position + removed:
+            end += added - removed
+        elif end > position:
+            end = position
+        return (min(start, position), max(end, position + added),
+                delta + added - removed)
+
+    def _search_pattern(self, search_text, find_widget, encoding=None):
+        """ Returns the compiled regular expression for the search text with
+            the options of a find widget, or None if it is not valid. If an
+            encoding is given, the expression is for searching text encoded
+            with it.
+        """
+        if not search_text:
+            return None
+        flags = re.UNICODE | re.MULTILINE
+        if encoding is not None:
+            try:
+                search_text = search_text.encode(encoding)
+            except UnicodeError:
+                return None
+            flags = re.MULTILINE
+        if not find_widget.regex_action.isChecked():
+            search_text = re.escape(search_text)
+        if find_widget.word_action.isChecked():
+            search_text = r'\b(?:%s)\b' % search_text
+        if not find_widget.case_action.isChecked():
+            flags |= re.IGNORECASE
+        try:
+            return re.compile(search_text, flags)
+        except re.error:
+            return None
+
+    def _find_pattern(self, search_text, direction, wrap):
+        """ Finds the next match of a regular expression from the cursor,
+            returning a cursor selecting it (or a null cursor).
+        """
+        pattern = self._search_pattern(search_text, self.active_find_widget)
+        if pattern is None:
+            return QtGui.QTextCursor()
+
+        text = unicode(self.code.toPlainText())
+        to_position, to_index = utf16_converters(text)
+        cursor = self.code.textCursor()
+        start = to_index(cursor.selectionStart())
+        end = to_index(cursor.selectionEnd())
+
+        match = None
+        if direction == 'backward':
+            for candidate in pattern.finditer(text):
+                if candidate.start() >= start:
+                    if wrap and match is None:
+                        match = self._last_match(pattern, text, start)
+                    break
+                match = candidate
+            else:
+                if wrap and match is None:
+                    match = self._last_match(pattern, text, start)
+        else:
+            match = pattern.search(text, end)
+            if (match is not None and start == end and
+                match.start() == match.end() == end):
+                # Don't find the same empty match again.
+                match = pattern.search(text, end + 1)
+            if match is None and wrap:
+                match = pattern.search(text)
+
+        if match is None:
+            return QtGui.QTextCursor()
+
+        find_cursor = QtGui.QTextCursor(self.code.document())
+        find_cursor.setPosition(to_position(match.start()))
+        find_cursor.setPosition(to_position(match.end()),
+                                QtGui.QTextCursor.KeepAnchor)
+        return find_cursor
+
+    def _find_in_file(self, search_text, direction, wrap):
+        """ Starts finding the next match in the file being viewed on a worker
+            thread. The match is brought into view and selected once it has
+            been found. Returns None.
+        """
+        mapped_file = self.code.mapped_file
+        pattern = self._search_pattern(search_text, self.active_find_widget,
+                                       mapped_file.encoding)
+        if pattern is None:
+            return None
+
+        # Work out the offset in the file of the cursor.
+        backward = (direction == 'backward')
+        cursor = self.code.textCursor()
+        if backward:
+            position = cursor.selectionStart()
+        else:
+            position = cursor.selectionEnd()
+        block = self.code.document().findBlock(position)
+        line = block.blockNumber() + self.code.line_offset
+        text = unicode(block.text())
+        prefix = text[:utf16_converters(text)[1](position - block.position())]
+        offset = (mapped_file.line_start(line) +
+                  len(prefix.encode(mapped_file.encoding, 'replace')))
+
+        # Search on a worker thread, since the file may be huge. The match is
+        # selected when it has been found.
+        if self._searched_file is not mapped_file:
+            mapped_file.search_done.connect(self._file_search_done)
+            self._searched_file = mapped_file
+        mapped_file.start_search(pattern, offset, backward, wrap)
+        return None
+
+    def _file_search_done(self, generation, span):
+        """ Handles the worker thread finishing a search of the file being
+            viewed, bringing the match found into view and selecting it.
+        """
+        mapped_file = self.code.mapped_file
+        if (mapped_file is not self._searched_file or span is None or
+            generation != mapped_file.search_generation):
+            return
+
+        # Select the match (or the part of it on its first line).
+        start, end = span
+        line = mapped_file.line_at(start)
+        line_start = mapped_file.line_start(line)
+        block = self.code.show_file_line(line)
+        to_position = utf16_converters(unicode(block.text()))[0]
+        start_column = to_position(len(mapped_file.text(line_start, start)))
+        end_column = to_position(len(mapped_file.text(line_start, end)))
+        end_column = min(end_column, block.length() - 1)
+        find_cursor = QtGui.QTextCursor(block)
+        find_cursor.setPosition(block.position() + start_column)
+        find_cursor.setPosition(block.position() + end_column,
+                                QtGui.QTextCursor.KeepAnchor)
+        self.code.setTextCursor(find_cursor)
+
+    def _last_match(self, pattern, text, start):
+        """ Returns the last match at or after a position, or None.
+        """
+        match = None
+        for match in pattern.finditer(text, start):
+            pass
+        return match
+
+    def _selection_matches(self, selection, find_text):
+        """ Returns whether the selected text is a match for the find text.
+        """
+        if self.replace.regex_action.isChecked():
+            pattern = self._search_pattern(find_text, self.replace)
+            if pattern is None:
+                return False
+            match = pattern.match(selection)
+            return match is not None and match.end() == len(selection)
+        return selection == find_text
+
     def _update_replace_enabled(self):
-        selection = self.code.textCursor().selectedText()
-        find_text = self.replace.line_edit.text()
-        self.replace.replace_button.setEnabled(selection == find_text)
+        selection = unicode(self.code.textCursor().selectedText())
+        find_text = unicode(self.replace.line_edit.text())
+        self.replace.replace_button.setEnabled(
+            self._selection_matches(selection, find_text))
 
     def _update_replace_all_enabled(self, text):
         self.replace.replace_all_button.setEnabled(len(text))
@@ -45,6 +45,8 @@ class FindWidget(QtGui.QWidget):
         self.next_button.setFixedWidth(self.button_size)
         self.prev_button = QtGui.QPushButton('&Prev')
         self.prev_button.setFixedWidth(self.button_size)
+        self.find_all_button = QtGui.QPushButton('&Find All')
+        self.find_all_button.setFixedWidth(self.button_size)
         self.options_button = QtGui.QPushButton('&Options')
         self.options_button.setFixedWidth(self.button_size)
 
@@ -56,15 +58,19 @@ class FindWidget(QtGui.QWidget):
         self.wrap_action = QtGui.QAction('Wrap search', options_menu)
         self.wrap_action.setCheckable(True)
         self.wrap_action.setChecked(True)
+        self.regex_action = QtGui.QAction('Regular e&xpression', options_menu)
+        self.regex_action.setCheckable(True)
         options_menu.addAction(self.case_action)
         options_menu.addAction(self.word_action)
         options_menu.addAction(self.wrap_action)
+        options_menu.addAction(self.regex_action)
         self.options_button.setMenu(options_menu)
 
         layout = QtGui.QHBoxLayout()
         layout.addWidget(self.line_edit)
         layout.addWidget(self.next_button)
         layout.addWidget(self.prev_button)
+        layout.addWidget(self.find_all_button)
         layout.addWidget(self.options_button)
         layout.addStretch(2)
         layout.setMargin(0)
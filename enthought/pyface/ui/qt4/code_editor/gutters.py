@@ -37,12 +37,74 @@ class StatusGutterWidget(GutterWidget):
     """ Draws status markers
     """
 
+    match_color = QtGui.QColor(100, 150, 255)
+
+    # The kinds of marker, in the order they are drawn, with their colors and
+    # heights.
+    markers = [ ('match', match_color, 2),
+                ('info', QtCore.Qt.green, 3),
+                ('warn', QtCore.Qt.yellow, 3),
+                ('error', QtCore.Qt.red, 3) ]
+
     def __init__(self, *args, **kw):
         super(StatusGutterWidget, self).__init__(*args, **kw)
 
-        self.error_lines = []
-        self.warn_lines = []
-        self.info_lines = []
+        # The lines with each kind of marker, and how many of them fall on
+        # each pixel row. The rows are only valid for the height and line
+        # count in 'self._scale'.
+        self._lines = {}
+        self._rows = {}
+        self._scale = None
+        for kind, color, size in self.markers:
+            self._lines[kind] = set()
+            self._rows[kind] = {}
+
+    error_lines = property(lambda self: sorted(self._lines['error']),
+                           lambda self, lines: self.set_lines('error', lines))
+    warn_lines = property(lambda self: sorted(self._lines['warn']),
+                          lambda self, lines: self.set_lines('warn', lines))
+    info_lines = property(lambda self: sorted(self._lines['info']),
+                          lambda self, lines: self.set_lines('info', lines))
+    match_lines = property(lambda self: sorted(self._lines['match']),
+                           lambda self, lines: self.set_lines('match', lines))
+
+    def set_lines(self, kind, lines):
+        """ Sets the lines with a kind of marker, updating the rows of just
+            the lines that have been added or removed.
+        """
+        new = set(lines)
+        old = self._lines[kind]
+        self._lines[kind] = new
+        self._update_rows(kind, old - new, new - old)
+
+    def change_lines(self, kind, removed, added):
+        """ Replaces some of the lines with a kind of marker with others. The
+            lines removed must not also be marked for any other reason.
+        """
+        removed = set(removed)
+        added = set(added)
+        lines = self._lines[kind]
+        lines.difference_update(removed - added)
+        lines.update(added)
+        self._update_rows(kind, removed - added, added - removed)
+
+    def _update_rows(self, kind, removed, added):
+        """ Updates the pixel rows of the lines removed and added.
+        """
+        if self._scale is None:
+            return
+
+        rows = self._rows[kind]
+        for line in removed:
+            row = self._row(line)
+            count = rows[row] - 1
+            if count:
+                rows[row] = count
+            else:
+                del rows[row]
+        for line in added:
+            row = self._row(line)
+            rows[row] = rows.get(row, 0) + 1
 
     def sizeHint(self):
         return QtCore.QSize(10, 0)
@@ -51,23 +113,32 @@ class StatusGutterWidget(GutterWidget):
         """ Paint the line numbers.
         """
         painter = QtGui.QPainter(self)
-        painter.fillRect(event.rect(), self.background_color)
-
-        cw = self.parent()
+        rect = event.rect()
+        painter.fillRect(rect, self.background_color)
 
-        pixels_per_block = self.height()/float(cw.blockCount())
+        scale = (self.height(), self.parent().lines())
+        if scale != self._scale:
+            self._bin_lines(scale)
 
-        for line in self.info_lines:
-            painter.fillRect(QtCore.QRect(0, line*pixels_per_block, self.width(), 3),
-                            QtCore.Qt.green)
+        width = self.width()
+        for kind, color, size in self.markers:
+            for row in self._rows[kind]:
+                if rect.top() - size < row <= rect.bottom():
+                    painter.fillRect(QtCore.QRect(0, row, width, size), color)
 
-        for line in self.warn_lines:
-            painter.fillRect(QtCore.QRect(0, line*pixels_per_block, self.width(), 3),
-                            QtCore.Qt.yellow)
+    def _bin_lines(self, scale):
+        """ Works out the pixel rows of all of the markers.
+        """
+        self._scale = scale
+        for kind, color, size in self.markers:
+            rows = self._rows[kind] = {}
+            for line in self._lines[kind]:
+                row = self._row(line)
+                rows[row] = rows.get(row, 0) + 1
 
-        for line in self.error_lines:
-            painter.fillRect(QtCore.QRect(0, line*pixels_per_block, self.width(), 3),
-                            QtCore.Qt.red)
+    def _row(self, line):
+        height, blocks = self._scale
+        return int(line * height / float(max(blocks, 1)))
 
 class LineNumberWidget(GutterWidget):
     """ Draw line numbers.
@@ -75,16 +146,29 @@ class LineNumberWidget(GutterWidget):
 
     min_char_width = 4
 
+    # The maximum number of rendered line numbers to keep.
+    pixmap_cache_size = 2000
+
+    def __init__(self, *args, **kw):
+        super(LineNumberWidget, self).__init__(*args, **kw)
+
+        self._font_metrics = None
+        self._pixmaps = {}
+
     def fontMetrics(self):
         # QWidget's fontMetrics method does not provide an up to date
         # font metrics, just one corresponding to the initial font
-        return QtGui.QFontMetrics(self.font)
+        if self._font_metrics is None:
+            self._font_metrics = QtGui.QFontMetrics(self.font)
+        return self._font_metrics
 
     def set_font(self, font):
         self.font = font
+        self._font_metrics = None
+        self._pixmaps = {}
 
     def digits_width(self):
-        nlines = max(1, self.parent().blockCount())
+        nlines = max(1, self.parent().lines())
         ndigits = max(self.min_char_width,
                       int(math.floor(math.log10(nlines) + 1)))
         width = max(self.fontMetrics().width(u'0' * ndigits) + 3,
@@ -98,24 +182,44 @@ class LineNumberWidget(GutterWidget):
         """ Paint the line numbers.
         """
         painter = QtGui.QPainter(self)
-        painter.setFont(self.font)
-        painter.fillRect(event.rect(), self.background_color)
+        rect = event.rect()
+        painter.fillRect(rect, self.background_color)
 
         cw = self.parent()
         block = cw.firstVisibleBlock()
-        blocknum = block.blockNumber()
+        blocknum = block.blockNumber() + cw.line_offset
         top = cw.blockBoundingGeometry(block).translated(
             cw.contentOffset()).top()
-        bottom = top + int(cw.blockBoundingRect(block).height())
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                painter.setPen(QtCore.Qt.black)
-                painter.drawText(0, top, self.width() - 2,
-                                 self.fontMetrics().height(),
-                                 QtCore.Qt.AlignRight, str(blocknum + 1))
+        right = self.width() - 2
+
+        while block.isValid() and top <= rect.bottom():
+            bottom = top + int(cw.blockBoundingRect(block).height())
+            if block.isVisible() and bottom >= rect.top():
+                pixmap = self._number_pixmap(blocknum + 1)
+                painter.drawPixmap(
+                    QtCore.QPointF(right - pixmap.width(), top), pixmap)
             block = block.next()
             top = bottom
-            bottom = top + int(cw.blockBoundingRect(block).height())
             blocknum += 1
 
+    def _number_pixmap(self, number):
+        """ Returns a pixmap of a rendered line number.
+        """
+        pixmap = self._pixmaps.get(number)
+        if pixmap is None:
+            if len(self._pixmaps) >= self.pixmap_cache_size:
+                self._pixmaps.clear()
+
+            text = str(number)
+            metrics = self.fontMetrics()
+            pixmap = QtGui.QPixmap(max(metrics.width(text), 1),
+                                   metrics.height())
+            pixmap.fill(QtCore.Qt.transparent)
+            painter = QtGui.QPainter(pixmap)
+            painter.setFont(self.font)
+            painter.setPen(QtCore.Qt.black)
+            painter.drawText(pixmap.rect(), QtCore.Qt.AlignRight, text)
+            painter.end()
+            self._pixmaps[number] = pixmap
+
+        return pixmap
@@ -0,0 +1,70 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2010, Enthought Inc
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD license.
+#------------------------------------------------------------------------------
+
+""" Times painting the line number and status gutters of a code widget
+showing a long document with many marked lines.
+
+Run this script directly, optionally passing the number of lines in the
+document (100000 by default).
+"""
+
+import sys
+import time
+
+from enthought.qt import QtGui
+
+from code_widget import CodeWidget
+
+
+def timed(label, func, repeat):
+    start = time.time()
+    for i in xrange(repeat):
+        func(i)
+    elapsed = time.time() - start
+    print '%-30s %8.3f ms per paint' % (label, elapsed * 1000.0 / repeat)
+
+
+def main(count=100000, repeat=100):
+    app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+
+    widget = CodeWidget(None)
+    widget.setPlainText(u'\n'.join([ u'line %d' % i for i in xrange(count) ]))
+    widget.resize(600, 800)
+    widget.show()
+    app.processEvents()
+
+    widget.set_match_lines(range(0, count, 3))
+    widget.set_warn_lines(range(0, count, 7))
+    widget.set_error_lines(range(0, count, 11))
+
+    numbers = widget.line_number_widget
+    status = widget.status_widget
+    scroll_bar = widget.verticalScrollBar()
+
+    def paint_numbers(i):
+        numbers.repaint()
+    def paint_status(i):
+        status.repaint()
+    def scroll(i):
+        scroll_bar.setValue((i * 997) % max(scroll_bar.maximum(), 1))
+        numbers.repaint()
+        status.repaint()
+    def change_matches(i):
+        widget.change_match_lines([ i * 3 ], [ i * 3 + 1 ])
+        status.repaint()
+
+    timed('Line numbers', paint_numbers, repeat)
+    timed('Status markers', paint_status, repeat)
+    timed('Scroll and paint both', scroll, repeat)
+    timed('Change a match and paint', change_matches, repeat)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
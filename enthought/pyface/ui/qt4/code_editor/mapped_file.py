@@ -0,0 +1,278 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2010, Enthought Inc
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD license.
+
+#
+# Author: Enthought Inc
+# Description: <Enthought pyface code editor>
+#------------------------------------------------------------------------------
+
+# Standard library imports
+from bisect import bisect_right
+import mmap
+import os
+import threading
+
+# System library imports
+from enthought.qt import QtCore
+
+
+class MappedFile(QtCore.QObject):
+    """ A read-only, memory-mapped text file that is indexed by line in the
+        background.
+
+        Only the start of every 'index_step'th line is stored, so the index
+        stays small however large the file is. The lines in between are found
+        by scanning forward from the nearest stored line.
+    """
+
+    # Emitted (on the worker thread) with the number of lines indexed so far.
+    lines_indexed = QtCore.Signal(int)
+
+    # Emitted (on the worker thread) with the generation of a search started
+    # by 'start_search' and the (start, end) offsets of the match found (or
+    # None).
+    search_done = QtCore.Signal(int, object)
+
+    # The number of lines between each line start stored in the index.
+    index_step = 64
+
+    # The number of lines to index between each 'lines_indexed' signal.
+    report_step = 100000
+
+    # The size of the chunks searched at a time. A search can be stopped
+    # between chunks.
+    chunk_size = 1 << 20
+
+    # How far past the end of a chunk a match starting in it may run.
+    chunk_overlap = 1 << 16
+
+    def __init__(self, path, encoding='utf-8'):
+        super(MappedFile, self).__init__()
+
+        self.path = path
+        self.encoding = encoding
+
+        # The number of lines indexed so far, and whether indexing is done.
+        self.line_count = 0
+        self.indexed = False
+
+        self._file = open(path, 'rb')
+        self.size = os.path.getsize(path)
+        if self.size > 0:
+            self._data = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        else:
+            # Empty files cannot be mapped.
+            self._data = ''
+
+        # The start of every 'index_step'th line.
+        self._offsets = [0]
+        self._closed = False
+
+        # The generation of the current search. Starting a new search makes
+        # any running one stop.
+        self.search_generation = 0
+
+    def start_indexing(self):
+        """ Starts indexing the lines of the file on a worker thread.
+        """
+        thread = threading.Thread(target=self._index)
+        thread.setDaemon(True)
+        thread.start()
+
+    def close(self):
+        """ Stops indexing and releases the file.
+        """
+        self._closed = True
+        self.search_generation += 1
+        if self.size > 0:
+            self._data.close()
+        self._file.close()
+
+    def line_start(self, line):
+        """ Returns the offset of the start of a line (which must have been
+            indexed).
+        """
+        step = self.index_step
+        data = self._data
+        pos = self._offsets[line // step]
+        for i in xrange(line % step):
+            pos = data.find('\n', pos) + 1
+        return pos
+
+    def indexed_end(self):
+        """ Returns the offset of the end of the lines indexed so far.
+        """
+        if self.indexed:
+            return self.size
+        if self.line_count == 0:
+            return 0
+        end = self._data.find('\n', self.line_start(self.line_count - 1))
+        if end == -1:
+            return self.size
+        return end
+
+    def line_at(self, offset):
+        """ Returns the number of the line containing an offset.
+        """
+        index = bisect_right(self._offsets, offset) - 1
+        start = self._offsets[index]
+        return index * self.index_step + self._data[start:offset].count('\n')
+
+    def lines(self, first, count):
+        """ Returns (as unicode) up to 'count' indexed lines, starting from the
+            line 'first'.
+        """
+        count = min(count, self.line_count - first)
+        if count <= 0:
+            return []
+
+        data = self._data
+        pos = self.line_start(first)
+        result = []
+        for i in xrange(count):
+            end = data.find('\n', pos)
+            if end == -1:
+                end = self.size
+            result.append(self.decode(data[pos:end].rstrip('\r')))
+            pos = end + 1
+        return result
+
+    def text(self, start, end):
+        """ Returns (as unicode) the text between two offsets.
+        """
+        return self.decode(self._data[start:end])
+
+    def decode(self, text):
+        """ Decodes text from the file.
+        """
+        return text.decode(self.encoding, 'replace')
+
+    def start_search(self, pattern, offset, backward=False, wrap=False):
+        """ Starts a search (see 'search') on a worker thread, returning the
+            generation of the search. If 'wrap' is True and nothing is found,
+            the search carries on from the other end of the file.
+        """
+        self.search_generation += 1
+        thread = threading.Thread(target=self._search,
+                                  args=(self.search_generation, pattern,
+                                        offset, backward, wrap))
+        thread.setDaemon(True)
+        thread.start()
+        return self.search_generation
+
+    def cancel_search(self):
+        """ Stops any running search.
+        """
+        self.search_generation += 1
+
+    def search(self, pattern, offset, backward=False, generation=None):
+        """ Searches the indexed lines of the file with a compiled (byte
+            string) regular expression from an offset, returning the (start,
+            end) offsets of the first match found or None. Searching backward
+            finds the last match that starts before the offset. If a
+            generation is given, the search gives up (returning None) once
+            another one has been started.
+        """
+        data = self._data
+        limit = self.indexed_end()
+
+        # The file is searched a chunk of whole lines at a time, so that a
+        # search can be stopped, and so that we don't have to find every
+        # match from the start of the file when searching backwards. Each
+        # chunk is searched up to the end of a line a little past it, so that
+        # a match is not cut off at its end.
+        if not backward:
+            start = offset
+            while start < limit:
+                if (generation is not None and
+                    generation != self.search_generation):
+                    return None
+                end = self._line_end(start + self.chunk_size, limit)
+                match = pattern.search(
+                    data, start, self._line_end(end + self.chunk_overlap,
+                                                limit))
+                if match is not None and match.start() < end:
+                    return match.span()
+                start = end
+            return None
+
+        end = min(offset, limit)
+        while end > 0:
+            if generation is not None and generation != self.search_generation:
+                return None
+            start = max(0, end - self.chunk_size)
+            if start > 0:
+                start = data.rfind('\n', 0, start) + 1
+            match = None
+            for candidate in pattern.finditer(
+                    data, start, self._line_end(end + self.chunk_overlap,
+                                                limit)):
+                if candidate.start() >= end:
+                    break
+                match = candidate
+            if match is not None:
+                return match.span()
+            end = start
+        return None
+
+    def _line_end(self, offset, limit):
+        """ Returns the offset just after the end of the line containing an
+            offset, but no more than a limit.
+        """
+        if offset >= limit:
+            return limit
+        end = self._data.find('\n', offset)
+        if end == -1 or end >= limit:
+            return limit
+        return end + 1
+
+    def _search(self, generation, pattern, offset, backward, wrap):
+        try:
+            span = self.search(pattern, offset, backward, generation)
+            if span is None and wrap:
+                if backward:
+                    span = self.search(pattern, self.size, True, generation)
+                else:
+                    span = self.search(pattern, 0, False, generation)
+            if generation == self.search_generation:
+                self.search_done.emit(generation, span)
+        except (ValueError, RuntimeError):
+            # The file has been closed or the object destroyed.
+            return
+
+    def _index(self):
+        data = self._data
+        size = self.size
+        step = self.index_step
+        offsets = self._offsets
+        count = 1 if size > 0 else 0
+        pos = 0
+        try:
+            while True:
+                if self._closed:
+                    return
+                end = data.find('\n', pos)
+                if end == -1 or end + 1 == size:
+                    # A newline at the very end does not start another line.
+                    break
+                pos = end + 1
+                if count % step == 0:
+                    offsets.append(pos)
+                count += 1
+                if count % self.report_step == 0:
+                    self.line_count = count
+                    self.lines_indexed.emit(count)
+        except (ValueError, RuntimeError):
+            # The file has been closed or the object destroyed.
+            return
+
+        self.line_count = count
+        self.indexed = True
+        try:
+            self.lines_indexed.emit(count)
+        except RuntimeError:
+            pass
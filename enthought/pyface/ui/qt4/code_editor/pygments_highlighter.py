@@ -9,25 +9,48 @@
 # Description: <Enthought pyface code editor>
 #------------------------------------------------------------------------------
 
-from enthought.qt import QtGui
+# Standard library imports
+import threading
+
+# System library imports
+from enthought.qt import QtCore, QtGui
 
 from pygments.lexer import RegexLexer, _TokenType, Text, Error
 from pygments.lexers import CLexer, CppLexer, PythonLexer, get_lexer_by_name
 from pygments.styles.default import DefaultStyle
-from pygments.token import Comment
+from pygments.token import Comment, String
+
+# Local imports
+from enthought.pyface.ui.qt4.console.bracket_matcher import \
+    IgnoreBracketsProperty
+
 
+# Lexer state stacks are kept as tuples, and interned so that the (many) lines
+# which end in the same state share a single stack.
+_state_stacks = {}
+
+def intern_stack(stack):
+    """ Returns the shared tuple for a state stack.
+    """
+    stack = tuple(stack)
+    return _state_stacks.setdefault(stack, stack)
 
-def get_tokens_unprocessed(self, text, stack=('root',)):
+ROOT_STACK = intern_stack(('root',))
+
+
+def get_tokens_unprocessed(self, text, stack=ROOT_STACK):
     """ Split ``text`` into (tokentype, text) pairs.
 
         Monkeypatched to store the final stack on the object itself.
     """
     pos = 0
     tokendefs = self._tokens
+    # The stack is only copied into a list if it is changed.
     if hasattr(self, '_epd_state_stack'):
-        statestack = list(self._epd_state_stack)
+        statestack = self._epd_state_stack
     else:
-        statestack = list(stack)
+        statestack = stack
+    copied = False
     statetokens = tokendefs[statestack[-1]]
     while 1:
         for rexmatch, action, new_state in statetokens:
@@ -41,6 +64,9 @@ def get_tokens_unprocessed(self, text, stack=('root',)):
                 pos = m.end()
                 if new_state is not None:
                     # state transition
+                    if not copied:
+                        statestack = list(statestack)
+                        copied = True
                     if isinstance(new_state, tuple):
                         for state in new_state:
                             if state == '#pop':
@@ -63,7 +89,8 @@ def get_tokens_unprocessed(self, text, stack=('root',)):
                 if text[pos] == '\n':
                     # at EOL, reset state to "root"
                     pos += 1
-                    statestack = ['root']
+                    statestack = ROOT_STACK
+                    copied = False
                     statetokens = tokendefs['root']
                     yield pos, Text, u'\n'
                     continue
@@ -71,7 +98,7 @@ def get_tokens_unprocessed(self, text, stack=('root',)):
                 pos += 1
             except IndexError:
                 break
-    self._epd_state_stack  = list(statestack)
+    self._epd_state_stack = intern_stack(statestack)
 
 # Monkeypatch!
 RegexLexer.get_tokens_unprocessed = get_tokens_unprocessed
@@ -104,11 +131,39 @@ CLexer.tokens['comment'] = comment_state
 CppLexer.tokens['comment'] = comment_state
 
 
+def lex_line(lexer, text, entry_stack=None):
+    """ Lexes a line of text starting in the given state stack (or the initial
+        state if it is None), returning a tuple of the (index, length, token)
+        spans found and the final state stack (or None if the lexer does not
+        keep one).
+    """
+    if entry_stack is not None:
+        lexer._epd_state_stack = entry_stack
+    elif hasattr(lexer, '_epd_state_stack'):
+        del lexer._epd_state_stack
+
+    spans = []
+    index = 0
+    for token, token_text in lexer.get_tokens(text):
+        l = len(token_text)
+        spans.append((index, l, token))
+        index += l
+
+    exit_stack = None
+    if hasattr(lexer, '_epd_state_stack'):
+        exit_stack = lexer._epd_state_stack
+
+        # Clean up for the next go-round.
+        del lexer._epd_state_stack
+
+    return spans, exit_stack
+
+
 class BlockUserData(QtGui.QTextBlockUserData):
     """ Storage for the user data associated with each line.
     """
 
-    syntax_stack = ('root',)
+    syntax_stack = ROOT_STACK
 
     def __init__(self, **kwds):
         QtGui.QTextBlockUserData.__init__(self)
@@ -122,10 +177,130 @@ class BlockUserData(QtGui.QTextBlockUserData):
         return 'BlockUserData(%s)' % kwds
 
 
+class TokenCache(object):
+    """ A bounded cache of the results of lexing lines.
+
+        Entries are kept in two generations: new entries go into the current
+        one, and when it is full it replaces the previous one, which is
+        discarded. Entries found in the previous generation are moved back into
+        the current one. This approximates a least recently used cache without
+        having to track the order of every access.
+    """
+
+    def __init__(self, max_size=5000):
+        self.max_size = max_size
+        self.clear()
+
+    def clear(self):
+        """ Discards all of the entries and resets the statistics.
+        """
+        self._current = {}
+        self._previous = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """ Returns the entry for a key, or None if there isn't one.
+        """
+        result = self._current.get(key)
+        if result is None:
+            result = self._previous.pop(key, None)
+            if result is None:
+                self.misses += 1
+                return None
+            self._store(key, result)
+        self.hits += 1
+        return result
+
+    def put(self, key, value):
+        """ Adds an entry for a key.
+        """
+        self._store(key, value)
+
+    def stats(self):
+        """ Returns a dictionary of the cache statistics.
+        """
+        lookups = self.hits + self.misses
+        if lookups:
+            hit_rate = float(self.hits) / lookups
+        else:
+            hit_rate = 0.0
+        return { 'hits'     : self.hits,
+                 'misses'   : self.misses,
+                 'hit_rate' : hit_rate,
+                 'size'     : len(self._current) + len(self._previous),
+                 'max_size' : self.max_size }
+
+    def _store(self, key, value):
+        if len(self._current) >= max(self.max_size // 2, 1):
+            self._previous = self._current
+            self._current = {}
+        self._current[key] = value
+
+
+class BackgroundLexer(QtCore.QObject):
+    """ Lexes a sequence of lines on a worker thread, reporting the results a
+        chunk of lines at a time.
+    """
+
+    # Emitted (on the worker thread) with the generation, the number of the
+    # first line of the chunk and a list of (text, entry stack, token spans,
+    # exit stack) tuples for each line in the chunk.
+    chunk_lexed = QtCore.Signal(int, int, object)
+
+    # The number of lines lexed before reporting them.
+    chunk_size = 500
+
+    def __init__(self, lexer):
+        super(BackgroundLexer, self).__init__()
+
+        # A lexer instance of our own, as lexers keep their state on the
+        # instance.
+        self._lexer = lexer.__class__(**lexer.options)
+
+        # The generation of the lines currently being lexed. Starting a new
+        # job makes any running one stop.
+        self.generation = 0
+
+    def start(self, lines, first_line, entry_stack):
+        """ Starts lexing some lines, numbered from 'first_line', with the
+            first one starting in the given state. Returns the generation of
+            the job.
+        """
+        self.generation += 1
+        thread = threading.Thread(target=self._run,
+                                  args=(self.generation, lines, first_line,
+                                        entry_stack))
+        thread.setDaemon(True)
+        thread.start()
+        return self.generation
+
+    def cancel(self):
+        """ Stops any running job.
+        """
+        self.generation += 1
+
+    def _run(self, generation, lines, first_line, entry_stack):
+        stack = entry_stack
+        for start in xrange(0, len(lines), self.chunk_size):
+            chunk = []
+            for text in lines[start:start + self.chunk_size]:
+                if generation != self.generation:
+                    return
+                spans, exit_stack = lex_line(self._lexer, text, stack)
+                chunk.append((text, stack, spans, exit_stack))
+                stack = exit_stack
+            try:
+                self.chunk_lexed.emit(generation, first_line + start, chunk)
+            except RuntimeError:
+                # The highlighter has been destroyed.
+                return
+
+
 class PygmentsHighlighter(QtGui.QSyntaxHighlighter):
     """ Syntax highlighter that uses Pygments for parsing. """
 
-    def __init__(self, parent, lexer=None):
+    def __init__(self, parent, lexer=None, cache_size=5000, background=False):
         super(PygmentsHighlighter, self).__init__(parent)
 
         try:
@@ -137,6 +312,47 @@ class PygmentsHighlighter(QtGui.QSyntaxHighlighter):
         # Caches for formats and brushes.
         self._brushes = {}
         self._formats = {}
+        # Cache of the format spans and final state stack of lexed lines,
+        # keyed by the text of the line and the state stack it starts with.
+        self._token_cache = TokenCache(cache_size)
+
+        # Changes adding or removing at least this many characters (e.g.
+        # loading a file) are lexed on a worker thread when highlighting in
+        # the background.
+        self.background_threshold = 100000
+
+        # The number of lexed blocks to rehighlight at a time while filling in
+        # the formats of a large change.
+        self.fill_batch_size = 200
+
+        # Results from the worker thread that are waiting to be applied, keyed
+        # by block number.
+        self._background_results = {}
+
+        # Ranges of block numbers waiting to be rehighlighted, in order.
+        self._fill_queue = []
+
+        # The range of block numbers that are currently visible.
+        self._visible_blocks = (0, -1)
+
+        # Set while Qt highlights a large change, so that lexing is left to
+        # the worker thread.
+        self._deferring = False
+
+        self._background = None
+        if background:
+            self._background = BackgroundLexer(self._lexer)
+            self._background.chunk_lexed.connect(self._chunk_lexed)
+            self._fill_timer = QtCore.QTimer(self)
+            self._fill_timer.setInterval(0)
+            self._fill_timer.timeout.connect(self._fill)
+
+            # Make sure that we hear about changes before Qt highlights them.
+            document = self.document()
+            if document is not None:
+                self.setDocument(None)
+                document.contentsChange.connect(self._contents_changed)
+                self.setDocument(document)
 
     def highlightBlock(self, qstring):
         """ Highlight a block of text.
@@ -145,29 +361,185 @@ class PygmentsHighlighter(QtGui.QSyntaxHighlighter):
         prev_data = self.previous_block_data()
 
         if prev_data is not None:
-            self._lexer._epd_state_stack = prev_data.syntax_stack
-        elif hasattr(self._lexer, '_epd_state_stack'):
-            del self._lexer._epd_state_stack
-
-        index = 0
-        # Lex the text using Pygments
-        for token, text in self._lexer.get_tokens(qstring):
-            l = len(text)
+            entry_stack = prev_data.syntax_stack
+        else:
+            entry_stack = None
+
+        key = (qstring, entry_stack)
+        cached = None
+        if self._background_results:
+            result = self._background_results.pop(
+                self.currentBlock().blockNumber(), None)
+            if (result is not None and result[0] == qstring and
+                result[1] == entry_stack):
+                cached = (self._get_spans(result[2]), result[3])
+                self._token_cache.put(key, cached)
+
+        if cached is None:
+            cached = self._token_cache.get(key)
+        if cached is None:
+            if self._deferring:
+                # Leave the text plain until the worker thread gets to it.
+                return
+            cached = self._lex(qstring, entry_stack)
+            self._token_cache.put(key, cached)
+
+        spans, exit_stack = cached
+        for index, length, format in spans:
+            self.setFormat(index, length, format)
+
+        if exit_stack is not None:
+            self._set_syntax_stack(self.currentBlock(), exit_stack)
+
+    def cache_stats(self):
+        """ Returns a dictionary of statistics for the cache of lexed lines:
+            the number of 'hits' and 'misses', the 'hit_rate', and the current
+            'size' and 'max_size' of the cache.
+        """
+        return self._token_cache.stats()
+
+    def clear_cache(self):
+        """ Discards the cache of lexed lines.
+        """
+        self._token_cache.clear()
+
+    def set_visible_blocks(self, first, last):
+        """ Tells the highlighter which blocks are visible, so that background
+            results for them are applied before those for any other blocks.
+        """
+        self._visible_blocks = (first, last)
+        if self._background_results:
+            self._rehighlight_blocks(first, last, pending_only=True)
+
+    def _lex(self, qstring, entry_stack):
+        """ Lexes a line starting in the given state, returning a tuple of the
+            (index, length, format) spans to apply and the final state stack
+            (or None if the lexer does not keep one).
+        """
+        spans, exit_stack = lex_line(self._lexer, qstring, entry_stack)
+        return self._get_spans(spans), exit_stack
+
+    def _get_spans(self, token_spans):
+        """ Converts (index, length, token) spans into the (index, length,
+            format) spans to apply.
+        """
+        spans = []
+        for index, length, token in token_spans:
             format = self._get_format(token)
             if format is not None:
-                self.setFormat(index, l, format)
-            index += l
+                spans.append((index, length, format))
+        return tuple(spans)
 
-        if hasattr(self._lexer, '_epd_state_stack'):
-            data = BlockUserData(syntax_stack=self._lexer._epd_state_stack)
-            self.currentBlock().setUserData(data)
+    #### Background highlighting ##############################################
+
+    def _contents_changed(self, position, removed, added):
+        """ Starts lexing large changes on the worker thread. This is called
+            before Qt highlights the change.
+        """
+        if max(removed, added) < self.background_threshold:
+            return
+
+        document = self.document()
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        if not last.isValid():
+            last = document.lastBlock()
+        first_line = first.blockNumber()
+        last_line = last.blockNumber()
+
+        entry_stack = None
+        prev_data = first.previous().userData()
+        if prev_data is not None:
+            entry_stack = prev_data.syntax_stack
+
+        lines = unicode(document.toPlainText()).split(u'\n')
+        lines = lines[first_line:last_line + 1]
+
+        self._background_results = {}
+        self._fill_queue = []
+        self._background.start(lines, first_line, entry_stack)
+
+        # Qt highlights the changed blocks as soon as we return, so only use
+        # what is already in the cache until it has finished.
+        self._deferring = True
+        QtCore.QTimer.singleShot(0, self._end_deferring)
+
+    def _end_deferring(self):
+        self._deferring = False
+
+    def _chunk_lexed(self, generation, first_line, chunk):
+        """ Handles a chunk of lines being lexed by the worker thread.
+        """
+        if generation != self._background.generation:
+            return
+
+        # Record the state at the end of each line now, so that the results
+        # can be applied to the blocks in any order.
+        block = self.document().findBlockByNumber(first_line)
+        line = first_line
+        for result in chunk:
+            if not block.isValid():
+                break
+            if unicode(block.text()) == result[0]:
+                self._background_results[line] = result
+                if result[3] is not None:
+                    self._set_syntax_stack(block, result[3])
+            block = block.next()
+            line += 1
+
+        last_line = first_line + len(chunk) - 1
+        first, last = self._visible_blocks
+        self._rehighlight_blocks(max(first, first_line),
+                                 min(last, last_line), pending_only=True)
+
+        self._fill_queue.append((first_line, last_line))
+        self._fill_timer.start()
+
+    def _fill(self):
+        """ Rehighlights the next batch of blocks lexed by the worker thread.
+        """
+        if not self._fill_queue:
+            self._fill_timer.stop()
+            return
+
+        first, last = self._fill_queue[0]
+        end = min(last, first + self.fill_batch_size - 1)
+        self._rehighlight_blocks(first, end, pending_only=True)
+        if end < last:
+            self._fill_queue[0] = (end + 1, last)
+        else:
+            del self._fill_queue[0]
+
+    def _rehighlight_blocks(self, first, last, pending_only=False):
+        """ Rehighlights a range of blocks, optionally just those that have
+            results from the worker thread waiting to be applied.
+        """
+        if last < first:
+            return
+
+        results = self._background_results
+        block = self.document().findBlockByNumber(first)
+        for line in xrange(first, last + 1):
+            if not block.isValid():
+                break
+            if (not pending_only) or (line in results):
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    def _set_syntax_stack(self, block, stack):
+        """ Records the state stack at the end of a block, unless the block
+            already has it.
+        """
+        data = block.userData()
+        if data is not None and data.syntax_stack is stack:
+            return
 
-            # there is a bug in pyside and it will crash unless we
-            # hold on to the reference a little longer
-            data = self.currentBlock().userData()
+        data = BlockUserData(syntax_stack=stack)
+        block.setUserData(data)
 
-            # Clean up for the next go-round.
-            del self._lexer._epd_state_stack
+        # there is a bug in pyside and it will crash unless we
+        # hold on to the reference a little longer
+        data = block.userData()
 
     def previous_block_data(self):
         """ Convenience method for returning the previous block's user data.
@@ -207,6 +579,11 @@ class PygmentsHighlighter(QtGui.QSyntaxHighlighter):
                     result.setUnderlineStyle(
                         QtGui.QTextCharFormat.WaveUnderline)
                     result.setUnderlineColor(self._get_color(value))
+        if token in String or token in Comment:
+            # Let bracket matching ignore any brackets.
+            if result is None:
+                result = QtGui.QTextCharFormat()
+            result.setProperty(IgnoreBracketsProperty, True)
         self._formats[token] = result
         return result
 
@@ -0,0 +1,80 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2010, Enthought Inc
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD license.
+#------------------------------------------------------------------------------
+
+""" Measures the memory used by the lexer state stacks kept for each line,
+with the stacks interned (as the highlighter does) and with a copy per line.
+
+Run this script directly, optionally passing the number of lines to lex
+(100000 by default).
+"""
+
+import sys
+import time
+
+from pygments.lexers import CLexer, PythonLexer
+
+from pygments_highlighter import lex_line
+
+
+def make_c_lines(count):
+    lines = []
+    while len(lines) < count:
+        lines.extend([ u'/* A comment that runs',
+                       u'   over several lines',
+                       u'   /* and nests */',
+                       u' */',
+                       u'int f(int x) {',
+                       u'    return x * 2; /* inline */',
+                       u'}',
+                       u'' ])
+    return lines[:count]
+
+
+def make_python_lines(count):
+    lines = []
+    while len(lines) < count:
+        lines.extend([ u'def f(x):',
+                       u'    """ A docstring that runs',
+                       u'        over several lines.',
+                       u'    """',
+                       u'    return [ x * 2 for y in x ]',
+                       u'' ])
+    return lines[:count]
+
+
+def measure(name, lexer, lines):
+    start = time.time()
+    stacks = []
+    stack = None
+    for line in lines:
+        spans, stack = lex_line(lexer, line, stack)
+        stacks.append(stack)
+    elapsed = time.time() - start
+
+    # Each line keeps a reference to its stack. When they are interned the
+    # stack objects themselves are shared.
+    references = len(stacks) * 8
+    distinct = dict([ (id(s), s) for s in stacks ]).values()
+    interned = references + sum([ sys.getsizeof(s) for s in distinct ])
+    copied = references + sum([ sys.getsizeof(list(s)) for s in stacks ])
+
+    print '%s: %d lines lexed in %.3f s' % (name, len(lines), elapsed)
+    print '    %d distinct stack objects' % len(distinct)
+    print '    %10d bytes interned' % interned
+    print '    %10d bytes copied per line' % copied
+
+
+def main(count=100000):
+    measure('C', CLexer(), make_c_lines(count))
+    measure('Python', PythonLexer(), make_python_lines(count))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
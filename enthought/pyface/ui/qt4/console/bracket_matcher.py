@@ -1,9 +1,17 @@
 """ Provides bracket matching for Q[Plain]TextEdit widgets.
 """
 
+# Standard library imports
+from bisect import bisect_left, bisect_right
+import re
+
 # System library imports
 from enthought.qt import QtCore, QtGui
 
+# The text format property that a syntax highlighter can set (to True) on the
+# formats of strings and comments, so that any brackets in them are ignored.
+IgnoreBracketsProperty = QtGui.QTextFormat.UserProperty + 1
+
 
 class BracketMatcher(QtCore.QObject):
     """ Matches square brackets, braces, and parentheses based on cursor
@@ -13,6 +21,7 @@ class BracketMatcher(QtCore.QObject):
     # Protected class variables.
     _opening_map = { '(':')', '{':'}', '[':']' }
     _closing_map = { ')':'(', '}':'{', ']':'[' }
+    _bracket_re = re.compile(r'[(){}\[\]]')
 
     #--------------------------------------------------------------------------
     # 'QObject' interface
@@ -29,8 +38,24 @@ class BracketMatcher(QtCore.QObject):
         self.format = QtGui.QTextCharFormat()
         self.format.setBackground(QtGui.QColor('silver'))
 
+        # The maximum distance (in characters) to search for a match, or None
+        # to search the whole document.
+        self.max_distance = 50000
+
+        # The index of brackets, mapping block numbers to the list of the
+        # (offset, character) of each bracket in the block, together with the
+        # brackets left once those in strings and comments are removed and
+        # the highlighting state they were worked out for. It also has the
+        # sorted block numbers in it. Blocks are added as they are searched, removed
+        # when they change and renumbered when lines are added or removed
+        # before them.
+        self._brackets = {}
+        self._numbers = []
+        self._block_count = text_edit.document().blockCount()
+
         self._text_edit = text_edit
         text_edit.cursorPositionChanged.connect(self._cursor_position_changed)
+        text_edit.document().contentsChange.connect(self._contents_changed)
 
     #--------------------------------------------------------------------------
     # Protected interface
@@ -45,29 +70,96 @@ class BracketMatcher(QtCore.QObject):
         start_char = document.characterAt(position)
         search_char = self._opening_map.get(start_char)
         if search_char:
-            increment = 1
+            forward = True
         else:
             search_char = self._closing_map.get(start_char)
             if search_char:
-                increment = -1
+                forward = False
             else:
                 return -1
 
-        # Search for the character.
-        char = start_char
+        block = document.findBlock(position)
+        offset = position - block.position()
+        if (offset, start_char) not in self._block_brackets(block):
+            # The bracket is in a string or comment.
+            return -1
+
+        # Search the brackets of each block in turn.
+        limit = self.max_distance
         depth = 0
-        while position >= 0 and position < document.characterCount():
-            if char == start_char:
-                depth += 1
-            elif char == search_char:
-                depth -= 1
-            if depth == 0:
-                break
-            position += increment
-            char = document.characterAt(position)
-        else:
-            position = -1
-        return position
+        while block.isValid():
+            block_position = block.position()
+            if limit is not None:
+                if forward and block_position - position > limit:
+                    break
+                if (not forward and
+                    position - (block_position + block.length()) > limit):
+                    break
+
+            brackets = self._block_brackets(block)
+            if not forward:
+                brackets = reversed(brackets)
+            for bracket_offset, char in brackets:
+                if forward:
+                    if (block_position + bracket_offset) < position:
+                        continue
+                elif (block_position + bracket_offset) > position:
+                    continue
+                if char == start_char:
+                    depth += 1
+                elif char == search_char:
+                    depth -= 1
+                    if depth == 0:
+                        match = block_position + bracket_offset
+                        if limit is None or abs(match - position) <= limit:
+                            return match
+                        return -1
+
+            if forward:
+                block = block.next()
+            else:
+                block = block.previous()
+
+        return -1
+
+    def _block_brackets(self, block):
+        """ Returns a list of the (offset, character) of the brackets in a
+            block that are not in strings or comments.
+        """
+        number = block.blockNumber()
+        entry = self._brackets.get(number)
+        if entry is None:
+            text = unicode(block.text())
+            brackets = [ (match.start(), match.group())
+                         for match in self._bracket_re.finditer(text) ]
+            entry = self._brackets[number] = [ brackets, None, brackets ]
+            self._numbers.insert(bisect_left(self._numbers, number), number)
+
+        brackets = entry[0]
+        if not brackets:
+            return brackets
+
+        # Use the highlighter's formats to leave out the brackets in strings
+        # and comments. A highlighter styles a block based on its text and
+        # the state the previous block ends in, so the result stands until
+        # either of those (or the block's own state) changes, e.g. when a
+        # string is opened on an earlier line.
+        state = (block.revision(), block.userState(),
+                 block.previous().userState())
+        if entry[1] == state:
+            return entry[2]
+
+        layout = block.layout()
+        if layout is not None:
+            for format_range in layout.additionalFormats():
+                if format_range.format.boolProperty(IgnoreBracketsProperty):
+                    start = format_range.start
+                    end = start + format_range.length
+                    brackets = [ bracket for bracket in brackets
+                                 if not (start <= bracket[0] < end) ]
+
+        entry[1:] = [ state, brackets ]
+        return brackets
 
     def _selection_for_character(self, position):
         """ Convenience method for selecting a character.
@@ -83,6 +175,39 @@ class BracketMatcher(QtCore.QObject):
 
     #------ Signal handlers ----------------------------------------------------
 
+    def _contents_changed(self, position, removed, added):
+        """ Removes the blocks that have changed from the index of brackets,
+            and renumbers the blocks after them.
+        """
+        document = self._text_edit.document()
+        block_count = document.blockCount()
+        delta = block_count - self._block_count
+        self._block_count = block_count
+        numbers = self._numbers
+        if not numbers:
+            return
+
+        first = max(document.findBlock(position).blockNumber(), 0)
+        last = document.findBlock(position + added).blockNumber()
+        if last < 0:
+            last = block_count - 1
+
+        # The blocks changed, numbered as they were before the change.
+        lo = bisect_left(numbers, first)
+        hi = bisect_right(numbers, last - delta)
+        brackets = self._brackets
+        for number in numbers[lo:hi]:
+            del brackets[number]
+
+        if delta:
+            following = numbers[hi:]
+            moved = [ brackets.pop(number) for number in following ]
+            for number, block_brackets in zip(following, moved):
+                brackets[number + delta] = block_brackets
+            numbers[lo:] = [ number + delta for number in following ]
+        else:
+            del numbers[lo:hi]
+
     def _cursor_position_changed(self):
         """ Updates the document formatting based on the new cursor position.
         """
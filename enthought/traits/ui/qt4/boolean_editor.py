@@ -43,6 +43,10 @@ from constants \
 class SimpleEditor ( Editor ):
     """ Simple style of editor for Boolean values, which displays a check box.
     """
+
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Finishes initializing the editor by creating the underlying toolkit
     #  widget:
@@ -87,6 +91,10 @@ class ReadonlyEditor ( Editor ):
     """ Read-only style of editor for Boolean values, which displays static text
     of either "True" or "False".
     """
+
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Finishes initializing the editor by creating the underlying toolkit
     #  widget:
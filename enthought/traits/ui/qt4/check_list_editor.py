@@ -166,6 +166,15 @@ class CustomEditor ( SimpleEditor ):
     def create_control ( self, parent ):
         """ Creates the initial editor control.
         """
+        # The factory's 'virtual' option shows the check boxes using a model
+        # and a list view rather than a widget for each of them:
+        if getattr(self.factory, 'virtual', False):
+            self._model = _CheckListModel(self)
+            self.control = _CheckListView(self.factory.cols)
+            self.control.setModel(self._model)
+            self.scrollable = True
+            return
+
         self.control = QtGui.QWidget()
         layout = QtGui.QGridLayout(self.control)
         layout.setMargin(0)
@@ -181,47 +190,43 @@ class CustomEditor ( SimpleEditor ):
     def rebuild_editor ( self ):
         """ Rebuilds the editor after its definition is modified.
         """
-        # Clear any existing content:
-        self.clear_layout()
-
         cur_value = parse_value( self.value )
 
-        # Create a sizer to manage the radio buttons:
+        # The choices are laid out in columns, so get the order in which they
+        # appear when reading across the rows:
         labels = self.names
         values = self.values
-        n      = len( labels )
         cols   = self.factory.cols
-        rows   = (n + cols - 1) / cols
-        incr   = [ n / cols ] * cols
-        rem    = n % cols
-        for i in range( cols ):
-            incr[i] += (rem > i)
-        incr[-1] = -(reduce( lambda x, y: x + y, incr[:-1], 0 ) - 1)
+        order  = grid_order( len( labels ), cols )
+
+        if self._model is not None:
+            self._model.set_items( [ labels[ index ] for index in order ],
+                                   [ values[ index ] for index in order ],
+                                   cur_value )
+            return
+
+        # Clear any existing content:
+        self.clear_layout()
 
         # Add the set of all possible choices:
         layout = self.control.layout()
-        index = 0
-        for i in range( rows ):
-            for j in range( cols ):
-                if n > 0:
-                    cb = QtGui.QCheckBox(labels[index])
-                    cb.value = values[index]
+        for position, index in enumerate( order ):
+            cb = QtGui.QCheckBox(labels[index])
+            cb.value = values[index]
 
-                    if cb.value in cur_value:
-                        cb.setCheckState(QtCore.Qt.Checked)
-                    else:
-                        cb.setCheckState(QtCore.Qt.Unchecked)
-
-                    QtCore.QObject.connect(cb,
-                                           QtCore.SIGNAL('clicked()'),
-                                           self._mapper,
-                                           QtCore.SLOT('map()'))
-                    self._mapper.setMapping(cb, labels[index])
+            if cb.value in cur_value:
+                cb.setCheckState(QtCore.Qt.Checked)
+            else:
+                cb.setCheckState(QtCore.Qt.Unchecked)
 
-                    layout.addWidget(cb, i, j)
+            QtCore.QObject.connect(cb,
+                                   QtCore.SIGNAL('clicked()'),
+                                   self._mapper,
+                                   QtCore.SLOT('map()'))
+            self._mapper.setMapping(cb, labels[index])
 
-                    index += incr[j]
-                    n -= 1
+            i, j = divmod( position, cols )
+            layout.addWidget(cb, i, j)
 
     #---------------------------------------------------------------------------
     #  Handles the user clicking one of the 'custom' check boxes:
@@ -231,11 +236,22 @@ class CustomEditor ( SimpleEditor ):
         """ Handles the user clicking one of the custom check boxes.
         """
         cb = self._mapper.mapping(label)
+        self.set_checked(cb.value, cb.checkState() == QtCore.Qt.Checked)
+
+    #---------------------------------------------------------------------------
+    #  Adds a value to, or removes a value from, the object trait:
+    #---------------------------------------------------------------------------
+
+    def set_checked(self, value, checked):
+        """ Adds a value to, or removes a value from, the object trait
+            depending on whether it has been checked.
+        """
         cur_value = parse_value(self.value)
-        if cb.checkState() == QtCore.Qt.Checked:
-            cur_value.append(cb.value)
-        elif cb.value in cur_value:
-            cur_value.remove(cb.value)
+        if checked:
+            if value not in cur_value:
+                cur_value.append(value)
+        elif value in cur_value:
+            cur_value.remove(value)
 
         if isinstance(self.value, basestring):
             cur_value = ','.join(cur_value)
@@ -251,12 +267,157 @@ class CustomEditor ( SimpleEditor ):
             editor.
         """
         new_values = parse_value( self.value )
+        if self._model is not None:
+            self._model.set_checked( new_values )
+            return
+
         for cb in self.control.findChildren(QtGui.QCheckBox, None):
             if cb.value in new_values:
                 cb.setCheckState(QtCore.Qt.Checked)
             else:
                 cb.setCheckState(QtCore.Qt.Unchecked)
 
+#-------------------------------------------------------------------------------
+#  '_CheckListModel' class:
+#-------------------------------------------------------------------------------
+
+class _CheckListModel ( QtCore.QAbstractListModel ):
+    """ A model of checkable items used by the virtual custom style of check
+        list editor. The items are held in the order they are displayed in.
+    """
+
+    def __init__ ( self, editor ):
+        """ Initialise the object.
+        """
+        QtCore.QAbstractListModel.__init__( self )
+
+        self._editor  = editor
+        self._labels  = []
+        self._values  = []
+        self._checked = []
+
+    #---------------------------------------------------------------------------
+    #  QAbstractItemModel interface:
+    #---------------------------------------------------------------------------
+
+    def rowCount ( self, mi = QtCore.QModelIndex() ):
+        """ Reimplemented to return the number of items.
+        """
+        if mi.isValid():
+            return 0
+
+        return len( self._labels )
+
+    def data ( self, mi, role ):
+        """ Reimplemented to return the label and check state of an item.
+        """
+        if role == QtCore.Qt.DisplayRole:
+            return self._labels[ mi.row() ]
+
+        if role == QtCore.Qt.CheckStateRole:
+            if self._checked[ mi.row() ]:
+                return QtCore.Qt.Checked
+
+            return QtCore.Qt.Unchecked
+
+        return None
+
+    def setData ( self, mi, value, role ):
+        """ Reimplemented to update the object trait when an item is checked
+            or unchecked.
+        """
+        if role != QtCore.Qt.CheckStateRole:
+            return False
+
+        row     = mi.row()
+        checked = (value == QtCore.Qt.Checked)
+        self._checked[ row ] = checked
+        self.emit( QtCore.SIGNAL( 'dataChanged(QModelIndex,QModelIndex)' ),
+                   mi, mi )
+        self._editor.set_checked( self._values[ row ], checked )
+
+        return True
+
+    def flags ( self, mi ):
+        """ Reimplemented to make the items checkable.
+        """
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsUserCheckable
+
+    #---------------------------------------------------------------------------
+    #  Public interface:
+    #---------------------------------------------------------------------------
+
+    def set_items ( self, labels, values, cur_value ):
+        """ Replaces all of the items.
+        """
+        cur_value     = _lookup( cur_value )
+        self._labels  = labels
+        self._values  = values
+        self._checked = [ value in cur_value for value in values ]
+        self.reset()
+
+    def set_checked ( self, cur_value ):
+        """ Updates the check states from the current value of the object
+            trait, notifying the view of just the items that have changed.
+        """
+        cur_value = _lookup( cur_value )
+        checked   = self._checked
+        signal    = QtCore.SIGNAL( 'dataChanged(QModelIndex,QModelIndex)' )
+        for row, value in enumerate( self._values ):
+            state = value in cur_value
+            if state != checked[ row ]:
+                checked[ row ] = state
+                mi = self.index( row )
+                self.emit( signal, mi, mi )
+
+#-------------------------------------------------------------------------------
+#  '_CheckListView' class:
+#-------------------------------------------------------------------------------
+
+class _CheckListView ( QtGui.QListView ):
+    """ A list view that lays its items out in a grid with a fixed number of
+        columns.
+    """
+
+    def __init__ ( self, cols ):
+        """ Initialise the object.
+        """
+        QtGui.QListView.__init__( self )
+
+        self._cols = max( cols, 1 )
+
+        self.setViewMode( QtGui.QListView.ListMode )
+        self.setFlow( QtGui.QListView.LeftToRight )
+        self.setWrapping( True )
+        self.setResizeMode( QtGui.QListView.Adjust )
+        self.setLayoutMode( QtGui.QListView.Batched )
+        self.setUniformItemSizes( True )
+        self.setSelectionMode( QtGui.QAbstractItemView.NoSelection )
+
+    def resizeEvent ( self, event ):
+        """ Reimplemented to keep the grid the width of the columns.
+        """
+        QtGui.QListView.resizeEvent( self, event )
+        self._update_grid()
+
+    def reset ( self ):
+        """ Reimplemented to size the grid for new items.
+        """
+        QtGui.QListView.reset( self )
+        self._update_grid()
+
+    def _update_grid ( self ):
+        """ Sizes the grid so that each row holds the required number of
+            columns.
+        """
+        model = self.model()
+        if (model is None) or (model.rowCount() == 0):
+            return
+
+        height = self.sizeHintForRow( 0 )
+        width  = self.viewport().width() / self._cols
+        self.setGridSize( QtCore.QSize( max( width, 1 ), height ) )
+
 #-------------------------------------------------------------------------------
 #  'TextEditor' class:
 #-------------------------------------------------------------------------------
@@ -282,6 +443,44 @@ class TextEditor ( BaseTextEditor ):
         except TraitError, excp:
             pass
 
+#-------------------------------------------------------------------------------
+#  Returns the order in which items laid out in columns appear in a grid:
+#-------------------------------------------------------------------------------
+
+def grid_order ( n, cols ):
+    """ Returns the indices of *n* items laid out down *cols* columns, in the
+        order in which they appear when reading across the rows of the grid.
+    """
+    rows = (n + cols - 1) / cols
+    incr = [ n / cols ] * cols
+    rem  = n % cols
+    for i in range( cols ):
+        incr[i] += (rem > i)
+    incr[-1] = -(reduce( lambda x, y: x + y, incr[:-1], 0 ) - 1)
+
+    order = []
+    index = 0
+    for i in range( rows ):
+        for j in range( cols ):
+            if len( order ) < n:
+                order.append( index )
+                index += incr[j]
+
+    return order
+
+#-------------------------------------------------------------------------------
+#  Returns a container of values suitable for fast membership tests:
+#-------------------------------------------------------------------------------
+
+def _lookup ( values ):
+    """ Returns a container of values suitable for fast membership tests.
+    """
+    try:
+        return set( values )
+    except TypeError:
+        # The values are not all hashable.
+        return values
+
 #-------------------------------------------------------------------------------
 #  Parse a value into a list:
 #-------------------------------------------------------------------------------
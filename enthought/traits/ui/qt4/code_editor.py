@@ -17,6 +17,8 @@ interface toolkit, useful for tools such as debuggers.
 #  Imports:
 #-------------------------------------------------------------------------------
 
+from difflib import SequenceMatcher
+
 from enthought.qt import QtCore, QtGui
 
 from enthought.pyface.ui.qt4.code_editor.code_widget import AdvancedCodeWidget
@@ -114,17 +116,27 @@ class SourceEditor ( Editor ):
         layout = QtGui.QVBoxLayout(self.control)
         layout.setMargin(0)
 
-        self._widget = control = AdvancedCodeWidget(None, lexer=self.factory.lexer)
+        factory = self.factory
+        self._widget = control = AdvancedCodeWidget(None, lexer=factory.lexer,
+            background_lexing=getattr(factory, 'background_lexing', False))
         layout.addWidget(control)
 
-        factory = self.factory
+        # The text of the document when it was last read (or None if it has
+        # changed since):
+        self._text = None
 
         # Set up listeners for the signals we care about
         code_editor = self._widget.code
+        code_editor.document().contentsChange.connect(self._contents_changed)
         if not self.readonly:
-            code_editor.textChanged.connect(self.update_object)
-            if factory.auto_set:
-                code_editor.textChanged.connect(self.update_object)
+            # The object is only updated (and the text only read from the
+            # document) once the user has paused typing for the factory's
+            # 'debounce' interval (in milliseconds):
+            self._timer = timer = QtCore.QTimer(self.control)
+            timer.setSingleShot(True)
+            timer.setInterval(getattr(factory, 'debounce', 200))
+            timer.timeout.connect(self.update_object)
+            code_editor.textChanged.connect(timer.start)
         if factory.selected_text != '':
             code_editor.selectionChanged.connect(self._selection_changed)
         if (factory.line != '') or (factory.column != ''):
@@ -172,6 +184,11 @@ class SourceEditor ( Editor ):
         QtCore.QObject.disconnect(self._widget, QtCore.SIGNAL('lostFocus'),
                                   self.update_object)
 
+        # Apply any change that is waiting for a pause in typing:
+        if (self._timer is not None) and self._timer.isActive():
+            self._timer.stop()
+            self.update_object()
+
         super( SourceEditor, self ).dispose()
 
     #---------------------------------------------------------------------------
@@ -183,7 +200,7 @@ class SourceEditor ( Editor ):
         """
         if not self._locked:
             try:
-                value = unicode(self._widget.code.toPlainText())
+                value = self._get_text()
                 if isinstance( self.value, SequenceTypes ):
                     value = value.split()
                 self.value = value
@@ -203,8 +220,17 @@ class SourceEditor ( Editor ):
         if isinstance( new_value, SequenceTypes ):
             new_value = '\n'.join( [ line.rstrip() for line in new_value ] )
         control = self._widget
-        if control.code.toPlainText() != new_value:
-            control.code.setPlainText(new_value)
+        old_value = self._get_text()
+        if old_value != new_value:
+            if old_value == '':
+                control.code.setPlainText(new_value)
+            else:
+                self._replace_lines(old_value, new_value)
+
+            # The document now shows the object's value, so there is nothing
+            # for the update timer (started by the change) to pass back:
+            if self._timer is not None:
+                self._timer.stop()
 
             # TODO: check the readonly flag and make sure the editor
             # is still readonly when we're done.
@@ -217,6 +243,93 @@ class SourceEditor ( Editor ):
 
         self._locked = False
 
+    #---------------------------------------------------------------------------
+    #  Replaces just the lines of the document that have changed:
+    #---------------------------------------------------------------------------
+
+    def _replace_lines ( self, old_value, new_value ):
+        """ Replaces just the lines of the document that differ between its
+            current text and the new text, as a single edit. This keeps the
+            undo history, the cursor position and the highlighting of the
+            lines that have not changed.
+        """
+        old_lines = old_value.split( '\n' )
+        new_lines = new_value.split( '\n' )
+        n_old     = len( old_lines )
+        n_new     = len( new_lines )
+
+        # Skip the lines that are the same at the start and the end, which is
+        # everything but the edited lines in the usual case of text being
+        # appended or changed in one place:
+        first = 0
+        limit = min( n_old, n_new )
+        while (first < limit) and (old_lines[ first ] == new_lines[ first ]):
+            first += 1
+        last = 0
+        while ((last < (limit - first)) and
+               (old_lines[ n_old - 1 - last ] == new_lines[ n_new - 1 - last ])):
+            last += 1
+
+        matcher = SequenceMatcher( None, old_lines[ first: n_old - last ],
+                                         new_lines[ first: n_new - last ] )
+        changes = [ ( i1 + first, i2 + first,
+                      new_lines[ j1 + first: j2 + first ] )
+                    for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+                    if tag != 'equal' ]
+
+        # Make the changes from the end of the document backwards, so that
+        # the positions of the lines still to be changed are not affected:
+        document = self._widget.code.document()
+        end      = document.characterCount() - 1
+        cursor   = QtGui.QTextCursor( document )
+        cursor.beginEditBlock()
+        for i1, i2, lines in reversed( changes ):
+            if i2 < n_old:
+                # Replace the lines, including the line break after each:
+                start = document.findBlockByNumber( i1 ).position()
+                stop  = document.findBlockByNumber( i2 ).position()
+                text  = u''.join( [ line + u'\n' for line in lines ] )
+            elif i1 > 0:
+                # Replace the lines at the end of the document, including the
+                # line break before each:
+                block = document.findBlockByNumber( i1 - 1 )
+                start = block.position() + block.length() - 1
+                stop  = end
+                text  = u''.join( [ u'\n' + line for line in lines ] )
+            else:
+                start = 0
+                stop  = end
+                text  = u'\n'.join( lines )
+            cursor.setPosition( start )
+            cursor.setPosition( stop, QtGui.QTextCursor.KeepAnchor )
+            if text:
+                cursor.insertText( text )
+            else:
+                cursor.removeSelectedText()
+        cursor.endEditBlock()
+
+    #---------------------------------------------------------------------------
+    #  Returns the text of the document:
+    #---------------------------------------------------------------------------
+
+    def _get_text ( self ):
+        """ Returns the text of the document.
+        """
+        if self._text is None:
+            self._text = unicode( self._widget.code.toPlainText() )
+
+        return self._text
+
+    #---------------------------------------------------------------------------
+    #  Handles the contents of the document being changed:
+    #---------------------------------------------------------------------------
+
+    def _contents_changed ( self, position, removed, added ):
+        """ Handles the contents of the document being changed by forgetting
+            the copy of its text, which is read again when it is next needed.
+        """
+        self._text = None
+
     #---------------------------------------------------------------------------
     #  Handles an error that occurs while setting the object's trait value:
     #---------------------------------------------------------------------------
@@ -40,6 +40,9 @@ ReadonlyColor = QtGui.QColor( 244, 243, 238 )
 # Color for background of fields where objects can be dropped
 DropColor = QtGui.QColor( 215, 242, 255 )
 
+# Color for background of items matching a search
+SearchColor = QtGui.QColor( 255, 255, 160 )
+
 # Color for an editable field
 EditableColor = _palette.color(QtGui.QPalette.Base)
 
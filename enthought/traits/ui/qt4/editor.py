@@ -35,6 +35,12 @@ class Editor ( UIEditor ):
     """ Base class for PyQt editors for Traits-based UIs.
     """
 
+    # Class constant: can the editor be moved over to an object of the same
+    # class (see 'rebind')? Editors that listen to the object for anything
+    # other than changes to the trait being edited must leave this False. It
+    # is not inherited: each class that can be rebound must set it itself:
+    rebindable = False
+
     def clear_layout(self):
         """ Delete the contents of a control's layout.
         """
@@ -57,6 +63,26 @@ class Editor ( UIEditor ):
         if control is not None:
             control._editor = self
 
+    #---------------------------------------------------------------------------
+    #  Moves the editor over to a new object:
+    #---------------------------------------------------------------------------
+
+    def rebind ( self, old_context_object, object ):
+        """ Moves the editor over to editing the same trait of a new object of
+            the same class. The UI context must already refer to the new
+            object, and *old_context_object* is the context object the editor
+            was listening to.
+        """
+        name = self.extended_name
+        if name != 'None':
+            old_context_object.on_trait_change( self._update_editor, name,
+                                                remove = True )
+            self.context_object.on_trait_change( self._update_editor, name,
+                                                 dispatch = 'ui' )
+
+        self.object = object
+        self.update_editor()
+
     #---------------------------------------------------------------------------
     #  Assigns focus to the editor's underlying toolkit widget:
     #---------------------------------------------------------------------------
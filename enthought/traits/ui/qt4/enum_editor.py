@@ -17,6 +17,10 @@
 #  Imports:
 #-------------------------------------------------------------------------------
 
+import weakref
+
+from bisect import bisect_left
+
 from string import capitalize
 
 from enthought.qt import QtCore, QtGui
@@ -39,6 +43,14 @@ from constants \
 from helper \
     import enum_values_changed
 
+#-------------------------------------------------------------------------------
+#  Constants:
+#-------------------------------------------------------------------------------
+
+# The list models shared by large enumeration editors, keyed by the object
+# providing the values and then by the name of the trait holding them:
+_shared_models = weakref.WeakKeyDictionary()
+
 #-------------------------------------------------------------------------------
 #  'BaseEditor' class:
 #-------------------------------------------------------------------------------
@@ -171,6 +183,12 @@ class SimpleEditor ( BaseEditor ):
     """ Simple style of enumeration editor, which displays a combo box.
     """
 
+    # The width (in characters) of the combo box for a large enumeration:
+    large_width = 20
+
+    # The maximum number of completions offered for a large enumeration:
+    large_completions = 100
+
     #---------------------------------------------------------------------------
     #  Finishes initializing the editor by creating the underlying toolkit
     #  widget:
@@ -183,13 +201,20 @@ class SimpleEditor ( BaseEditor ):
         super( SimpleEditor, self ).init( parent )
 
         self.control = control = self.create_combo_box()
-        control.addItems(self.names)
+
+        # The factory's 'large_values' option is intended for enumerations
+        # with many thousands of values:
+        large = getattr(self.factory, 'large_values', False)
+        if large:
+            self._init_large(control)
+        else:
+            control.addItems(self.names)
 
         QtCore.QObject.connect(control,
                                QtCore.SIGNAL('currentIndexChanged(QString)'),
                                self.update_object)
 
-        if self.factory.evaluate is not None:
+        if large or (self.factory.evaluate is not None):
             control.setEditable(True)
             QtCore.QObject.connect(control,
                                    QtCore.SIGNAL('editTextChanged(QString)'),
@@ -198,6 +223,115 @@ class SimpleEditor ( BaseEditor ):
         self._no_enum_update = 0
         self.set_tooltip()
 
+        if large:
+            self._init_completer(control)
+
+    #---------------------------------------------------------------------------
+    #  Sets up the combo box for a large enumeration:
+    #---------------------------------------------------------------------------
+
+    def _init_large ( self, control ):
+        """ Sets up the combo box for a large enumeration. The names are held
+            in a list model that is shared with every other large enumeration
+            editor using the same values, and the combo box is given a fixed
+            width rather than being sized to fit every name.
+        """
+        control.setSizeAdjustPolicy(
+                QtGui.QComboBox.AdjustToMinimumContentsLength)
+        control.setMinimumContentsLength(self.large_width)
+        control.setInsertPolicy(QtGui.QComboBox.NoInsert)
+        control.view().setUniformItemSizes(True)
+
+        if self._object is not None:
+            owner, name = self._object, self._name
+        else:
+            owner, name = self.factory, ''
+
+        models = _shared_models.setdefault(owner, {})
+        self._model = models.get(name)
+        if self._model is None:
+            self._model = models[name] = _EnumListModel()
+
+        self._model.set_names(self.names)
+        control.setModel(self._model)
+
+        # Ignore the changes of the current index caused by the shared model
+        # being reset:
+        QtCore.QObject.connect(self._model,
+                               QtCore.SIGNAL('modelAboutToBeReset()'),
+                               self._model_about_to_be_reset)
+        QtCore.QObject.connect(self._model, QtCore.SIGNAL('modelReset()'),
+                               self._model_reset)
+
+    #---------------------------------------------------------------------------
+    #  Sets up the prefix completion of a large enumeration:
+    #---------------------------------------------------------------------------
+
+    def _init_completer ( self, control ):
+        """ Sets up the prefix completion of a large enumeration.
+        """
+        self._completions = QtGui.QStringListModel(control)
+
+        completer = QtGui.QCompleter(self._completions, control)
+        completer.setCompletionMode(QtGui.QCompleter.UnfilteredPopupCompletion)
+
+        # The completions must be updated before the completer sees the text:
+        QtCore.QObject.connect(control.lineEdit(),
+                               QtCore.SIGNAL('textEdited(QString)'),
+                               self._update_completions)
+        control.setCompleter(completer)
+
+    #---------------------------------------------------------------------------
+    #  Updates the completions offered for the text being typed:
+    #---------------------------------------------------------------------------
+
+    def _update_completions ( self, text ):
+        """ Updates the completions offered for the text being typed.
+        """
+        self._completions.setStringList(
+                self._model.names_with_prefix(unicode(text),
+                                              self.large_completions))
+
+    #---------------------------------------------------------------------------
+    #  Handles the shared model of a large enumeration being reset:
+    #---------------------------------------------------------------------------
+
+    def _model_about_to_be_reset ( self ):
+        self._no_enum_update += 1
+
+    def _model_reset ( self ):
+        self._no_enum_update -= 1
+        self.update_editor()
+
+    #---------------------------------------------------------------------------
+    #  Disposes of the contents of an editor:
+    #---------------------------------------------------------------------------
+
+    def dispose ( self ):
+        """ Disposes of the contents of an editor.
+        """
+        if self._model is not None:
+            QtCore.QObject.disconnect(self._model,
+                                      QtCore.SIGNAL('modelAboutToBeReset()'),
+                                      self._model_about_to_be_reset)
+            QtCore.QObject.disconnect(self._model,
+                                      QtCore.SIGNAL('modelReset()'),
+                                      self._model_reset)
+
+        super( SimpleEditor, self ).dispose()
+
+    #---------------------------------------------------------------------------
+    #  Returns the index of a name in the combo box:
+    #---------------------------------------------------------------------------
+
+    def _index_for ( self, name ):
+        """ Returns the index of a name in the combo box.
+        """
+        if self._model is not None:
+            return self._model.row_for(name)
+
+        return self.names.index(name)
+
     #---------------------------------------------------------------------------
     #  Returns the QComboBox used for the editor control:
     #---------------------------------------------------------------------------
@@ -238,8 +372,15 @@ class SimpleEditor ( BaseEditor ):
             try:
                 value = self.mapping[value]
             except:
+                # A large enumeration without an evaluate function only
+                # accepts complete names.
+                evaluate = self.factory.evaluate
+                if evaluate is None:
+                    self.error( KeyError( value ) )
+                    return
+
                 try:
-                    value = self.factory.evaluate(value)
+                    value = evaluate(value)
                 except Exception, excp:
                     self.error( excp )
                     return
@@ -261,7 +402,7 @@ class SimpleEditor ( BaseEditor ):
             self._no_enum_update += 1
             if self.factory.evaluate is None:
                 try:
-                    index = self.names.index(self.inverse_mapping[self.value])
+                    index = self._index_for(self.inverse_mapping[self.value])
                     self.control.setCurrentIndex(index)
                 except:
                     self.control.setCurrentIndex(-1)
@@ -300,13 +441,98 @@ class SimpleEditor ( BaseEditor ):
         """ Rebuilds the contents of the editor whenever the original factory
             object's **values** trait changes.
         """
-        self.control.blockSignals(True)
-        self.control.clear()
-        self.control.addItems(self.names)
-        self.control.blockSignals(False)
+        if self._model is not None:
+            # Any other editors sharing the model are updated by it.
+            self._model.set_names(self.names)
+        else:
+            self.control.blockSignals(True)
+            self.control.clear()
+            self.control.addItems(self.names)
+            self.control.blockSignals(False)
 
         self.update_editor()
 
+#-------------------------------------------------------------------------------
+#  '_EnumListModel' class:
+#-------------------------------------------------------------------------------
+
+class _EnumListModel ( QtCore.QAbstractListModel ):
+    """ A list model of the names of a large enumeration that may be shared by
+        several combo boxes. It also provides constant time lookup of the row
+        of a name and a sorted index of the names for prefix completion.
+    """
+
+    def __init__ ( self ):
+        """ Initialise the object.
+        """
+        QtCore.QAbstractListModel.__init__( self )
+
+        self._names = []
+        self._rows  = {}
+        self._keys  = None
+
+    #---------------------------------------------------------------------------
+    #  QAbstractItemModel interface:
+    #---------------------------------------------------------------------------
+
+    def rowCount ( self, mi = QtCore.QModelIndex() ):
+        """ Reimplemented to return the number of names.
+        """
+        if mi.isValid():
+            return 0
+
+        return len( self._names )
+
+    def data ( self, mi, role ):
+        """ Reimplemented to return the data.
+        """
+        if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.EditRole:
+            return self._names[ mi.row() ]
+
+        return None
+
+    #---------------------------------------------------------------------------
+    #  Public interface:
+    #---------------------------------------------------------------------------
+
+    def set_names ( self, names ):
+        """ Sets the names in the model, unless they are unchanged.
+        """
+        if names == self._names:
+            return
+
+        self._names = list( names )
+        self._rows  = dict( [ ( name, row )
+                              for row, name in enumerate( self._names ) ] )
+        self._keys  = None
+        self.reset()
+
+    def row_for ( self, name ):
+        """ Returns the row of a name.
+        """
+        return self._rows[ name ]
+
+    def names_with_prefix ( self, prefix, limit ):
+        """ Returns up to 'limit' names, in sorted order, that start with a
+            prefix (ignoring case).
+        """
+        keys = self._keys
+        if keys is None:
+            keys = self._keys = sorted( [ ( name.lower(), name )
+                                          for name in self._names ] )
+
+        prefix = prefix.lower()
+        start  = bisect_left( keys, ( prefix, ) )
+        result = []
+        for i in xrange( start, min( len( keys ), start + limit ) ):
+            key, name = keys[ i ]
+            if not key.startswith( prefix ):
+                break
+
+            result.append( name )
+
+        return result
+
 #-------------------------------------------------------------------------------
 #  'RadioEditor' class:
 #-------------------------------------------------------------------------------
@@ -3,6 +3,7 @@ from enthought.qt import QtGui, QtCore
 from enthought.traits.api import Float, Any, Str, Trait
 from enthought.traits.ui.editors.api import RangeEditor
 from enthought.traits.ui.qt4.editor import Editor
+from enthought.traits.ui.qt4.helper import SliderWriter
 from enthought.traits.ui.qt4.extra.range_slider import RangeSlider
 
 class _BoundsEditor(Editor):
@@ -62,6 +63,9 @@ class _BoundsEditor(Editor):
 
         QtCore.QObject.connect(slider, QtCore.SIGNAL('sliderMoved(int)'),
                 self.update_object_on_scroll)
+        self._writer = SliderWriter(slider, self._write_bounds,
+                getattr(factory, 'drag_rate', 0),
+                getattr(factory, 'commit_on_release', False))
         panel.addWidget(slider)
 
         self._label_hi = QtGui.QLineEdit(self.format % self.high)
@@ -126,18 +130,35 @@ class _BoundsEditor(Editor):
         low = self._convert_from_slider(self.control.slider.low())
         high = self._convert_from_slider(self.control.slider.high())
 
-        if self.factory.is_float:
-            self.low = low
-            self.high = high
-        else:
-            self.low = int(low)
-            self.high = int(high)
+        if not self.factory.is_float:
+            low = int(low)
+            high = int(high)
+
+        self._label_lo.setText(self.format % low)
+        self._label_hi.setText(self.format % high)
+        self._writer.write((low, high))
+
+    def _write_bounds(self, bounds):
+        """ Writes the bounds from the slider to the object.
+        """
+        low, high = bounds
+
+        self.low = low
+        self.high = high
 
+        if not self.factory.is_float:
             # update the sliders to the int values or the sliders
             # will jiggle
             self.control.slider.setLow(self._convert_to_slider(low))
             self.control.slider.setHigh(self._convert_to_slider(high))
 
+    def dispose(self):
+        """ Disposes of the contents of an editor.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+
+        super(_BoundsEditor, self).dispose()
 
     def update_editor(self):
         return
@@ -104,6 +104,7 @@ class RangeSlider(QtGui.QSlider):
                 self.click_offset = self.__pixelPosToRangeValue(self.__pick(event.pos()))
                 self.triggerAction(self.SliderMove)
                 self.setRepeatAction(self.SliderNoAction)
+                self.setSliderDown(True)
         else:
             event.ignore()
 
@@ -144,6 +145,19 @@ class RangeSlider(QtGui.QSlider):
 
         self.emit(QtCore.SIGNAL('sliderMoved(int)'), new_pos)
 
+    def mouseReleaseEvent(self, event):
+        if self.pressed_control != QtGui.QStyle.SC_SliderHandle:
+            event.ignore()
+            return
+
+        event.accept()
+        self.pressed_control = QtGui.QStyle.SC_None
+
+        # This emits sliderReleased() so that the final position of a drag
+        # can be acted on.
+        self.setSliderDown(False)
+        self.update()
+
     def __pick(self, pt):
         if self.orientation() == QtCore.Qt.Horizontal:
             return pt.x()
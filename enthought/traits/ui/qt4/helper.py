@@ -18,6 +18,7 @@
 #-------------------------------------------------------------------------------
 
 import os.path
+import time
 
 from enthought.qt import QtCore, QtGui
 
@@ -238,6 +239,76 @@ class IconButton(QtGui.QPushButton):
 
         QtCore.QObject.connect(self, QtCore.SIGNAL('clicked()'), slot)
 
+#-------------------------------------------------------------------------------
+#  'SliderWriter' class:
+#-------------------------------------------------------------------------------
+
+class SliderWriter(QtCore.QObject):
+    """ Controls how often the values of a slider that is being dragged are
+        written to the object.  While the slider is down values are written at
+        most 'rate' times a second (or not at all if 'on_release' is set) and
+        the last value is always written when the slider is released.  Values
+        that don't come from a drag (eg. from the keyboard) are written
+        immediately.
+    """
+
+    def __init__(self, slider, write, rate=0, on_release=False):
+        """ Initialise the object.  'write' is called with each value that is
+            to be written.  A 'rate' of 0 means that values are written as
+            they arrive.
+        """
+        QtCore.QObject.__init__(self, slider)
+
+        self._slider = slider
+        self._write = write
+        self._on_release = on_release
+        self._pending = None
+        self._last = 0.0
+
+        if rate > 0:
+            self._interval = 1.0 / rate
+        else:
+            self._interval = 0.0
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        QtCore.QObject.connect(self._timer, QtCore.SIGNAL('timeout()'),
+                self.flush)
+
+        QtCore.QObject.connect(slider, QtCore.SIGNAL('sliderReleased()'),
+                self.flush)
+
+    def write(self, value):
+        """ Writes a value now or later depending on the state of the slider.
+        """
+        self._pending = (value,)
+
+        if not self._slider.isSliderDown():
+            self.flush()
+        elif not self._on_release:
+            wait = self._last + self._interval - time.time()
+            if wait <= 0.0:
+                self.flush()
+            elif not self._timer.isActive():
+                self._timer.start(int(wait * 1000) + 1)
+
+    def flush(self):
+        """ Writes any value that is waiting to be written.
+        """
+        self._timer.stop()
+
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            self._last = time.time()
+            self._write(*pending)
+
+    def cancel(self):
+        """ Discards any value that is waiting to be written.
+        """
+        self._timer.stop()
+        self._pending = None
+
 #-------------------------------------------------------------------------------
 #  Dock-related stubs.
 #-------------------------------------------------------------------------------
@@ -344,6 +344,14 @@ class CustomEditor ( Editor ):
         """
         panel = self._panel
         if panel is not None:
+            # If the new value can be displayed using the existing contents of
+            # the panel, simply move them over to it:
+            value = self.value
+            if isinstance( value, HasTraits ):
+                view = self.view_for( value, self.item_for( value ) )
+                if (self._ui is not None) and self._rebind_ui( value, view ):
+                    return
+
             # Dispose of the previous contents of the panel:
             layout = panel.layout()
             if layout is None:
@@ -361,26 +369,24 @@ class CustomEditor ( Editor ):
 
             # Create the new content for the panel:
             stretch = 0
-            value   = self.value
             if not isinstance( value, HasTraits ):
                 str_value = ''
                 if value is not None:
                     str_value = self.str_value
                 control = QtGui.QLabel(str_value)
             else:
-                view    = self.view_for( value, self.item_for( value ) )
-                context = value.trait_context()
+                context = self._context_for( value )
                 handler = None
                 if isinstance( value, Handler ):
                     handler = value
-                context.setdefault( 'context', self.object )
-                context.setdefault( 'context_handler', self.ui.handler )
                 self._ui = ui = view.ui( context, panel, 'subpanel',
                                          value.trait_view_elements(), handler,
                                          self.factory.id )
                 control         = ui.control
                 self.scrollable = ui._scrollable
                 ui.parent       = self.ui
+                self._ui_view   = view
+                self._ui_class  = value.__class__
 
                 if view.resizable or view.scrollable or ui._scrollable:
                     stretch = 1
@@ -388,6 +394,76 @@ class CustomEditor ( Editor ):
             # FIXME: Handle stretch.
             layout.addWidget(control)
 
+    #---------------------------------------------------------------------------
+    #  Returns the context of the UI used to display a specified value:
+    #---------------------------------------------------------------------------
+
+    def _context_for ( self, value ):
+        """ Returns the context of the UI used to display a specified value.
+        """
+        context = value.trait_context()
+        context.setdefault( 'context', self.object )
+        context.setdefault( 'context_handler', self.ui.handler )
+
+        return context
+
+    #---------------------------------------------------------------------------
+    #  Moves the current UI over to a new value:
+    #---------------------------------------------------------------------------
+
+    def _rebind_ui ( self, value, view ):
+        """ Moves the current UI over to a new value of the same class that is
+            displayed using the same view, keeping all of its widgets and
+            editors. Returns False, having changed nothing, if the UI must be
+            rebuilt instead.
+        """
+        ui = self._ui
+        if ((view is not self._ui_view) or
+            (value.__class__ is not self._ui_class) or
+            isinstance( value, Handler ) or
+            (ui.handler.__class__ is not Handler)):
+            return False
+
+        context     = self._context_for( value )
+        old_context = ui.context
+        if sorted( context.keys() ) != sorted( old_context.keys() ):
+            return False
+
+        changed = [ name for name, object in context.items()
+                    if object is not old_context[ name ] ]
+
+        # Every editor of a changed context object must be able to follow it:
+        editors = []
+        for editor in ui._editors:
+            if editor.object_name.split( '.', 1 )[0] in changed:
+                if ((not type( editor ).__dict__.get( 'rebindable', False )) or
+                    editor._user_to or editor._user_from):
+                    return False
+
+                editors.append( ( editor, editor.context_object ) )
+
+        # Move any handler of 'when' expressions over to the new objects:
+        when = ui._enabled or ui._visible or ui._checked
+        for name in changed:
+            if when:
+                old_context[ name ].on_trait_change( ui._evaluate_when,
+                                                     remove = True )
+                context[ name ].on_trait_change( ui._evaluate_when,
+                                                 dispatch = 'ui' )
+
+            ui.info.bind( name, context[ name ] )
+
+        old_context.update( context )
+
+        for editor, old_object in editors:
+            editor.rebind( old_object,
+                           eval( editor.object_name, globals(), context ) )
+
+        if when:
+            ui._evaluate_when()
+
+        return True
+
     #---------------------------------------------------------------------------
     #  Disposes of the contents of an editor:
     #---------------------------------------------------------------------------
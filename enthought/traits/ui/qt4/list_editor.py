@@ -100,19 +100,36 @@ class SimpleEditor ( Editor ):
             trait_handler = self.object.base_trait( self.name ).handler
         self._trait_handler = trait_handler
 
-        # Create a scrolled window to hold all of the list item controls:
-        self.control = QtGui.QScrollArea()
-        self.control.setFrameShape(QtGui.QFrame.NoFrame)
-        self.control.setWidgetResizable(True)
+        # Only create editors for the visible items of the list (recycling
+        # them as the list is scrolled) if requested:
+        self._virtual = getattr( self.factory, 'virtual', False )
+
+        if self._virtual:
+            # Create a widget holding a fixed number of item rows and a scroll
+            # bar selecting the list items they display:
+            self.control = _VirtualListWidget()
+            self._list_pane = self.control.pane
+            self._visible = 0
+            self._empty = False
+        else:
+            # Create a scrolled window to hold all of the list item controls:
+            self.control = QtGui.QScrollArea()
+            self.control.setFrameShape(QtGui.QFrame.NoFrame)
+            self.control.setWidgetResizable(True)
+
+            # Create a widget with a grid layout as the container.
+            self._list_pane = QtGui.QWidget()
 
-        # Create a widget with a grid layout as the container.
-        self._list_pane = QtGui.QWidget()
         self._list_pane.setSizePolicy(QtGui.QSizePolicy.Expanding,
                                       QtGui.QSizePolicy.Expanding)
         layout = QtGui.QGridLayout(self._list_pane)
         layout.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
         layout.setMargin(0)
 
+        # The controls for each row of the list, in the form returned by
+        # _create_row():
+        self._rows = []
+
         # Remember the editor to use for each individual list item:
         editor = self.factory.editor
         if editor is None:
@@ -152,48 +169,30 @@ class SimpleEditor ( Editor ):
         """ Updates the editor when the object trait changes externally to the
             editor.
         """
+        if self._virtual:
+            self._update_rows()
+            return
+
         # Disconnect the editor from any control about to be destroyed:
         self._dispose_items()
 
-        list_pane = self._list_pane
-        layout = list_pane.layout()
-
         # Create all of the list item trait editors:
         trait_handler = self._trait_handler
         resizable     = ((trait_handler.minlen != trait_handler.maxlen) and
                          self.mutable)
-        item_trait    = trait_handler.item_trait
 
         is_fake = (resizable and (len( self.value ) == 0))
         if is_fake:
            self.empty_list()
 
-        editor = self._editor
         # FIXME: Add support for more than one column.
-        for index, value in enumerate(self.value):
-            if resizable:
-                control = IconButton('list_editor.png', self.popup_menu)
-                layout.addWidget(control, index, 0)
-
-            proxy = ListItemProxy( self.object, self.name, index, item_trait,
-                                   value )
-            if resizable:
-                control.proxy = proxy
-            peditor = editor( self.ui, proxy, 'value', self.description,
-                              list_pane ).set( object_name = '' )
-            peditor.prepare( list_pane )
-            pcontrol = peditor.control
-            pcontrol.proxy = proxy
-
-            if isinstance(pcontrol, QtGui.QWidget):
-                layout.addWidget(pcontrol, index, 1)
-            else:
-                layout.addLayout(pcontrol, index, 1)
+        self._rows = [ self._create_row( index )
+                       for index in range( len( self.value ) ) ]
 
         # QScrollArea can have problems if the widget being scrolled is set too
         # early (ie. before it contains something).
         if self.control.widget() is None:
-            self.control.setWidget(list_pane)
+            self.control.setWidget(self._list_pane)
 
     #---------------------------------------------------------------------------
     #  Updates the editor when an item in the object trait changes external to
@@ -204,21 +203,52 @@ class SimpleEditor ( Editor ):
         """ Updates the editor when an item in the object trait changes
         externally to the editor.
         """
-        # If this is not a simple, single item update, rebuild entire editor:
-        if (len( event.removed ) != 1) or (len( event.added ) != 1):
+        # The rows of a virtualized list just need rebinding to their items:
+        if self._virtual:
+            self._update_rows()
+            return
+
+        index   = event.index
+        removed = len( event.removed )
+        added   = len( event.added )
+        rows    = self._rows
+
+        # Rebuild the entire editor if the change can't be applied row by row
+        # (e.g. it is an extended slice, or to or from an empty list):
+        if ((not isinstance( index, int )) or (len( rows ) == 0) or
+            (len( self.value ) == 0) or
+            (len( rows ) != (len( self.value ) - added + removed))):
             self.update_editor()
             return
 
-        # Otherwise, find the proxy for this index and update it with the
-        # changed value:
-        for control in self.control.widget().children():
-            if isinstance(control, QtGui.QLayout):
-                continue
+        # Replaced items simply update the proxies of their existing rows:
+        n = min( removed, added )
+        for i in range( index, index + n ):
+            self._set_proxy( rows[i][1], i, self.value[i] )
 
-            proxy = control.proxy
-            if proxy.index == event.index:
-                proxy.value = event.added[0]
-                break
+        if removed == added:
+            return
+
+        # Destroy the rows of any other removed items:
+        for info in rows[ index + n: index + removed ]:
+            self._destroy_row( info )
+        del rows[ index + n: index + removed ]
+
+        # Move and renumber the rows following the change (rows that were
+        # removed have already been deleted from 'rows', while the rows for
+        # added items have yet to be inserted into it):
+        start = index + n
+        delta = added - removed
+        if delta > 0:
+            for i in range( len( rows ) - 1, start - 1, -1 ):
+                self._move_row( rows[i], i + delta )
+        else:
+            for i in range( start, len( rows ) ):
+                self._move_row( rows[i], i )
+
+        # Create the rows for any other added items:
+        rows[ start: start ] = [ self._create_row( i )
+                                 for i in range( start, index + added ) ]
 
     #---------------------------------------------------------------------------
     #  Creates an empty list entry (so the user can add a new item):
@@ -405,6 +435,190 @@ class SimpleEditor ( Editor ):
             child = layout.takeAt(0)
         del child
 
+        self._rows = []
+        if self._virtual:
+            self._empty = False
+
+    def _set_proxy ( self, proxy, index, value ):
+        """ Sets the index and value of an item proxy without updating the list.
+        """
+        proxy.inited = False
+        proxy.index  = index
+        proxy.value  = value
+        proxy.inited = True
+
+    def _destroy_row ( self, info ):
+        """ Disposes of the editor and controls for a row of the list.
+        """
+        layout = self._list_pane.layout()
+        control, proxy, peditor = info
+        pcontrol = peditor.control
+        peditor.dispose()
+        peditor.control = None
+
+        if control is not None:
+            layout.removeWidget(control)
+            control.deleteLater()
+
+        if isinstance(pcontrol, QtGui.QWidget):
+            layout.removeWidget(pcontrol)
+            pcontrol.deleteLater()
+        else:
+            layout.removeItem(pcontrol)
+            for i in range(pcontrol.count()):
+                widget = pcontrol.itemAt(i).widget()
+                if widget is not None:
+                    widget.deleteLater()
+            pcontrol.setParent(None)
+
+    def _move_row ( self, info, row ):
+        """ Moves the controls for a row of the list to a new row of the grid,
+            renumbering its proxy to match.
+        """
+        layout = self._list_pane.layout()
+        control, proxy, peditor = info
+        pcontrol = peditor.control
+        proxy.index = row
+
+        if control is not None:
+            layout.removeWidget(control)
+            layout.addWidget(control, row, 0)
+
+        if isinstance(pcontrol, QtGui.QWidget):
+            layout.removeWidget(pcontrol)
+            layout.addWidget(pcontrol, row, 1)
+        else:
+            layout.removeItem(pcontrol)
+            pcontrol.setParent(None)
+            layout.addLayout(pcontrol, row, 1)
+
+    def _create_row ( self, row ):
+        """ Creates the controls for a specified row of the list (initially
+            displaying the list item with the same index), returning them as a
+            list of the form: [ list menu button, item proxy, item editor ].
+        """
+        layout = self._list_pane.layout()
+        index  = min( row, len( self.value ) - 1 )
+
+        trait_handler = self._trait_handler
+        resizable     = ((trait_handler.minlen != trait_handler.maxlen) and
+                         self.mutable)
+
+        proxy = ListItemProxy( self.object, self.name, index,
+                               trait_handler.item_trait, self.value[ index ] )
+
+        control = None
+        if resizable:
+            control = IconButton('list_editor.png', self.popup_menu)
+            control.proxy = proxy
+            layout.addWidget(control, row, 0)
+
+        peditor = self._editor( self.ui, proxy, 'value', self.description,
+                                self._list_pane ).set( object_name = '' )
+        peditor.prepare( self._list_pane )
+        pcontrol = peditor.control
+        pcontrol.proxy = proxy
+
+        if isinstance(pcontrol, QtGui.QWidget):
+            layout.addWidget(pcontrol, row, 1)
+        else:
+            layout.addLayout(pcontrol, row, 1)
+
+        return [ control, proxy, peditor ]
+
+    #-- Virtualized List Methods -----------------------------------------------
+
+    def _update_rows ( self ):
+        """ Updates a virtualized list editor after the list has changed.
+        """
+        trait_handler = self._trait_handler
+        resizable     = ((trait_handler.minlen != trait_handler.maxlen) and
+                         self.mutable)
+        is_fake       = (resizable and (len( self.value ) == 0))
+
+        # Switch between the 'empty list' entry and the item rows if needed:
+        if is_fake != self._empty:
+            self._dispose_items()
+            if is_fake:
+                self.empty_list()
+                self._empty = True
+
+        self._layout_rows()
+
+    def _layout_rows ( self ):
+        """ Makes sure there are enough rows to fill the visible area of a
+            virtualized list editor, and then binds them to their items.
+        """
+        scroll_bar = self.control.scroll_bar
+        n          = len( self.value )
+        if self._empty or (n == 0):
+            for row in self._rows:
+                self._show_row( row, False )
+            scroll_bar.setRange( 0, 0 )
+            return
+
+        # The first row is used to determine the height of all rows:
+        rows = self._rows
+        if len( rows ) == 0:
+            rows.append( self._create_row( 0 ) )
+
+        height  = self._list_pane.height()
+        visible = max( 1, min( n, height / self._row_height() ) )
+        while len( rows ) < visible:
+            rows.append( self._create_row( len( rows ) ) )
+        self._visible = visible
+
+        # Note that changing the range may also change the value, and so
+        # rebind the rows:
+        scroll_bar.setPageStep( visible )
+        scroll_bar.setRange( 0, n - visible )
+        self._bind_rows()
+
+    def _row_height ( self ):
+        """ Returns the height of a row of a virtualized list editor (based on
+            the first row).
+        """
+        control, proxy, peditor = self._rows[0]
+        height = peditor.control.sizeHint().height()
+        if control is not None:
+            height = max( height, control.sizeHint().height() )
+
+        return max( 1, height + max( 0,
+                                     self._list_pane.layout().verticalSpacing() ) )
+
+    def _bind_rows ( self ):
+        """ Binds each row of a virtualized list editor to the list item it
+            currently displays.
+        """
+        if self._empty:
+            return
+
+        value = self.value
+        first = self.control.scroll_bar.value()
+        for row, info in enumerate( self._rows ):
+            index = first + row
+            shown = (row < self._visible) and (index < len( value ))
+            if shown:
+                # Recycle the row's proxy (and so its editor) for the item:
+                self._set_proxy( info[1], index, value[ index ] )
+            self._show_row( info, shown )
+
+    def _show_row ( self, info, shown ):
+        """ Shows or hides the controls for a row of a virtualized list editor.
+        """
+        control, proxy, peditor = info
+        if control is not None:
+            control.setVisible( shown )
+
+        pcontrol = peditor.control
+        if isinstance(pcontrol, QtGui.QWidget):
+            pcontrol.setVisible( shown )
+        else:
+            for i in range( pcontrol.count() ):
+                widget = pcontrol.itemAt( i ).widget()
+                if widget is not None:
+                    widget.setVisible( shown )
+
     #-- Trait initializers ----------------------------------------------------
 
     def _kind_default(self):
@@ -417,6 +631,55 @@ class SimpleEditor ( Editor ):
         """
         return self.factory.mutable
 
+#-------------------------------------------------------------------------------
+#  '_VirtualListWidget' class:
+#-------------------------------------------------------------------------------
+
+class _VirtualListWidget ( QtGui.QWidget ):
+    """ The control used by a virtualized list editor. It contains a pane
+        holding just enough item rows to fill the visible area, and a scroll
+        bar selecting which list items those rows display.
+    """
+
+    def __init__ ( self ):
+        """ Initialise the widget.
+        """
+        QtGui.QWidget.__init__(self)
+
+        self.pane = QtGui.QWidget()
+        self.scroll_bar = QtGui.QScrollBar(QtCore.Qt.Vertical)
+        self.scroll_bar.setRange(0, 0)
+
+        layout = QtGui.QHBoxLayout(self)
+        layout.setMargin(0)
+        layout.addWidget(self.pane, 1)
+        layout.addWidget(self.scroll_bar)
+
+        self.connect(self.scroll_bar, QtCore.SIGNAL('valueChanged(int)'),
+                self._scrolled)
+
+    def resizeEvent ( self, event ):
+        """ Reimplemented to create or hide rows to fit the new size.
+        """
+        QtGui.QWidget.resizeEvent(self, event)
+
+        editor = getattr(self, '_editor', None)
+        if (editor is not None) and (editor.control is self):
+            editor._layout_rows()
+
+    def wheelEvent ( self, event ):
+        """ Reimplemented to scroll the list when the wheel is used over any of
+            the rows.
+        """
+        QtGui.QApplication.sendEvent(self.scroll_bar, event)
+
+    def _scrolled ( self, value ):
+        """ Handles the scroll bar being moved.
+        """
+        editor = getattr(self, '_editor', None)
+        if (editor is not None) and (editor.control is self):
+            editor._bind_rows()
+
 #-------------------------------------------------------------------------------
 #  'CustomEditor' class:
 #-------------------------------------------------------------------------------
@@ -501,6 +764,12 @@ class NotebookEditor ( Editor ):
         """
         self._uis = []
 
+        # If requested, only build the view for a page when it is first shown,
+        # and limit the number of built views kept for pages not being shown:
+        self._deferred = getattr( self.factory, 'deferred', False )
+        self._max_page_uis = getattr( self.factory, 'max_page_uis', 0 )
+        self._recent = []
+
         # Create a tab widget to hold each separate object's view:
         self.control = QtGui.QTabWidget()
         signal = QtCore.SIGNAL( 'currentChanged(int)' )
@@ -545,10 +814,10 @@ class NotebookEditor ( Editor ):
 
         # Create a tab page for each object in the trait's value:
         for object in self.value:
-            ui, view_object, monitoring = self._create_page(object)
-
             # Remember the page for later deletion processing:
-            self._uis.append([ui.control, ui, view_object, monitoring])
+            self._uis.append(list(self._create_page(object)))
+
+        self._build_current()
 
     #---------------------------------------------------------------------------
     #  Handles some subset of the trait's list being updated:
@@ -563,12 +832,15 @@ class NotebookEditor ( Editor ):
         page_name = self.factory.page_name[1:]
 
         for i in event.removed:
-            page, ui, view_object, monitoring = self._uis[index]
+            info = self._uis[index]
+            page, ui, view_object, monitoring = info
             if monitoring:
                 view_object.on_trait_change(self.update_page_name, page_name,
                         remove=True)
-            ui.dispose()
+            self._dispose_page(info)
             self.control.removeTab(self.control.indexOf(page))
+            if self._deferred:
+                page.deleteLater()
 
             if self.factory.show_notebook_menu:
                 for name,tmp in self._pagewidgets.items():
@@ -582,16 +854,18 @@ class NotebookEditor ( Editor ):
         # Add a page for each added object:
         first_page = None
         for object in event.added:
-            ui, view_object, monitoring  = self._create_page(object)
-            self._uis[index:index] = [[ui.control, ui, view_object, monitoring]]
+            info = list(self._create_page(object))
+            self._uis[index:index] = [info]
             index += 1
 
             if first_page is None:
-                first_page = ui.control
+                first_page = info[0]
 
         if first_page is not None:
             self.control.setCurrentWidget(first_page)
 
+        self._build_current()
+
     #---------------------------------------------------------------------------
     #  Closes the currently selected tab:
     #---------------------------------------------------------------------------
@@ -603,7 +877,7 @@ class NotebookEditor ( Editor ):
         for i in xrange( len( self._uis ) ):
             page, ui, _, _ = self._uis[i]
             if page is widget:
-                if force or ui.handler.close( ui.info, True ):
+                if force or (ui is None) or ui.handler.close( ui.info, True ):
                     del self.value[i]
                 break
 
@@ -633,15 +907,19 @@ class NotebookEditor ( Editor ):
         """
         page_name = self.factory.page_name[1:]
 
-        for _, ui, view_object, monitoring in self._uis:
+        for info in self._uis:
+            page, ui, view_object, monitoring = info
             if monitoring:
                 view_object.on_trait_change(self.update_page_name, page_name,
                         remove=True)
-            ui.dispose()
+            self._dispose_page(info)
+            if self._deferred:
+                page.deleteLater()
 
         # Reset the list of ui's and dictionary of page name counts:
         self._uis = []
         self._pages = {}
+        self._recent = []
 
         self.control.clear()
 
@@ -666,8 +944,8 @@ class NotebookEditor ( Editor ):
         """ Handles the trait defining a particular page's name being changed.
         """
         for i, value in enumerate(self._uis):
-            page, ui, _, _ = value
-            if object is ui.info.object:
+            page, ui, view_object, _ = value
+            if object is view_object:
                 name = None
                 handler = getattr(self.ui.handler,
                         '%s_%s_page_name' % (self.object_name, self.name),
@@ -686,15 +964,26 @@ class NotebookEditor ( Editor ):
     #---------------------------------------------------------------------------
 
     def _create_page ( self, object ):
+        """ Creates a page for a specified object and adds it to the tab
+            widget. Returns a tuple of the form: ( page widget, ui, view
+            object, whether the page name is being monitored ), where the ui is
+            None if building the page's view has been deferred.
+        """
         # Create the view for the object:
         view_object = object
         factory = self.factory
         if factory.factory is not None:
             view_object = factory.factory(object)
-        ui = view_object.edit_traits( parent = self.control,
-                                 view   = factory.view,
-                                 kind   = factory.ui_kind ).set(
-                                 parent = self.ui )
+
+        if self._deferred:
+            # Use an empty placeholder page to hold the view once it is built:
+            ui   = None
+            page = QtGui.QWidget()
+            layout = QtGui.QVBoxLayout(page)
+            layout.setMargin(0)
+        else:
+            ui   = self._create_ui(view_object)
+            page = ui.control
 
         # Get the name of the page being added to the notebook:
         name       = ''
@@ -737,9 +1026,9 @@ class NotebookEditor ( Editor ):
             image = method( self.ui.info, object )
 
         if image is None:
-            self.control.addTab(ui.control, name)
+            self.control.addTab(page, name)
         else:
-            self.control.addTab(ui.control, image, name)
+            self.control.addTab(page, image, name)
 
         if self.factory.show_notebook_menu:
             newaction = self._context_menu.addAction(name)
@@ -748,24 +1037,95 @@ class NotebookEditor ( Editor ):
             newaction.setChecked(True)
             newaction.triggered.connect(lambda e,name=name: self._menu_action(e,name=name))
             self._action_dict[name] = newaction
-            self._pagewidgets[name] = ui.control
+            self._pagewidgets[name] = page
 
-        return (ui, view_object, monitoring)
+        return (page, ui, view_object, monitoring)
+
+    #---------------------------------------------------------------------------
+    #  Creates the Traits UI for a page's object:
+    #---------------------------------------------------------------------------
+
+    def _create_ui ( self, view_object ):
+        """ Creates the Traits UI for a page's object.
+        """
+        factory = self.factory
+        return view_object.edit_traits( parent = self.control,
+                                        view   = factory.view,
+                                        kind   = factory.ui_kind ).set(
+                                        parent = self.ui )
+
+    #---------------------------------------------------------------------------
+    #  Makes sure the view for a deferred page has been built:
+    #---------------------------------------------------------------------------
+
+    def _build_page ( self, info ):
+        """ Makes sure the view for a deferred page has been built, disposing
+            of the views of the least recently shown pages if there are now
+            too many.
+        """
+        if not self._deferred:
+            return
+
+        page, ui, view_object, monitoring = info
+        if ui is None:
+            info[1] = ui = self._create_ui(view_object)
+            page.layout().addWidget(ui.control)
+
+        recent = self._recent
+        for i, other in enumerate(recent):
+            if other is info:
+                del recent[i]
+                break
+        recent.append(info)
+
+        if self._max_page_uis > 0:
+            while len(recent) > self._max_page_uis:
+                self._dispose_page(recent[0])
+
+    def _build_current ( self ):
+        """ Makes sure the view for the current page has been built.
+        """
+        if self._deferred:
+            widget = self.control.currentWidget()
+            for info in self._uis:
+                if info[0] is widget:
+                    self._build_page(info)
+                    break
+
+    #---------------------------------------------------------------------------
+    #  Disposes of the view for a page:
+    #---------------------------------------------------------------------------
+
+    def _dispose_page ( self, info ):
+        """ Disposes of the view for a page (if it has been built), leaving a
+            deferred page's placeholder to rebuild it later.
+        """
+        ui = info[1]
+        if ui is not None:
+            ui.dispose()
+            info[1] = None
+
+        recent = self._recent
+        for i, other in enumerate(recent):
+            if other is info:
+                del recent[i]
+                break
 
     def _tab_activated(self, idx):
         """ Handles a notebook tab being "activated" (i.e. clicked on) by the
             user.
         """
         widget = self.control.widget(idx)
-        for page, ui, _, _ in self._uis:
-            if page is widget:
-                self.selected = ui.info.object
+        for info in self._uis:
+            if info[0] is widget:
+                self._build_page(info)
+                self.selected = info[1].info.object
                 break
     def _selected_changed(self, selected):
         """ Handles the **selected** trait being changed.
         """
-        for page, ui, _, _ in self._uis:
-            if ui.info and selected is ui.info.object:
+        for page, ui, view_object, _ in self._uis:
+            if ((ui is None) or ui.info) and selected is view_object:
                 self.control.setCurrentWidget(page)
                 break
 
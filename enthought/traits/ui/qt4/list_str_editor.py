@@ -163,7 +163,7 @@ class _ListStrEditor(Editor):
         # Make sure we listen for 'items' changes as well as complete list
         # replacements:
         self.context_object.on_trait_change(
-            self.update_editor, self.extended_name + '_items', dispatch='ui')
+            self._update_items, self.extended_name + '_items', dispatch='ui')
 
         # Create the mapping from user supplied images to QIcons:
         for image_resource in factory.images:
@@ -180,7 +180,7 @@ class _ListStrEditor(Editor):
         """ Disposes of the contents of an editor.
         """
         self.context_object.on_trait_change(
-            self.update_editor, self.extended_name + '_items', remove=True)
+            self._update_items, self.extended_name + '_items', remove=True)
 
         self.on_trait_change(
             self.refresh_editor, 'adapter.+update', remove=True)
@@ -199,6 +199,7 @@ class _ListStrEditor(Editor):
     def refresh_editor(self):
         """ Requests that the underlying list widget to redraw itself.
         """
+        self.model.clear_cache()
         self.list_view.viewport().update()
 
     def callx(self, func, *args, **kw):
@@ -255,6 +256,13 @@ class _ListStrEditor(Editor):
 
         return image
 
+    def _update_items(self, event):
+        """ Handles the items of the list being changed, updating just the
+            affected rows.
+        """
+        if not self._no_update:
+            self.model.items_changed(event)
+
     #-- Property Implementations -----------------------------------------------
 
     def _get_item_count ( self ):
@@ -433,6 +441,9 @@ class _ListView(QtGui.QListView):
         # Configure context menu behavior
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
 
+        # The time of the last key typed for a type-ahead search:
+        self._search_time = QtCore.QTime()
+
     def keyPressEvent(self, event):
         """ Reimplemented to support edit, insert, and delete by keyboard.
         """
@@ -492,3 +503,35 @@ class _ListView(QtGui.QListView):
         else:
             QtGui.QListView.keyPressEvent(self, event)
 
+    def keyboardSearch(self, search):
+        """ Reimplemented to find type-ahead matches using the model's search
+            index (if the factory's 'search_index' option is set) rather than
+            by checking each row in turn.
+        """
+        editor = self._editor
+        if not getattr(editor.factory, 'search_index', False):
+            QtGui.QListView.keyboardSearch(self, search)
+            return
+
+        # Keys typed in quick succession extend the current search:
+        interval = QtGui.QApplication.keyboardInputInterval()
+        if self._search_time.isNull() or self._search_time.elapsed() > interval:
+            text = unicode(search)
+        else:
+            text = editor.search + unicode(search)
+        self._search_time.start()
+
+        # Look for the next match after the current row when starting a new
+        # search, but allow the current row to match an extended one:
+        current = self.currentIndex()
+        start = 0
+        if current.isValid():
+            start = current.row() + (len(text) == 1)
+
+        editor.search = text
+        row = editor.model.find(text, start)
+        if row != -1:
+            mi = editor.model.index(row)
+            self.setCurrentIndex(mi)
+            self.scrollTo(mi)
+
@@ -22,6 +22,8 @@
 #  Imports:
 #-------------------------------------------------------------------------------
 
+from bisect import bisect_left, insort
+
 from enthought.qt import QtCore, QtGui
 
 from enthought.traits.ui.ui_traits import SequenceTypes
@@ -48,6 +50,21 @@ class ListStrModel(QtCore.QAbstractListModel):
 
         self._editor = editor
 
+        # The number of rows the attached views know about. This only changes
+        # between the begin and end notifications of an insertion or removal,
+        # as the views require.
+        self._rows = editor.adapter.len(editor.object, editor.name)
+
+        # The per-row cache of display data, with a dictionary (mapping roles
+        # to values) or None for each row:
+        self._cache = [ None ] * self._rows
+
+        # The sorted (text, row) index used for type-ahead searches, and the
+        # (lower case) text of each row in it. The index is built when first
+        # needed and then kept up to date as rows change:
+        self._search_index = None
+        self._search_text = None
+
     #---------------------------------------------------------------------------
     #  QAbstractItemModel interface:
     #---------------------------------------------------------------------------
@@ -55,15 +72,29 @@ class ListStrModel(QtCore.QAbstractListModel):
     def rowCount(self, mi):
         """ Reimplemented to return items in the list.
         """
-        editor = self._editor
-        return editor.adapter.len(editor.object, editor.name)
+        return self._rows
 
     def data(self, mi, role):
         """ Reimplemented to return the data.
         """
+        index = mi.row()
+        if index >= self._rows:
+            return self._data(index, role)
+
+        values = self._cache[index]
+        if values is None:
+            values = self._cache[index] = {}
+        elif role in values:
+            return values[role]
+
+        values[role] = value = self._data(index, role)
+        return value
+
+    def _data(self, index, role):
+        """ Returns the data for a role of a row, without using the cache.
+        """
         editor = self._editor
         adapter = editor.adapter
-        index = mi.row()
 
         if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.EditRole:
             if editor.is_auto_add(index):
@@ -118,9 +149,9 @@ class ListStrModel(QtCore.QAbstractListModel):
         """ Reimplmented to allow for modification of the object trait.
         """
         editor = self._editor
-        editor.adapter.set_text(editor.object, editor.name, mi.row(), value)
-        signal = QtCore.SIGNAL('dataChanged(QModelIndex,QModelIndex)')
-        self.emit(signal, mi, mi)
+        editor.callx(editor.adapter.set_text, editor.object, editor.name,
+                     mi.row(), value)
+        self.rows_changed(mi.row(), 1)
         return True
 
     def setItemData(self, mi, roles):
@@ -172,6 +203,7 @@ class ListStrModel(QtCore.QAbstractListModel):
         self.beginInsertRows(parent, row, row)
         editor.callx(
             editor.adapter.insert, editor.object, editor.name, row, obj)
+        self._insert_cache(row, 1)
         self.endInsertRows()
         return True
 
@@ -185,6 +217,7 @@ class ListStrModel(QtCore.QAbstractListModel):
         for i in xrange(count):
             value = adapter.get_default_value(editor.object, editor.name)
             editor.callx(adapter.insert, editor.object, editor.name, row, value)
+        self._insert_cache(row, count)
         self.endInsertRows()
         return True
 
@@ -198,6 +231,7 @@ class ListStrModel(QtCore.QAbstractListModel):
         self.beginRemoveRows(parent, row, row + count - 1)
         for i in xrange(count):
             editor.callx(adapter.delete, editor.object, editor.name, row)
+        self._remove_cache(row, count)
         self.endRemoveRows()
         return True
 
@@ -240,10 +274,154 @@ class ListStrModel(QtCore.QAbstractListModel):
         """
         return QtCore.Qt.MoveAction
 
+    def reset(self):
+        """ Reimplemented to discard any cached data.
+        """
+        editor = self._editor
+        self._rows = editor.adapter.len(editor.object, editor.name)
+        self._cache = [ None ] * self._rows
+        self._search_index = self._search_text = None
+        QtCore.QAbstractListModel.reset(self)
+
     #---------------------------------------------------------------------------
     #  ListStrModel interface:
     #---------------------------------------------------------------------------
 
+    def clear_cache(self):
+        """ Discards the cached data of every row, for example when the adapter
+            has changed.
+        """
+        self._cache = [ None ] * self._rows
+        self._search_index = self._search_text = None
+
+    def items_changed(self, event):
+        """ Notifies the views of a change to the items of the list, described
+            by a trait list event, using the smallest possible update.
+        """
+        index = event.index
+        if not isinstance(index, int):
+            # An extended slice was modified: just start again.
+            self.reset()
+            return
+
+        removed = len(event.removed)
+        added = len(event.added)
+
+        # Items replaced in place (e.g. 'list[i] = x') only change the data:
+        changed = min(removed, added)
+        if changed > 0:
+            self.rows_changed(index, changed)
+            index += changed
+            removed -= changed
+            added -= changed
+
+        if removed > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), index,
+                                 index + removed - 1)
+            self._remove_cache(index, removed)
+            self.endRemoveRows()
+
+        if added > 0:
+            self.beginInsertRows(QtCore.QModelIndex(), index,
+                                 index + added - 1)
+            self._insert_cache(index, added)
+            self.endInsertRows()
+
+    def rows_changed(self, row, count):
+        """ Discards the cached data for a range of rows and notifies the views
+            that they have changed.
+        """
+        self._cache[row:row + count] = [ None ] * count
+        if self._search_index is not None:
+            self._unindex_rows(row, count)
+            self._index_rows(row, count)
+        signal = QtCore.SIGNAL('dataChanged(QModelIndex,QModelIndex)')
+        self.emit(signal, self.index(row), self.index(row + count - 1))
+
+    def find(self, text, start=0):
+        """ Returns the first row at or after *start* (wrapping around to the
+            beginning of the list) whose text begins with *text*, ignoring
+            case, or -1 if there is no such row.
+        """
+        if self._search_index is None:
+            self._build_search_index()
+
+        keys = self._search_index
+        text = text.lower()
+        first = after = -1
+        i = bisect_left(keys, (text, -1))
+        while (i < len(keys)) and keys[i][0].startswith(text):
+            row = keys[i][1]
+            if (first < 0) or (row < first):
+                first = row
+            if (row >= start) and ((after < 0) or (row < after)):
+                after = row
+            i += 1
+
+        if after >= 0:
+            return after
+
+        return first
+
+    def _build_search_index(self):
+        """ Builds the sorted index of row text used for type-ahead searches.
+        """
+        self._search_text = texts = [ self._search_key(row)
+                                      for row in xrange(self._rows) ]
+        keys = zip(texts, xrange(self._rows))
+        keys.sort()
+        self._search_index = keys
+
+    def _search_key(self, row):
+        """ Returns the text of a row used by the search index.
+        """
+        return unicode(self.data(self.index(row), QtCore.Qt.EditRole)).lower()
+
+    def _index_rows(self, row, count):
+        """ Adds the (current) text of a range of rows to the search index.
+        """
+        texts = [ self._search_key(i) for i in xrange(row, row + count) ]
+        self._search_text[row:row + count] = texts
+        for i, text in enumerate(texts):
+            insort(self._search_index, (text, row + i))
+
+    def _unindex_rows(self, row, count):
+        """ Removes a range of rows from the search index.
+        """
+        keys = self._search_index
+        for i in xrange(row, row + count):
+            key = (self._search_text[i], i)
+            del keys[bisect_left(keys, key)]
+
+    def _renumber_index(self, row, delta):
+        """ Renumbers the rows from *row* onwards in the search index (which
+            does not change their order).
+        """
+        self._search_index = [ (text, i + delta) if i >= row else (text, i)
+                               for text, i in self._search_index ]
+
+    def _insert_cache(self, row, count):
+        """ Makes room in the cache for newly inserted rows.
+        """
+        self._cache[row:row] = [ None ] * count
+        self._rows += count
+        if self._search_index is not None:
+            if row + count < self._rows:
+                self._renumber_index(row, count)
+            self._search_text[row:row] = [ None ] * count
+            self._index_rows(row, count)
+
+    def _remove_cache(self, row, count):
+        """ Removes the cache entries of deleted rows.
+        """
+        del self._cache[row:row + count]
+        self._rows -= count
+        if self._search_index is not None:
+            self._unindex_rows(row, count)
+            del self._search_text[row:row + count]
+            if row < self._rows:
+                self._renumber_index(row + count, -count)
+
     def moveRow(self, old_row, new_row):
         """ Convenience method to move a single row.
         """
@@ -41,7 +41,7 @@ from constants \
     import OKColor, ErrorColor
 
 from helper \
-    import IconButton
+    import IconButton, SliderWriter
 
 #-------------------------------------------------------------------------------
 #  'BaseRangeEditor' class:
@@ -68,6 +68,52 @@ class BaseRangeEditor ( Editor ):
             value = self.evaluate( value )
         Editor._set_value( self, value )
 
+    #---------------------------------------------------------------------------
+    #  Creates the object that writes the values of a slider to the object:
+    #---------------------------------------------------------------------------
+
+    def _create_writer ( self, slider ):
+        """ Creates the object that writes the values of a slider to the
+            object. The factory's 'drag_rate' limits the number of writes per
+            second while the slider is being dragged and 'commit_on_release'
+            defers the write until the slider is released.
+        """
+        factory      = self.factory
+        self._writer = SliderWriter( slider, self._write_value,
+                                     getattr( factory, 'drag_rate', 0 ),
+                                     getattr( factory, 'commit_on_release',
+                                              False ) )
+
+    def _write_value ( self, value ):
+        """ Writes a value from the slider to the object.
+        """
+        self.value = value
+
+    #---------------------------------------------------------------------------
+    #  Moves the editor over to a new object:
+    #---------------------------------------------------------------------------
+
+    def rebind ( self, old_context_object, object ):
+        """ Moves the editor over to a new object, discarding any value from
+            the slider still waiting to be written to the old one.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+
+        super( BaseRangeEditor, self ).rebind( old_context_object, object )
+
+    #---------------------------------------------------------------------------
+    #  Disposes of the contents of an editor:
+    #---------------------------------------------------------------------------
+
+    def dispose ( self ):
+        """ Disposes of the contents of an editor.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+
+        super( BaseRangeEditor, self ).dispose()
+
 #-------------------------------------------------------------------------------
 #  'SimpleSliderEditor' class:
 #-------------------------------------------------------------------------------
@@ -79,6 +125,9 @@ class SimpleSliderEditor ( BaseRangeEditor ):
     in the text field.
     """
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Trait definitions:
     #---------------------------------------------------------------------------
@@ -147,6 +196,7 @@ class SimpleSliderEditor ( BaseRangeEditor ):
         slider.setValue(ivalue)
         QtCore.QObject.connect(slider, QtCore.SIGNAL('valueChanged(int)'),
                 self.update_object_on_scroll)
+        self._create_writer(slider)
         panel.addWidget(slider)
 
         self._label_hi = QtGui.QLabel()
@@ -190,7 +240,7 @@ class SimpleSliderEditor ( BaseRangeEditor ):
         """
         value = self._convert_from_slider(pos)
         self.control.text.setText(self.format % value)
-        self.value = value
+        self._writer.write(value)
 
     #---------------------------------------------------------------------------
     #  Handle the user pressing the 'Enter' key in the edit control:
@@ -307,6 +357,9 @@ class LogRangeSliderEditor ( SimpleSliderEditor ):
     """ A slider editor for log-spaced values
     """
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     def _convert_to_slider(self, value):
         """ Returns the slider setting corresponding to the user-supplied value.
         """
@@ -338,6 +391,10 @@ class LargeRangeSliderEditor ( BaseRangeEditor ):
     is displayed in the slider; arrow buttons at each end of the slider let
     the user move the displayed range higher or lower.
     """
+
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Trait definitions:
     #---------------------------------------------------------------------------
@@ -422,6 +479,7 @@ class LargeRangeSliderEditor ( BaseRangeEditor ):
         slider.setValue(ivalue)
         QtCore.QObject.connect(slider, QtCore.SIGNAL('valueChanged(int)'),
                 self.update_object_on_scroll)
+        self._create_writer(slider)
         panel.addWidget(slider)
 
         # Upper limit button:
@@ -466,10 +524,10 @@ class LargeRangeSliderEditor ( BaseRangeEditor ):
 
         self.control.text.setText(self._format % value)
 
-        if self.factory.is_float:
-            self.value = value
-        else:
-            self.value = int(value)
+        if not self.factory.is_float:
+            value = int(value)
+
+        self._writer.write(value)
 
     #---------------------------------------------------------------------------
     #  Handle the user pressing the 'Enter' key in the edit control:
@@ -639,6 +697,10 @@ class LargeRangeSliderEditor ( BaseRangeEditor ):
 class SimpleSpinEditor ( BaseRangeEditor ):
     """ A simple style of range editor that displays a spin box control.
     """
+
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Trait definitions:
     #---------------------------------------------------------------------------
@@ -741,6 +803,9 @@ class RangeTextEditor ( TextEditor ):
     changes color to indicate an error.
     """
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Trait definitions:
     #---------------------------------------------------------------------------
@@ -16,6 +16,8 @@
 #  Imports:
 #-------------------------------------------------------------------------------
 
+from bisect import bisect_left
+
 from enthought.qt import QtCore, QtGui
 
 # FIXME: ToolkitEditorFactory is a proxy class defined here just for backward
@@ -226,71 +228,116 @@ class SimpleEditor ( Editor ):
         """
         # Check for any items having been deleted from the enumeration that are
         # still present in the object value:
-        mapping = self.inverse_mapping.copy()
-        values  = [ v for v in self.value if v in mapping ]
+        inverse_mapping = self.inverse_mapping
+        values = [ v for v in self.value if v in inverse_mapping ]
         if len( values ) < len( self.value ):
             self.value = values
             return
 
-        # Get a list of the selected items in the right box:
-        used        = self._used
-        used_labels = self._get_selected_strings( used )
-
-        # Get a list of the selected items in the left box:
-        unused        = self._unused
-        unused_labels = self._get_selected_strings( unused )
-
-        # Empty list boxes in preparation for rebuilding from current values:
-        used.clear()
-        unused.clear()
-
         # Ensure right list box is kept alphabetized unless insertion
         # order is relevant:
         if not self.factory.ordered:
-            values = values[:]
             values.sort()
 
-        # Rebuild the right listbox:
-        used_selections = []
-        for i, value in enumerate( values ):
-            label = mapping[ value ]
-            used.addItem(label)
-            del mapping[ value ]
-            if label in used_labels:
-                used_selections.append(i)
-
-        # Rebuild the left listbox:
-        unused_selections = []
-        unused_items      = mapping.values()
-        unused_items.sort()
-        mapping            = self.mapping
-        self._unused_items = [ mapping[ ui ] for ui in unused_items ]
-        for i, unused_item in enumerate( unused_items ):
-            unused.addItem(unused_item)
-            if unused_item in unused_labels:
-                unused_selections.append( i )
+        self._show_values( values )
 
         # If nothing is selected, default selection should be top of left box,
         # or of right box if left box is empty:
-        if (len( used_selections ) == 0) and (len( unused_selections ) == 0):
-            if unused.count() == 0:
-                used_selections.append(0)
-            else:
-                unused_selections.append(0)
-
-        used_count = used.count()
-        for i in used_selections:
-            if i < used_count:
-                used.item(i).setSelected(True)
-
-        unused_count = unused.count()
-        for i in unused_selections:
-            if i < unused_count:
-                unused.item(i).setSelected(True)
+        if ((len( self._used.selectedItems() ) == 0) and
+            (len( self._unused.selectedItems() ) == 0)):
+            if self._unused.count() > 0:
+                self._unused.item( 0 ).setSelected( True )
+            elif self._used.count() > 0:
+                self._used.item( 0 ).setSelected( True )
 
         self._check_up_down()
         self._check_left_right()
 
+    #---------------------------------------------------------------------------
+    #  Shows a new set of used values in the list boxes:
+    #---------------------------------------------------------------------------
+
+    def _show_values ( self, values ):
+        """ Updates both list boxes so that the right one shows *values* (in
+            order) and the left one shows all the other names, sorted. Only
+            the values added to or removed from the right box are moved, so
+            the selection of any items that remain is preserved.
+        """
+        inverse_mapping = self.inverse_mapping
+        mapping         = self.mapping
+        used_items      = self._used_items
+
+        # Rebuild both list boxes if the names themselves may have changed:
+        if (self._shown_mapping is not inverse_mapping) or (used_items is None):
+            self._shown_mapping = inverse_mapping
+            used  = set( values )
+            names = inverse_mapping.values()
+            names.sort()
+            self._unused_names = [ name for name in names
+                                   if mapping[ name ] not in used ]
+            self._used_items   = values[:]
+            self._fill_listbox( self._used, values )
+            self._fill_listbox( self._unused, [ mapping[ name ]
+                                for name in self._unused_names ] )
+            return
+
+        old_set = set( used_items )
+        new_set = set( values )
+        removed = [ v for v in used_items if v not in new_set ]
+        added   = [ v for v in values if v not in old_set ]
+
+        # Update the right list box, which is in the order of the values. If
+        # the values that remain have been reordered, it is simply refilled:
+        listbox = self._used
+        if ([ v for v in used_items if v in new_set ] !=
+            [ v for v in values if v in old_set ]):
+            self._fill_listbox( listbox, values )
+        else:
+            if len( removed ) > 0:
+                for i in xrange( len( used_items ) - 1, -1, -1 ):
+                    if used_items[ i ] not in new_set:
+                        listbox.takeItem( i )
+
+            if len( added ) > 0:
+                for i, value in enumerate( values ):
+                    if value not in old_set:
+                        listbox.insertItem( i, inverse_mapping[ value ] )
+
+        self._used_items = values[:]
+
+        # Update the left list box, whose names are kept sorted, so each
+        # changed name's row can be found directly:
+        listbox = self._unused
+        names   = self._unused_names
+        for value in added:
+            row = bisect_left( names, inverse_mapping[ value ] )
+            del names[ row ]
+            listbox.takeItem( row )
+
+        for value in removed:
+            name = inverse_mapping[ value ]
+            row  = bisect_left( names, name )
+            names.insert( row, name )
+            listbox.insertItem( row, name )
+
+    #---------------------------------------------------------------------------
+    #  Refills a list box:
+    #---------------------------------------------------------------------------
+
+    def _fill_listbox ( self, listbox, values ):
+        """ Refills a list box with the names of *values*, keeping any
+            selected values selected.
+        """
+        mapping         = self.mapping
+        inverse_mapping = self.inverse_mapping
+        selected = set( [ mapping.get( name ) for name in
+                          self._get_selected_strings( listbox ) ] )
+        listbox.clear()
+        listbox.addItems( [ inverse_mapping[ v ] for v in values ] )
+        for i, value in enumerate( values ):
+            if value in selected:
+                listbox.item( i ).setSelected( True )
+
     #---------------------------------------------------------------------------
     #  Disposes of the contents of an editor:
     #---------------------------------------------------------------------------
@@ -336,20 +383,16 @@ class SimpleEditor ( Editor ):
         self._check_up_down()
 
     def _on_use(self):
-        self._unused_items, self.value = self._transfer_items( self._unused,
-                                    self._used, self._unused_items, self.value )
+        self._transfer_items( self._unused, self._used )
 
     def _on_unuse(self):
-        self.value, self._unused_items = self._transfer_items( self._used,
-                                  self._unused, self.value, self._unused_items )
+        self._transfer_items( self._used, self._unused )
 
     def _on_use_all(self):
-        self._unused_items, self.value = self._transfer_all( self._unused,
-                                    self._used, self._unused_items, self.value )
+        self._transfer_all( self._unused, self._used )
 
     def _on_unuse_all(self):
-        self.value, self._unused_items = self._transfer_all( self._used,
-                                 self._unused, self.value, self._unused_items )
+        self._transfer_all( self._used, self._unused )
 
     def _on_up(self):
         self._move_item(-1)
@@ -365,69 +408,72 @@ class SimpleEditor ( Editor ):
     #  Transfers all items from one list to another:
     #---------------------------------------------------------------------------
 
-    def _transfer_all ( self, list_from, list_to, values_from, values_to ):
+    def _transfer_all ( self, list_from, list_to ):
         """ Transfers all items from one list to another.
         """
-        values_from = values_from[:]
-        values_to   = values_to[:]
+        if list_from is self._used:
+            values = []
+        else:
+            mapping = self.mapping
+            values  = self._used_items + [ mapping[ name ]
+                                           for name in self._unused_names ]
+            if not self.factory.ordered:
+                values.sort()
 
         list_from.clearSelection()
-        while list_from.count() > 0:
-            index_to = list_to.count()
-            list_from.item(0).setSelected(True)
-            list_to.insertItems(index_to, self._get_selected_strings(list_from))
-            list_from.takeItem(0)
-            values_to.append(values_from[0])
-            del values_from[0]
-
-        list_to.item(0).setSelected(True)
+        list_to.clearSelection()
+        self._show_values( values )
+
+        if list_to.count() > 0:
+            list_to.item(0).setSelected(True)
+
         self._check_left_right()
         self._check_up_down()
 
-        return ( values_from, values_to )
+        self.value = self._used_items
 
     #---------------------------------------------------------------------------
     #  Transfers the selected item from one list to another:
     #---------------------------------------------------------------------------
 
-    def _transfer_items ( self, list_from, list_to, values_from, values_to ):
+    def _transfer_items ( self, list_from, list_to ):
         """ Transfers the selected item from one list to another.
         """
-        values_from  = values_from[:]
-        values_to    = values_to[:]
         index_from   = max( self._get_first_selection( list_from ), 0 )
         index_to     = max( self._get_first_selection( list_to ),   0 )
 
+        # Get the values in the "from" box to be moved, in the order shown:
+        mapping = self.mapping
+        rows    = [ list_from.row( item ) for item in list_from.selectedItems() ]
+        rows.sort()
+        moved   = [ mapping[ unicode( list_from.item( row ).text() ) ]
+                    for row in rows ]
+
+        # Work out the new value:
+        used = self._used_items
+        if list_from is self._used:
+            moved_set = set( moved )
+            values    = [ v for v in used if v not in moved_set ]
+        elif self.factory.ordered:
+            values = used[ : index_to ] + moved + used[ index_to: ]
+        else:
+            values = used + moved
+            values.sort()
+
+        list_from.clearSelection()
         list_to.clearSelection()
+        self._show_values( values )
 
-        # Get the list of strings in the "from" box to be moved:
-        selected_list = self._get_selected_strings( list_from )
-
-        # fixme: I don't know why I have to reverse the list to get
-        # correct behavior from the ordered list box.  Investigate -- LP
-        selected_list.reverse()
-        list_to.insertItems(index_to, selected_list)
-
-        # Delete the transferred items from the left box:
-        items_from = list_from.selectedItems()
-        for i in range(len(items_from) - 1, -1, -1):
-            list_from.takeItem(list_from.row(items_from[i]))
-        del items_from
-
-        # Delete the transferred items from the "unused" value list:
-        for item_label in selected_list:
-            val_index_from = values_from.index( self.mapping[ item_label ] )
-            values_to.insert( index_to, values_from[ val_index_from ] )
-            del values_from[ val_index_from ]
-
-            # If right list is ordered, keep moved items selected:
-            if self.factory.ordered:
-                items = list_to.findItems(item_label,
+        # If right list is ordered, keep moved items selected:
+        if self.factory.ordered:
+            inverse_mapping = self.inverse_mapping
+            for value in moved:
+                items = list_to.findItems( inverse_mapping[ value ],
                         QtCore.Qt.MatchFixedString|QtCore.Qt.MatchCaseSensitive)
                 if items:
                     items[0].setSelected(True)
 
-        # Reset the selection in the left box:
+        # Reset the selection in the "from" box:
         count = list_from.count()
         if count > 0:
             if index_from >= count:
@@ -437,7 +483,7 @@ class SimpleEditor ( Editor ):
         self._check_left_right()
         self._check_up_down()
 
-        return ( values_from, values_to )
+        self.value = self._used_items
 
     #---------------------------------------------------------------------------
     #  Moves an item up or down with the 'used' list:
@@ -458,14 +504,15 @@ class SimpleEditor ( Editor ):
         self._check_up_down()
 
         # Move the item up/down within the editor's trait value:
-        value = self.value
+        value = self._used_items
         if direction < 0:
             index  = index_to
             values = [ value[ index_from ], value[ index_to ] ]
         else:
             index  = index_from
             values = [ value[ index_to ], value[ index_from ] ]
-        self.value = value[ : index ] + values + value[ index + 2: ]
+        self._used_items = value[ : index ] + values + value[ index + 2: ]
+        self.value = self._used_items
     #---------------------------------------------------------------------------
     #  Sets the proper enable state for the up and down buttons:
     #---------------------------------------------------------------------------
@@ -16,6 +16,8 @@
 #  Imports:
 #-------------------------------------------------------------------------------
 
+import threading
+
 from enthought.qt import QtCore, QtGui
 
 from enthought.traits.api \
@@ -36,6 +38,9 @@ from editor_factory \
 from constants \
     import OKColor
 
+from toolkit \
+    import ui_handler
+
 #-------------------------------------------------------------------------------
 #  'SimpleEditor' class:
 #-------------------------------------------------------------------------------
@@ -44,6 +49,9 @@ class SimpleEditor ( Editor ):
     """ Simple style text editor, which displays a text field.
     """
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     # Flag for window styles:
     base_style = QtGui.QLineEdit
 
@@ -83,13 +91,40 @@ class SimpleEditor ( Editor ):
         if factory.password:
             control.setEchoMode(QtGui.QLineEdit.Password)
 
+        # The factory's 'background_evaluate' option moves the evaluation and
+        # validation of the user's input to a worker thread. Only the latest
+        # input waiting to be evaluated is kept:
+        self._background = getattr(factory, 'background_evaluate', False)
+        if self._background:
+            self._lock = threading.Lock()
+            self._pending = None
+            self._evaluating = False
+
         if factory.auto_set and not factory.is_grid_cell:
             if wtype == QtGui.QTextEdit:
-                QtCore.QObject.connect(control,
-                    QtCore.SIGNAL('textChanged()'), self.update_object)
+                signal = QtCore.SIGNAL('textChanged()')
             else:
-                QtCore.QObject.connect(control,
-                    QtCore.SIGNAL('textEdited(QString)'), self.update_object)
+                signal = QtCore.SIGNAL('textEdited(QString)')
+
+            # If the factory has a 'debounce' interval (in milliseconds) then
+            # only update the object once the user has paused typing for that
+            # long, or has left the field:
+            debounce = getattr(factory, 'debounce', 0)
+            if debounce > 0:
+                self._timer = timer = QtCore.QTimer(control)
+                timer.setSingleShot(True)
+                timer.setInterval(debounce)
+                QtCore.QObject.connect(timer, QtCore.SIGNAL('timeout()'),
+                        self.update_object)
+                QtCore.QObject.connect(control, signal, timer,
+                        QtCore.SLOT('start()'))
+
+                if not multi_line:
+                    QtCore.QObject.connect(control,
+                            QtCore.SIGNAL('editingFinished()'),
+                            self._flush_update)
+            else:
+                QtCore.QObject.connect(control, signal, self.update_object)
 
         else:
             # Assume enter_set is set, otherwise the value will never get
@@ -108,18 +143,129 @@ class SimpleEditor ( Editor ):
         """ Handles the user entering input data in the edit control.
         """
         if (not self._no_update) and (self.control is not None):
-            try:
-                self.value = self._get_user_value()
+            if self._background:
+                self._generation = (self._generation or 0) + 1
+                self._request_evaluation( self._get_text(), self._generation )
+            else:
+                self._set_user_value( self._get_user_value() )
+
+    #---------------------------------------------------------------------------
+    #  Updates the object with any change that is waiting for a pause in typing:
+    #---------------------------------------------------------------------------
+
+    def _flush_update ( self ):
+        """ Updates the object with any change that is waiting for a pause in
+            typing.
+        """
+        if self._timer.isActive():
+            self._timer.stop()
+            self.update_object()
 
-                if self._error is not None:
-                    self._error = None
-                    self.ui.errors -= 1
+    #---------------------------------------------------------------------------
+    #  Sets the object trait to a value entered by the user:
+    #---------------------------------------------------------------------------
 
-                self.set_error_state( False )
+    def _set_user_value ( self, value ):
+        """ Sets the object trait to a value entered by the user.
+        """
+        try:
+            self.value = value
+
+            if self._error is not None:
+                self._error = None
+                self.ui.errors -= 1
+
+            self.set_error_state( False )
+
+        except TraitError, excp:
+            pass
+
+    #---------------------------------------------------------------------------
+    #  Queues the user's input to be evaluated in the background:
+    #---------------------------------------------------------------------------
+
+    def _request_evaluation ( self, text, generation ):
+        """ Queues the user's input to be evaluated in the background,
+            replacing any input still waiting, and starts the worker thread if
+            it is not already running.
+        """
+        self._lock.acquire()
+        try:
+            self._pending = ( text, generation )
+            if self._evaluating:
+                return
+            self._evaluating = True
+        finally:
+            self._lock.release()
+
+        worker = threading.Thread( target = self._evaluate_pending )
+        worker.setDaemon( True )
+        worker.start()
+
+    #---------------------------------------------------------------------------
+    #  Evaluates and validates the user's input (in a background thread):
+    #---------------------------------------------------------------------------
 
-            except TraitError, excp:
+    def _evaluate_pending ( self ):
+        """ Evaluates and validates the latest input waiting, until there is
+            none left. This is run in a background thread and each result is
+            passed back to the UI thread.
+        """
+        while True:
+            self._lock.acquire()
+            try:
+                request = self._pending
+                self._pending = None
+                if request is None:
+                    self._evaluating = False
+                    return
+            finally:
+                self._lock.release()
+
+            text, generation = request
+            value = excp = None
+            try:
+                value = self._user_value_for( text )
+                value = self.object.base_trait( self.name ).validate(
+                                                self.object, self.name, value )
+            except Exception, excp:
                 pass
 
+            ui_handler( self._text_evaluated, generation, value, excp )
+
+    #---------------------------------------------------------------------------
+    #  Handles the result of evaluating the user's input in the background:
+    #---------------------------------------------------------------------------
+
+    def _text_evaluated ( self, generation, value, excp ):
+        """ Handles the result of evaluating the user's input in the
+            background. The result is discarded if the text has been changed
+            since.
+        """
+        if (generation != self._generation) or (self.control is None):
+            return
+
+        if excp is not None:
+            self.error( excp )
+        else:
+            self._set_user_value( value )
+
+    #---------------------------------------------------------------------------
+    #  Moves the editor over to a new object:
+    #---------------------------------------------------------------------------
+
+    def rebind ( self, old_context_object, object ):
+        """ Moves the editor over to a new object, discarding any input still
+            waiting to be written to the old one.
+        """
+        if self._timer is not None:
+            self._timer.stop()
+
+        if self._generation is not None:
+            self._generation += 1
+
+        super( SimpleEditor, self ).rebind( old_context_object, object )
+
     #---------------------------------------------------------------------------
     #  Updates the editor when the object trait changes external to the editor:
     #---------------------------------------------------------------------------
@@ -140,6 +286,10 @@ class SimpleEditor ( Editor ):
             self.control.setText(self.str_value)
             self._no_update = False
 
+            # Discard the result of evaluating any earlier input:
+            if self._generation is not None:
+                self._generation += 1
+
         if self._error is not None:
             self._error = None
             self.ui.errors -= 1
@@ -152,13 +302,29 @@ class SimpleEditor ( Editor ):
     def _get_user_value ( self ):
         """ Gets the actual value corresponding to what the user typed.
         """
+        return self._user_value_for( self._get_text() )
+
+    #---------------------------------------------------------------------------
+    #  Gets the text the user typed:
+    #---------------------------------------------------------------------------
+
+    def _get_text ( self ):
+        """ Gets the text the user typed.
+        """
         try:
             value = self.control.text()
         except AttributeError:
             value = self.control.toPlainText()
 
-        value = unicode(value)
+        return unicode(value)
+
+    #---------------------------------------------------------------------------
+    #  Gets the actual value corresponding to some text:
+    #---------------------------------------------------------------------------
 
+    def _user_value_for ( self, value ):
+        """ Gets the actual value corresponding to some text.
+        """
         try:
             value = self.evaluate( value )
         except:
@@ -202,6 +368,9 @@ class CustomEditor ( SimpleEditor ):
     """ Custom style of text editor, which displays a multi-line text field.
     """
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     # FIXME: The wx version exposes a wx constant.
     # Flag for window style. This value overrides the default.
     base_style = QtGui.QTextEdit
@@ -214,6 +383,9 @@ class ReadonlyEditor ( BaseReadonlyEditor ):
     """ Read-only style of text editor, which displays a read-only text field.
     """
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Updates the editor when the object trait changes external to the editor:
     #---------------------------------------------------------------------------
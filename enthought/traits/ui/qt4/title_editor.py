@@ -31,6 +31,9 @@ from enthought.traits.ui.editors.title_editor \
 
 class _TitleEditor ( Editor ):
 
+    # Class constant: the editor can follow an object of the same class:
+    rebindable = True
+
     #---------------------------------------------------------------------------
     #  Finishes initializing the editor by creating the underlying toolkit
     #  widget:
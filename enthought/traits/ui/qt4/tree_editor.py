@@ -17,11 +17,18 @@
 #-------------------------------------------------------------------------------
 
 import copy
+import logging
+import sys
+import thread
+import weakref
+
+from bisect import bisect_left, insort
+from collections import deque
 
 from enthought.qt import QtCore, QtGui
 
 from enthought.pyface.resource_manager import resource_manager
-from enthought.traits.api import Any, Event
+from enthought.traits.api import Any, Bool, Event, HasTraits
 from enthought.traits.trait_base import enumerate
 from enthought.traits.ui.api import TreeNode, ObjectTreeNode, MultiTreeNode
 from enthought.traits.ui.undo import ListUndoItem
@@ -29,8 +36,12 @@ from enthought.traits.ui.tree_node import ITreeNodeAdapterBridge
 from enthought.traits.ui.menu import Menu, Action, Separator
 
 from clipboard import clipboard, PyMimeData
+from constants import SearchColor
 from editor import Editor
 from helper import open_fbi, pixmap_cache
+from toolkit import ui_handler
+
+logger = logging.getLogger(__name__)
 
 #-------------------------------------------------------------------------------
 #  The core tree node menu actions:
@@ -82,6 +93,9 @@ class SimpleEditor ( Editor ):
     # The event fired when the application wants to veto an operation:
     veto = Event
 
+    # Is the search index currently indexing unexpanded subtrees?
+    indexing = Bool( False )
+
     #---------------------------------------------------------------------------
     #  Finishes initializing the editor by creating the underlying toolkit
     #  widget:
@@ -95,6 +109,13 @@ class SimpleEditor ( Editor ):
 
         self._editor = None
 
+        # Route the node listeners through shared class trait notifiers unless
+        # the factory asks for one set of notifiers per displayed object:
+        if getattr( factory, 'shared_listeners', True ):
+            self._listeners = _SharedListeners( self )
+        else:
+            self._listeners = None
+
         if factory.editable:
 
             # Check to see if the tree view is based on a shared trait editor:
@@ -170,6 +191,14 @@ class SimpleEditor ( Editor ):
         # Set up the mapping between objects and tree id's:
         self._map = {}
 
+        # The search index is only created when it is first used:
+        self._index = None
+        self._highlighted = []
+
+        # The ( text, prefix, ids ) of the active filter (if any), where 'ids'
+        # is the set of the ids of the matching objects and their ancestors:
+        self._filter = None
+
         # Initialize the 'undo state' stack:
         self._undoable = []
 
@@ -218,6 +247,8 @@ class SimpleEditor ( Editor ):
         """ Disposes of the contents of an editor.
         """
         if self._tree is not None:
+            self._stop_indexing()
+
             # Stop the chatter (specifically about the changing selection).
             self._tree.blockSignals(True)
 
@@ -225,6 +256,10 @@ class SimpleEditor ( Editor ):
 
             self._tree = None
 
+        if self._listeners is not None:
+            self._listeners.dispose()
+            self._listeners = None
+
         super( SimpleEditor, self ).dispose()
 
     #---------------------------------------------------------------------------
@@ -269,6 +304,8 @@ class SimpleEditor ( Editor ):
             self._map[ id( object ) ] = [ ( node.get_children_id(object), nid ) ]
             self._add_listeners( node, object )
             self._set_node_data( nid, ( False, node, object) )
+            if self._index is not None:
+                self._index.add( object, node, node.get_label( object ), None )
             if self.factory.hide_root or self._has_children( node, object ):
                 self._expand_node( nid )
                 if not self.factory.hide_root:
@@ -294,16 +331,36 @@ class SimpleEditor ( Editor ):
     def _append_node ( self, nid, node, object ):
         """ Appends a new node to the specified node.
         """
-        cnid = QtGui.QTreeWidgetItem(nid)
-        cnid.setText(0, node.get_label(object))
+        return self._insert_node( nid, nid.childCount(), node, object )
+
+    #---------------------------------------------------------------------------
+    #  Inserts a new node into the specified node at a specified index:
+    #---------------------------------------------------------------------------
+
+    def _insert_node ( self, nid, index, node, object ):
+        """ Inserts a new node into the specified node at a specified index.
+        """
+        label = node.get_label(object)
+        cnid = QtGui.QTreeWidgetItem()
+        cnid.setText(0, label)
         cnid.setIcon(0, self._get_icon(node, object))
         cnid.setToolTip(0, node.get_tooltip(object))
 
+        # Insert the (fully set up) item in a single step, remembering where
+        # it was put so that later index lookups don't need to search for it:
+        index = min( index, nid.childCount() )
+        nid.insertChild(index, cnid)
+        cnid._index = index
+
         has_children = self._has_children(node, object)
         self._set_node_data( cnid, ( False, node, object ) )
         self._map.setdefault( id( object ), [] ).append(
             ( node.get_children_id(object), cnid ) )
         self._add_listeners( node, object )
+        if self._index is not None:
+            self._index.add( object, node, label, self._parent_object( cnid ) )
+        if self._filter is not None:
+            self._filter_node( cnid, object, label )
 
         # Automatically expand the new node (if requested):
         if has_children:
@@ -319,6 +376,35 @@ class SimpleEditor ( Editor ):
         # Return the newly created node:
         return cnid
 
+    #---------------------------------------------------------------------------
+    #  Appends the nodes for a list of child objects to the specified node:
+    #---------------------------------------------------------------------------
+
+    def _append_children ( self, nid, children ):
+        """ Appends the nodes for a list of child objects to the specified
+            node, remembering how many of the children have no node so that
+            later changes to the list can be mapped to rows of the tree.
+        """
+        skipped = 0
+        for child in children:
+            child, child_node = self._node_for( child )
+            if child_node is not None:
+                self._append_node( nid, child_node, child )
+            else:
+                skipped += 1
+
+        nid._skipped = skipped
+
+    #---------------------------------------------------------------------------
+    #  Returns the number of objects in a list that have no tree node:
+    #---------------------------------------------------------------------------
+
+    def _count_skipped ( self, children ):
+        """ Returns the number of objects in a list that have no tree node.
+        """
+        return len( [ child for child in children
+                      if self._node_for( child )[1] is None ] )
+
     #---------------------------------------------------------------------------
     #  Deletes a specified tree node and all its children:
     #---------------------------------------------------------------------------
@@ -326,8 +412,7 @@ class SimpleEditor ( Editor ):
     def _delete_node ( self, nid ):
         """ Deletes a specified tree node and all its children.
         """
-        for cnid in self._nodes_for( nid ):
-            self._delete_node( cnid )
+        self._delete_children( nid )
 
         if nid is self._tree.invisibleRootItem():
             return
@@ -342,25 +427,47 @@ class SimpleEditor ( Editor ):
         expanded, node, object = self._get_node_data(nid)
         id_object = id(object)
         object_info = self._map[id_object]
-        for i, info in enumerate(object_info):
-            # QTreeWidgetItem does not have an equal operator, so use id()
-            if id(nid) == id(info[1]):
-                del object_info[i]
-                break
-
-        if len( object_info ) == 0:
+        if len( object_info ) == 1:
+            # The usual case of an object being displayed exactly once:
             self._remove_listeners( node, object )
             del self._map[ id_object ]
+            if self._index is not None:
+                # Objects only indexed below this one (rather than shown
+                # elsewhere in the tree) go with it:
+                self._index.remove_subtree( object,
+                    lambda child: id( child ) in self._map )
+        else:
+            for i, info in enumerate(object_info):
+                # QTreeWidgetItem does not have an equal operator, so use 'is':
+                if info[1] is nid:
+                    del object_info[i]
+                    break
 
         if pnid is None:
-            self._tree.takeTopLevelItem(self._tree.indexOfTopLevelItem(nid))
-        else:
-            pnid.removeChild(nid)
+            pnid = self._tree.invisibleRootItem()
+        pnid.takeChild(self._child_index(pnid, nid))
 
         # If the deleted node had an active editor panel showing, remove it:
         if (self._editor is not None) and (nid == self._editor._editor_nid):
             self._clear_editor()
 
+    #---------------------------------------------------------------------------
+    #  Deletes a range of the child nodes of a specified node:
+    #---------------------------------------------------------------------------
+
+    def _delete_children ( self, nid, start = 0, end = None ):
+        """ Deletes the child nodes of a specified node id in the range
+            [start, end).
+        """
+        count = nid.childCount()
+        if (end is None) or (end > count):
+            end = count
+
+        # Delete from the end so that removing each item from its parent is
+        # cheap and the positions of the remaining items stay valid:
+        for i in range( end - 1, start - 1, -1 ):
+            self._delete_node( nid.child( i ) )
+
     #---------------------------------------------------------------------------
     #  Expands the contents of a specified node (if required):
     #---------------------------------------------------------------------------
@@ -378,10 +485,7 @@ class SimpleEditor ( Editor ):
                 nid.removeChild(dummy)
                 del nid._dummy
 
-            for child in node.get_children( object ):
-                child, child_node = self._node_for( child )
-                if child_node is not None:
-                    self._append_node( nid, child_node, child )
+            self._append_children( nid, node.get_children( object ) )
 
             # Indicate the item is now populated:
             self._set_node_data( nid, ( True, node, object) )
@@ -400,14 +504,33 @@ class SimpleEditor ( Editor ):
     #---------------------------------------------------------------------------
 
     def _node_index ( self, nid ):
+        """ Returns the node, object and index of a specified node id within
+            its parent in the form ( node, object, index ).
+        """
         pnid = nid.parent()
         if pnid is None:
             return ( None, None, None )
 
-        for i in range(pnid.childCount()):
-            if pnid.child(i) is nid:
-                _, pnode, pobject = self._get_node_data( pnid )
-                return ( pnode, pobject, i )
+        _, pnode, pobject = self._get_node_data( pnid )
+
+        return ( pnode, pobject, self._child_index( pnid, nid ) )
+
+    #---------------------------------------------------------------------------
+    #  Returns the index of a specified node id within a parent node id:
+    #---------------------------------------------------------------------------
+
+    def _child_index ( self, pnid, nid ):
+        """ Returns the index of a specified node id within a parent node id.
+        """
+        # Try the position remembered when the node was inserted first. It is
+        # only out of date if earlier siblings have been inserted or deleted
+        # since, in which case the native Qt search is used to refresh it:
+        index = getattr( nid, '_index', -1 )
+        if (index < 0) or (index >= pnid.childCount()) or \
+           (pnid.child( index ) is not nid):
+            nid._index = index = pnid.indexOfChild( nid )
+
+        return index
 
     #---------------------------------------------------------------------------
     #  Returns whether a specified object has any children:
@@ -463,6 +586,10 @@ class SimpleEditor ( Editor ):
     def _add_listeners ( self, node, object ):
         """ Adds the event listeners for a specified object.
         """
+        listeners = self._listeners
+        if (listeners is not None) and listeners.add( node, object ):
+            return
+
         if node.allows_children( object ):
             node.when_children_replaced( object, self._children_replaced, False)
             node.when_children_changed(  object, self._children_updated,  False)
@@ -476,6 +603,10 @@ class SimpleEditor ( Editor ):
     def _remove_listeners ( self, node, object ):
         """ Removes any event listeners from a specified object.
         """
+        listeners = self._listeners
+        if (listeners is not None) and listeners.remove( object ):
+            return
+
         if node.allows_children( object ):
             node.when_children_replaced( object, self._children_replaced, True )
             node.when_children_changed(  object, self._children_updated,  True )
@@ -710,6 +841,97 @@ class SimpleEditor ( Editor ):
             editor._node_ui.dispose()
             editor._node_ui = editor._editor_nid = None
 
+    #---------------------------------------------------------------------------
+    #  Returns the object displayed by the parent of a specified node:
+    #---------------------------------------------------------------------------
+
+    def _parent_object ( self, nid ):
+        """ Returns the object displayed by the parent of a specified node id
+            (or None if it has no parent).
+        """
+        root = self._tree.invisibleRootItem()
+        if nid is root:
+            return None
+
+        pnid = nid.parent()
+        if pnid is None:
+            pnid = root
+
+        data = getattr( pnid, '_py_data', None )
+        if data is None:
+            return None
+
+        return data[2]
+
+    #---------------------------------------------------------------------------
+    #  Returns the search index, creating it if necessary:
+    #---------------------------------------------------------------------------
+
+    def _get_index ( self ):
+        """ Returns the search index, creating it from the current contents of
+            the tree if necessary.
+        """
+        index = self._index
+        if index is None:
+            self._index = index = _TreeIndex()
+            for info in self._map.itervalues():
+                nid = info[0][1]
+                expanded, node, object = self._get_node_data( nid )
+                index.add( object, node, node.get_label( object ),
+                           self._parent_object( nid ) )
+
+        return index
+
+    #---------------------------------------------------------------------------
+    #  Indexes the next batch of objects in unexpanded subtrees:
+    #---------------------------------------------------------------------------
+
+    # The number of objects indexed on each step of background indexing:
+    INDEX_BATCH = 200
+
+    def _index_step ( self ):
+        """ Indexes the next batch of objects in unexpanded subtrees.
+        """
+        queue   = self._index_queue
+        index   = self._index
+        max_depth, max_nodes = self._index_limits
+
+        for i in range( self.INDEX_BATCH ):
+            if (len( queue ) == 0) or ((max_nodes is not None) and
+                                       (self._index_count >= max_nodes)):
+                self._stop_indexing()
+                return
+
+            object, node, depth = queue.popleft()
+            if (max_depth is not None) and (depth >= max_depth):
+                continue
+
+            if not self._has_children( node, object ):
+                continue
+
+            for child in node.get_children( object ):
+                child, child_node = self._node_for( child )
+                if (child_node is None) or index.has( child ):
+                    continue
+
+                index.add( child, child_node, child_node.get_label( child ),
+                           object )
+                self._index_count += 1
+                queue.append( ( child, child_node, depth + 1 ) )
+
+    #---------------------------------------------------------------------------
+    #  Stops any background indexing:
+    #---------------------------------------------------------------------------
+
+    def _stop_indexing ( self ):
+        """ Stops any background indexing in progress.
+        """
+        timer = self._index_timer
+        if timer is not None:
+            timer.stop()
+            self._index_timer = self._index_queue = None
+            self.indexing     = False
+
     #---------------------------------------------------------------------------
     #  Gets/Sets the node specific data:
     #---------------------------------------------------------------------------
@@ -763,6 +985,257 @@ class SimpleEditor ( Editor ):
             return self._get_node_data( nid )[1]
         return None
 
+    #---------------------------------------------------------------------------
+    #  Returns the objects whose labels match a specified search string:
+    #---------------------------------------------------------------------------
+
+    def search ( self, text, prefix = False, limit = None ):
+        """ Returns the list of objects discovered so far whose labels contain
+            (or, if **prefix** is True, start with) a specified string,
+            ignoring case. Objects are discovered as their nodes are added to
+            the tree, or by indexing unexpanded subtrees using
+            **index_subtrees**.
+        """
+        return self._get_index().search( text, prefix, limit )
+
+    #---------------------------------------------------------------------------
+    #  Indexes the contents of unexpanded subtrees in the background:
+    #---------------------------------------------------------------------------
+
+    def index_subtrees ( self, max_depth = None, max_nodes = None ):
+        """ Starts adding the objects in the currently unexpanded subtrees of
+            the tree to the search index, without creating any tree nodes for
+            them. The work is done in small steps while the application is
+            idle, and the **indexing** trait is True until it completes.
+
+            **max_depth** limits the number of levels indexed below each
+            unexpanded node, and **max_nodes** the total number of objects
+            indexed.
+        """
+        self._stop_indexing()
+        self._get_index()
+
+        queue = deque()
+        for info in self._map.itervalues():
+            for name, nid in info:
+                expanded, node, object = self._get_node_data( nid )
+                if (not expanded) and self._has_children( node, object ):
+                    queue.append( ( object, node, 0 ) )
+
+        self._index_queue  = queue
+        self._index_limits = ( max_depth, max_nodes )
+        self._index_count  = 0
+        self.indexing      = True
+
+        self._index_timer = timer = QtCore.QTimer()
+        QtCore.QObject.connect( timer, QtCore.SIGNAL( 'timeout()' ),
+                                self._index_step )
+        timer.start( 0 )
+
+    #---------------------------------------------------------------------------
+    #  Reveals a specified object in the tree:
+    #---------------------------------------------------------------------------
+
+    def reveal ( self, object ):
+        """ Expands the tree down to a specified (indexed) object and selects
+            it. Only the nodes on the path to the object are expanded. Returns
+            whether or not the object could be revealed.
+        """
+        path = self._get_index().path( object )
+        if len( path ) == 0:
+            path = [ object ]
+
+        # Find the deepest object on the path that is already in the tree:
+        for i in range( len( path ) - 1, -1, -1 ):
+            nid = self._get_object_nid( path[i] )
+            if nid is not None:
+                break
+        else:
+            return False
+
+        # Make sure all of its ancestors are expanded:
+        pnid = nid.parent()
+        while pnid is not None:
+            pnid.setExpanded(True)
+            pnid = pnid.parent()
+
+        # Then expand the path down to the object itself:
+        for child in path[ i + 1: ]:
+            self._expand_node( nid )
+            if nid is not self._tree.invisibleRootItem():
+                nid.setExpanded(True)
+
+            for name, cnid in self._map.get( id( child ), () ):
+                pnid = cnid.parent()
+                if pnid is None:
+                    pnid = self._tree.invisibleRootItem()
+                if pnid is nid:
+                    nid = cnid
+                    break
+            else:
+                return False
+
+        if nid is self._tree.invisibleRootItem():
+            return False
+
+        self._tree.setCurrentItem(nid)
+        self._tree.scrollToItem(nid)
+
+        return True
+
+    #---------------------------------------------------------------------------
+    #  Highlights the tree nodes matching a specified search string:
+    #---------------------------------------------------------------------------
+
+    def highlight ( self, text, prefix = False ):
+        """ Highlights the nodes currently in the tree whose labels match a
+            specified string (see **search**), replacing any previous
+            highlighting. An empty string just removes the highlighting.
+            Returns the list of all matching objects (including those not yet
+            in the tree).
+        """
+        blk = self._tree.blockSignals(True)
+
+        for nid in self._highlighted:
+            nid.setBackground(0, QtGui.QBrush())
+        self._highlighted = highlighted = []
+
+        matches = []
+        if text != '':
+            matches = self.search( text, prefix )
+            brush   = QtGui.QBrush( SearchColor )
+            for object in matches:
+                for name, nid in self._map.get( id( object ), () ):
+                    nid.setBackground(0, brush)
+                    highlighted.append( nid )
+
+        self._tree.blockSignals(blk)
+
+        return matches
+
+    #---------------------------------------------------------------------------
+    #  Filters the tree to the nodes matching a specified search string:
+    #---------------------------------------------------------------------------
+
+    def filter ( self, text, prefix = False ):
+        """ Hides all nodes currently in the tree other than those whose
+            labels match a specified string (see **search**) and the ancestors
+            of any matching objects, whether or not they are in the tree yet.
+            An empty string shows all nodes again. Returns the list of
+            matching objects.
+        """
+        root = self._tree.invisibleRootItem()
+
+        matches = []
+        visible = None
+        self._filter = None
+        if text != '':
+            index   = self._get_index()
+            matches = index.search( text, prefix )
+            visible = {}
+            ids     = set()
+            for object in matches:
+                path = index.path( object ) or [ object ]
+                ids.update( [ id( ancestor ) for ancestor in path ] )
+                for ancestor in reversed( path ):
+                    info = self._map.get( id( ancestor ) )
+                    if info is not None:
+                        for name, nid in info:
+                            while (nid is not None) and (nid is not root):
+                                visible[ id( nid ) ] = None
+                                nid = nid.parent()
+                        break
+
+            self._filter = ( unicode( text ).lower(), prefix, ids )
+
+        for info in self._map.itervalues():
+            for name, nid in info:
+                if nid is not root:
+                    nid.setHidden( (visible is not None) and
+                                   (id( nid ) not in visible) )
+
+        return matches
+
+    #---------------------------------------------------------------------------
+    #  Applies the active filter to a node added to the tree:
+    #---------------------------------------------------------------------------
+
+    def _filter_node ( self, nid, object, label ):
+        """ Hides a node added to the tree while a filter is active, unless
+            its object matches the filter or is an ancestor of a match, in
+            which case it and its ancestors are shown.
+        """
+        text, prefix, ids = self._filter
+        key = unicode( label ).lower()
+        if prefix:
+            matched = key.startswith( text )
+        else:
+            matched = (text in key)
+
+        if not (matched or (id( object ) in ids)):
+            nid.setHidden( True )
+            return
+
+        root = self._tree.invisibleRootItem()
+        while (nid is not None) and (nid is not root):
+            nid.setHidden( False )
+            nid = nid.parent()
+
+    #---------------------------------------------------------------------------
+    #  Returns statistics about the listeners attached to the tree's objects:
+    #---------------------------------------------------------------------------
+
+    def listener_statistics ( self ):
+        """ Returns a dictionary describing the trait change listeners used to
+            track the objects displayed in the tree, with the keys:
+
+            shared
+                Whether shared class trait notifiers are enabled.
+            objects
+                The number of objects being listened to.
+            shared_objects
+                The number of those objects served by shared notifiers.
+            shared_notifiers
+                The number of shared notifiers attached to class traits.
+            object_notifiers
+                The number of notifiers attached to individual objects.
+            memory
+                The approximate number of bytes used by all of the above.
+        """
+        listeners = self._listeners
+        handlers  = ( self._children_replaced, self._children_updated,
+                      self._label_updated )
+        objects   = 0
+        notifiers = []
+        for info in self._map.itervalues():
+            objects += 1
+            object   = self._get_node_data( info[0][1] )[2]
+            if ((listeners is not None and listeners.has( object )) or
+                (not isinstance( object, HasTraits ))):
+                continue
+
+            for trait in object._instance_traits().itervalues():
+                for notifier in (trait._notifiers( 0 ) or ()):
+                    for handler in handlers:
+                        if notifier.equals( handler ):
+                            notifiers.append( notifier )
+                            break
+
+        stats = { 'shared':           listeners is not None,
+                  'objects':          objects,
+                  'shared_objects':   0,
+                  'shared_notifiers': 0,
+                  'object_notifiers': len( notifiers ),
+                  'memory':           sum( [ _sizeof( notifier )
+                                             for notifier in notifiers ] ) }
+        if listeners is not None:
+            shared = listeners.statistics()
+            stats[ 'shared_objects' ]   = shared[ 'objects' ]
+            stats[ 'shared_notifiers' ] = shared[ 'notifiers' ]
+            stats[ 'memory' ]          += shared[ 'memory' ]
+
+        return stats
+
 #----- Tree event handlers: ----------------------------------------------------
 
     #---------------------------------------------------------------------------
@@ -1313,14 +1786,10 @@ class SimpleEditor ( Editor ):
             # Only add/remove the changes if the node has already been expanded:
             if expanded:
                 # Delete all current child nodes:
-                for cnid in self._nodes_for( nid ):
-                    self._delete_node( cnid )
+                self._delete_children( nid )
 
                 # Add all of the children back in as new nodes:
-                for child in children:
-                    child, child_node = self._node_for( child )
-                    if child_node is not None:
-                        self._append_node( nid, child_node, child )
+                self._append_children( nid, children )
 
             # Try to expand the node (if requested):
             if node.can_auto_open( object ):
@@ -1340,29 +1809,41 @@ class SimpleEditor ( Editor ):
 
         # Get information about the node that was changed:
         start = event.index
-        n     = len( event.added )
-        end   = start + len( event.removed )
-        tree                = self._tree
+        if not isinstance( start, int ):
+            # Extended slice changes can't be applied piecemeal:
+            self._children_replaced( object, name, event )
+            return
 
         for expanded, node, nid in self._object_info_for( object, name ):
-            children = node.get_children( object )
-
-            # If the new children aren't all at the end, remove/add them all:
-            if (n > 0) and ((start + n) != len( children )):
-                self._children_replaced( object, name, event )
-                return
 
             # Only add/remove the changes if the node has already been expanded:
             if expanded:
+                # The position in the list of children is the row in the tree,
+                # unless some children have no node (and so aren't shown):
+                skipped = getattr( nid, '_skipped', 0 )
+                if skipped == 0:
+                    row = start
+                    end = start + len( event.removed )
+                else:
+                    children = node.get_children( object )
+                    row = start - self._count_skipped( children[ :start ] )
+                    removed_skipped = self._count_skipped( event.removed )
+                    end = row + len( event.removed ) - removed_skipped
+                    skipped -= removed_skipped
+
                 # Remove all of the children that were deleted:
-                for cnid in self._nodes_for( nid )[ start: end ]:
-                    self._delete_node( cnid )
+                self._delete_children( nid, row, end )
 
-                # Add all of the children that were added:
+                # Insert all of the children that were added in their place:
+                index = row
                 for child in event.added:
                     child, child_node = self._node_for( child )
                     if child_node is not None:
-                        self._append_node( nid, child_node, child )
+                        self._insert_node( nid, index, child_node, child )
+                        index += 1
+                    else:
+                        skipped += 1
+                nid._skipped = skipped
 
             # Try to expand the node (if requested):
             if node.can_auto_open( object ):
@@ -1382,9 +1863,13 @@ class SimpleEditor ( Editor ):
         for name2, nid in self._map[ id( object ) ]:
             if nid not in nids:
                 nids[ nid ] = None
-                node = self._get_node_data( nid )[1]
-                nid.setText(0, node.get_label(object))
+                node  = self._get_node_data( nid )[1]
+                label = node.get_label(object)
+                nid.setText(0, label)
                 self._update_icon(nid)
+                if self._index is not None:
+                    self._index.add( object, node, label,
+                                     self._parent_object( nid ) )
 
         self._tree.blockSignals(blk)
 
@@ -1421,6 +1906,465 @@ class SimpleEditor ( Editor ):
 
 #-- End UI preference save/restore interface -----------------------------------
 
+#-------------------------------------------------------------------------------
+#  '_TreeIndex' class:
+#-------------------------------------------------------------------------------
+
+class _TreeIndex ( object ):
+    """ An index of the labels of the objects discovered by a tree editor,
+        supporting case insensitive prefix and substring searches. Each object
+        also remembers the parent it was discovered under, so that the path to
+        objects not yet in the tree can be found.
+    """
+
+    def __init__ ( self ):
+        """ Initializes the object.
+        """
+        # Maps the id of each object to ( object, node, key, parent ), where
+        # 'key' is the lower case label:
+        self.entries = {}
+
+        # The sorted list of ( key, id ) for each object, for prefix searches:
+        self.keys = []
+
+        # Maps each three character substring of the keys to the set of the
+        # ids of the objects whose key contains it, for substring searches:
+        self.grams = {}
+
+        # Maps the id of each parent to the set of the ids of the objects
+        # discovered under it:
+        self.children = {}
+
+    #---------------------------------------------------------------------------
+    #  Adds (or updates) an object in the index:
+    #---------------------------------------------------------------------------
+
+    def add ( self, object, node, label, parent ):
+        """ Adds (or updates) an object in the index.
+        """
+        id_object = id( object )
+        key       = unicode( label ).lower()
+        entry     = self.entries.get( id_object )
+        if entry is not None:
+            if (entry[0] is object) and (entry[2] == key):
+                if parent is not None:
+                    self._unlink( id_object, entry[3] )
+                    self._link( id_object, parent )
+                    self.entries[ id_object ] = ( object, node, key, parent )
+                return
+
+            self.remove( entry[0] )
+
+        self.entries[ id_object ] = ( object, node, key, parent )
+        self._link( id_object, parent )
+        insort( self.keys, ( key, id_object ) )
+        for gram in _grams( key ):
+            self.grams.setdefault( gram, set() ).add( id_object )
+
+    #---------------------------------------------------------------------------
+    #  Removes an object from the index:
+    #---------------------------------------------------------------------------
+
+    def remove ( self, object ):
+        """ Removes an object from the index.
+        """
+        if not self.has( object ):
+            return
+
+        id_object = id( object )
+        entry     = self.entries.pop( id_object )
+        key       = entry[2]
+        self._unlink( id_object, entry[3] )
+        self.children.pop( id_object, None )
+        keys      = self.keys
+        i         = bisect_left( keys, ( key, id_object ) )
+        if (i < len( keys )) and (keys[i] == ( key, id_object )):
+            del keys[i]
+
+        for gram in _grams( key ):
+            ids = self.grams.get( gram )
+            if ids is not None:
+                ids.discard( id_object )
+                if len( ids ) == 0:
+                    del self.grams[ gram ]
+
+    #---------------------------------------------------------------------------
+    #  Removes an object and the objects discovered below it from the index:
+    #---------------------------------------------------------------------------
+
+    def remove_subtree ( self, object, keep = None ):
+        """ Removes an object and all of the objects discovered below it from
+            the index, other than those for which **keep** (if given) returns
+            True (along with the objects below them).
+        """
+        entries = self.entries
+        stack   = [ object ]
+        while len( stack ) > 0:
+            object = stack.pop()
+            for id_child in self.children.get( id( object ), () ):
+                child = entries[ id_child ][0]
+                if (keep is None) or (not keep( child )):
+                    stack.append( child )
+
+            self.remove( object )
+
+    #---------------------------------------------------------------------------
+    #  Records (or forgets) the parent an object was discovered under:
+    #---------------------------------------------------------------------------
+
+    def _link ( self, id_object, parent ):
+        if parent is not None:
+            self.children.setdefault( id( parent ), set() ).add( id_object )
+
+    def _unlink ( self, id_object, parent ):
+        if parent is not None:
+            ids = self.children.get( id( parent ) )
+            if ids is not None:
+                ids.discard( id_object )
+                if len( ids ) == 0:
+                    del self.children[ id( parent ) ]
+
+    #---------------------------------------------------------------------------
+    #  Returns whether an object is in the index:
+    #---------------------------------------------------------------------------
+
+    def has ( self, object ):
+        """ Returns whether an object is in the index.
+        """
+        entry = self.entries.get( id( object ) )
+
+        return ((entry is not None) and (entry[0] is object))
+
+    #---------------------------------------------------------------------------
+    #  Returns the objects matching a search string:
+    #---------------------------------------------------------------------------
+
+    def search ( self, text, prefix = False, limit = None ):
+        """ Returns the list of objects whose labels contain (or start with) a
+            specified string, ignoring case, in label order.
+        """
+        text    = unicode( text ).lower()
+        entries = self.entries
+        if prefix:
+            keys = self.keys
+            ids  = []
+            for i in xrange( bisect_left( keys, ( text, ) ), len( keys ) ):
+                key, id_object = keys[i]
+                if (not key.startswith( text )) or \
+                   ((limit is not None) and (len( ids ) >= limit)):
+                    break
+                ids.append( id_object )
+        else:
+            grams = _grams( text )
+            if len( grams ) == 0:
+                # Too short to use the index, so check every label:
+                ids = [ id_object for id_object, entry in entries.iteritems()
+                        if text in entry[2] ]
+            else:
+                sets = [ self.grams.get( gram, () ) for gram in grams ]
+                sets.sort( key = len )
+                ids  = set( sets[0] )
+                for other in sets[1:]:
+                    ids.intersection_update( other )
+                ids = [ id_object for id_object in ids
+                        if text in entries[ id_object ][2] ]
+
+            ids.sort( key = lambda id_object: entries[ id_object ][2] )
+            if limit is not None:
+                ids = ids[ :limit ]
+
+        return [ entries[ id_object ][0] for id_object in ids ]
+
+    #---------------------------------------------------------------------------
+    #  Returns the path to an object:
+    #---------------------------------------------------------------------------
+
+    def path ( self, object ):
+        """ Returns the list of objects from the outermost known ancestor of an
+            object down to the object itself, or an empty list if the object
+            is not in the index.
+        """
+        path = []
+        seen = set()
+        while (object is not None) and self.has( object ) and \
+              (id( object ) not in seen):
+            seen.add( id( object ) )
+            path.append( object )
+            object = self.entries[ id( object ) ][3]
+
+        path.reverse()
+
+        return path
+
+def _grams ( key ):
+    """ Returns the set of three character substrings of a string.
+    """
+    return set( [ key[ i: i + 3 ] for i in xrange( len( key ) - 2 ) ] )
+
+#-------------------------------------------------------------------------------
+#  '_SharedListeners' class:
+#-------------------------------------------------------------------------------
+
+class _SharedListeners ( object ):
+    """ Tracks the children and label traits of the objects displayed by a tree
+        editor using one notifier per class trait, rather than attaching a set
+        of notifiers to every object. Notifications are dispatched to the
+        editor only for the objects registered with the tracker.
+
+        Only objects using a plain TreeNode (i.e. one which does not override
+        the way listeners are attached), whose listened to traits are simple,
+        class defined traits are tracked. All other objects are left to the
+        editor's per-object listeners.
+    """
+
+    # The names of the editor methods handling each kind of notification:
+    handlers = { 'replaced': '_children_replaced',
+                 'changed':  '_children_updated',
+                 'label':    '_label_updated' }
+
+    def __init__ ( self, editor ):
+        """ Initializes the object.
+        """
+        self.editor = editor
+
+        # The thread that notifications must be dispatched on:
+        self.ui_thread = thread.get_ident()
+
+        # Maps the id of each registered object to the object and the list of
+        # notifier keys it is registered with:
+        self.objects = {}
+
+        # Maps ( id( class trait ), name, kind ) to [ notifier, class trait,
+        # number of registered objects ]:
+        self.notifiers = {}
+
+    #---------------------------------------------------------------------------
+    #  Registers an object with the tracker:
+    #---------------------------------------------------------------------------
+
+    def add ( self, node, object ):
+        """ Registers an object displayed using a specified node. Returns
+            whether or not the object can be tracked by shared notifiers.
+        """
+        traits = self._traits_for( node, object )
+        if traits is None:
+            return False
+
+        # Objects displayed by more than one node are tracked for the traits
+        # used by all of them:
+        info = self.objects.get( id( object ) )
+        if (info is not None) and (info[0] is not object):
+            self.remove( info[0] )
+            info = None
+        if info is None:
+            keys = []
+            self.objects[ id( object ) ] = ( object, keys )
+        else:
+            keys = info[1]
+
+        for name, kind, trait in traits:
+            key = ( id( trait ), name, kind )
+            if key in keys:
+                continue
+
+            info = self.notifiers.get( key )
+            if info is None:
+                notifier = _SharedNotifier( self, name, kind, trait )
+                trait._notifiers( 1 ).append( notifier )
+                self.notifiers[ key ] = info = [ notifier, trait, 0 ]
+            info[2] += 1
+            keys.append( key )
+
+        return True
+
+    #---------------------------------------------------------------------------
+    #  Unregisters an object from the tracker:
+    #---------------------------------------------------------------------------
+
+    def remove ( self, object ):
+        """ Unregisters an object. Returns whether or not the object was
+            tracked by shared notifiers.
+        """
+        if not self.has( object ):
+            return False
+
+        for key in self.objects.pop( id( object ) )[1]:
+            info = self.notifiers[ key ]
+            info[2] -= 1
+            if info[2] == 0:
+                self._detach( info )
+                del self.notifiers[ key ]
+
+        return True
+
+    #---------------------------------------------------------------------------
+    #  Returns whether an object is tracked by shared notifiers:
+    #---------------------------------------------------------------------------
+
+    def has ( self, object ):
+        """ Returns whether an object is tracked by shared notifiers.
+        """
+        info = self.objects.get( id( object ) )
+
+        return ((info is not None) and (info[0] is object))
+
+    #---------------------------------------------------------------------------
+    #  Dispatches a notification for a registered object to the editor:
+    #---------------------------------------------------------------------------
+
+    def dispatch ( self, notifier, object, name, new ):
+        """ Dispatches a notification for a registered object to the editor.
+        """
+        info = self.objects.get( id( object ) )
+        if (info is None) or (info[0] is not object):
+            return
+
+        kind = notifier.kind
+        if ( id( notifier.trait ), name, kind ) not in info[1]:
+            return
+
+        handler = getattr( self.editor, self.handlers[ kind ] )
+        if thread.get_ident() == self.ui_thread:
+            handler( object, name, new )
+        else:
+            ui_handler( handler, object, name, new )
+
+    #---------------------------------------------------------------------------
+    #  Returns statistics about the tracker:
+    #---------------------------------------------------------------------------
+
+    def statistics ( self ):
+        """ Returns a dictionary containing the number of tracked 'objects',
+            the number of shared 'notifiers' and the approximate 'memory' used
+            in bytes.
+        """
+        memory = sys.getsizeof( self.objects ) + sys.getsizeof( self.notifiers )
+        for object, keys in self.objects.itervalues():
+            memory += sys.getsizeof( keys )
+        for info in self.notifiers.itervalues():
+            memory += sys.getsizeof( info ) + _sizeof( info[0] )
+
+        return { 'objects':   len( self.objects ),
+                 'notifiers': len( self.notifiers ),
+                 'memory':    memory }
+
+    #---------------------------------------------------------------------------
+    #  Disposes of the tracker:
+    #---------------------------------------------------------------------------
+
+    def dispose ( self ):
+        """ Detaches all shared notifiers and releases all references.
+        """
+        for info in self.notifiers.itervalues():
+            self._detach( info )
+
+        self.objects   = {}
+        self.notifiers = {}
+        self.editor    = None
+
+    #-- Private Methods --------------------------------------------------------
+
+    def _traits_for ( self, node, object ):
+        """ Returns the list of ( name, kind, class trait ) tuples an object
+            needs to be tracked with, or None if it cannot be tracked by shared
+            notifiers.
+        """
+        if not isinstance( object, HasTraits ):
+            return None
+
+        # The node must use the standard TreeNode listener implementations:
+        klass = node.__class__
+        for method in ( 'when_children_replaced', 'when_children_changed',
+                        'when_label_changed' ):
+            if (getattr( getattr( klass, method, None ), 'im_func', None ) is
+                not getattr( TreeNode, method ).im_func):
+                return None
+
+        names = []
+        if node.allows_children( object ):
+            names.append( ( node.children, 'replaced' ) )
+            names.append( ( node.children + '_items', 'changed' ) )
+
+        label = node.label
+        if label[:1] != '=':
+            names.append( ( label, 'label' ) )
+
+        class_traits    = object.__class__.__class_traits__
+        instance_traits = object._instance_traits()
+        result          = []
+        for name, kind in names:
+            # Extended trait names and traits with instance specific copies
+            # (which do not see class trait notifiers) need real listeners:
+            trait = class_traits.get( name )
+            if (trait is None) or (name in instance_traits) or \
+               (not _simple_name( name )):
+                return None
+            result.append( ( name, kind, trait ) )
+
+        return result
+
+    def _detach ( self, info ):
+        """ Detaches a shared notifier from its class trait.
+        """
+        notifier, trait, count = info
+        notifiers = trait._notifiers( 0 )
+        if (notifiers is not None) and (notifier in notifiers):
+            notifiers.remove( notifier )
+
+#-------------------------------------------------------------------------------
+#  '_SharedNotifier' class:
+#-------------------------------------------------------------------------------
+
+class _SharedNotifier ( object ):
+    """ A trait change notifier attached to a class trait, which forwards the
+        notifications for one trait name to a _SharedListeners tracker.
+    """
+
+    def __init__ ( self, listeners, name, kind, trait ):
+        """ Initializes the object.
+        """
+        # Only weakly reference the tracker, since instance traits cloned from
+        # the class trait may hold on to copies of the notifier:
+        self.listeners = weakref.ref( listeners )
+        self.name      = name
+        self.kind      = kind
+        self.trait     = trait
+
+    def __call__ ( self, object, name, old, new ):
+        """ Handles a trait change notification.
+        """
+        listeners = self.listeners()
+        if (name == self.name) and (listeners is not None):
+            try:
+                listeners.dispatch( self, object, name, new )
+            except:
+                logger.exception( 'Error handling a tree node notification' )
+
+    def equals ( self, handler ):
+        """ Returns whether the notifier is for a specified handler.
+        """
+        return (handler is self)
+
+    def dispose ( self ):
+        """ Disposes of the notifier.
+        """
+        pass
+
+def _simple_name ( name ):
+    """ Returns whether a trait name is a simple (i.e. not extended) name.
+    """
+    for c in '.:,[]*+-':
+        if c in name:
+            return False
+    return True
+
+def _sizeof ( object ):
+    """ Returns the approximate size in bytes of a Python object, including
+        its instance dictionary.
+    """
+    return (sys.getsizeof( object ) +
+            sys.getsizeof( getattr( object, '__dict__', None ) ))
+
 #-------------------------------------------------------------------------------
 #  '_TreeWidget' class:
 #-------------------------------------------------------------------------------
@@ -0,0 +1,92 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2010, Enthought Inc
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD license.
+#------------------------------------------------------------------------------
+
+""" Times the tree editor's child bookkeeping on a node with a very large
+number of children.
+
+Run this script directly (with ETS_TOOLKIT=qt4), optionally passing the number
+of children (100000 by default).
+"""
+
+import sys
+import time
+
+from enthought.qt import QtGui
+
+from enthought.traits.api import HasTraits, Instance, List, Str
+from enthought.traits.ui.api import Item, TreeEditor, TreeNode, View
+
+
+class Leaf(HasTraits):
+    name = Str
+
+
+class Branch(HasTraits):
+    name = Str
+    leaves = List(Leaf)
+
+
+class Root(HasTraits):
+    branch = Instance(Branch)
+
+    view = View(
+        Item('branch', show_label=False,
+             editor=TreeEditor(
+                 nodes=[ TreeNode(node_for=[Branch], children='leaves',
+                                  label='name', auto_open=True),
+                         TreeNode(node_for=[Leaf], label='name') ])),
+        resizable=True)
+
+
+def timed(label, func, repeat):
+    start = time.time()
+    for i in xrange(repeat):
+        func(i)
+    elapsed = time.time() - start
+    print '%-30s %8.3f ms per operation' % (label, elapsed * 1000.0 / repeat)
+
+
+def main(count=100000, repeat=200):
+    app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+
+    leaves = [ Leaf(name='leaf %d' % i) for i in xrange(count) ]
+    root = Root(branch=Branch(name='branch', leaves=leaves))
+
+    start = time.time()
+    ui = root.edit_traits()
+    app.processEvents()
+    print '%-30s %8.3f s' % ('Create and expand %d' % count,
+                             time.time() - start)
+
+    branch = root.branch
+    new = [ Leaf(name='new %d' % i) for i in xrange(repeat) ]
+
+    def append(i):
+        branch.leaves.append(new[i])
+    def remove_last(i):
+        del branch.leaves[-1]
+    def insert_front(i):
+        branch.leaves.insert(0, new[i])
+    def remove_front(i):
+        del branch.leaves[0]
+    def replace_middle(i):
+        branch.leaves[count // 2] = new[i]
+
+    timed('Append', append, repeat)
+    timed('Remove last', remove_last, repeat)
+    timed('Insert at front', insert_front, repeat)
+    timed('Remove from front', remove_front, repeat)
+    timed('Replace in middle', replace_middle, repeat)
+
+    ui.dispose()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
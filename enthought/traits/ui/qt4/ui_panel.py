@@ -18,6 +18,7 @@
 
 import cgi
 import re
+import weakref
 
 from enthought.qt import QtCore, QtGui, QtWebKit
 
@@ -59,6 +60,9 @@ from editor \
 # Pattern of all digits
 all_digits = re.compile(r'\d+')
 
+# The compiled templates of the views that have been displayed
+_templates = weakref.WeakKeyDictionary()
+
 
 #-------------------------------------------------------------------------------
 #  Create the different panel-based PyQt user interfaces.
@@ -225,7 +229,7 @@ def panel(ui):
         panel = _GroupPanel(content[0], ui).control
     elif nr_groups > 1:
         panel = QtGui.QTabWidget()
-        _fill_panel(panel, content, ui)
+        _fill_panel(panel, content, ui, deferred=_defer_pages(None, ui))
         panel.ui = ui
 
     # If the UI is scrollable then wrap the panel in a scroll area.
@@ -244,20 +248,28 @@ def panel(ui):
     return panel
 
 
-def _fill_panel(panel, content, ui, item_handler=None):
-    """Fill a page based container panel with content.
+def _fill_panel(panel, content, ui, item_handler=None, deferred=False):
+    """Fill a page based container panel with content.  If 'deferred' is set
+       then only the active page is built now and each of the others is built
+       the first time it is shown.
     """
     active = 0
+    for index, item in enumerate(content):
+        if isinstance(item, Group) and item.selected:
+            active = index
 
     for index, item in enumerate(content):
         page_name = item.get_label(ui)
         if page_name == "":
            page_name = "Page %d" % index
 
-        if isinstance(item, Group):
-            if item.selected:
-                active = index
+        if deferred and index != active:
+            new = QtGui.QWidget()
+            layout = QtGui.QVBoxLayout(new)
+            layout.setMargin(0)
+            new._build_page = _page_builder(item, ui, item_handler)
 
+        elif isinstance(item, Group):
             gp = _GroupPanel(item, ui, suppress_label=True)
             page = gp.control
             sub_page = gp.sub_control
@@ -294,6 +306,75 @@ def _fill_panel(panel, content, ui, item_handler=None):
 
     panel.setCurrentIndex(active)
 
+    if deferred:
+        _DeferredPages(panel, ui)
+
+
+def _defer_pages(group, ui):
+    """Returns whether the pages of a 'tabbed' or 'fold' container should be
+       built lazily.  The 'defer_pages' option is looked for on the group
+       first and then on the view, and is off by default.
+    """
+    deferred = getattr(group, 'defer_pages', None)
+    if deferred is None:
+        deferred = getattr(ui.view, 'defer_pages', False)
+
+    return bool(deferred)
+
+
+def _page_builder(item, ui, item_handler):
+    """Returns a callable that fills the layout of a deferred page with the
+       content of a Group or Item.
+    """
+    def build(layout):
+        if isinstance(item, Group):
+            page = _GroupPanel(item, ui, suppress_label=True).control
+            if isinstance(page, QtGui.QWidget):
+                layout.addWidget(page)
+            elif isinstance(page, QtGui.QLayout):
+                layout.addLayout(page)
+
+            layout.setAlignment(QtCore.Qt.AlignLeft|QtCore.Qt.AlignTop)
+        else:
+            item_handler(item, layout)
+
+    return build
+
+
+class _DeferredPages(QtCore.QObject):
+    """Builds the deferred pages of a QTabWidget or QToolBox the first time
+       each of them becomes the current page.  It is owned by the container so
+       that it goes away with it.
+    """
+
+    def __init__(self, container, ui):
+        """Initialise the object.
+        """
+        QtCore.QObject.__init__(self, container)
+
+        self._ui = ui
+
+        QtCore.QObject.connect(container,
+                QtCore.SIGNAL('currentChanged(int)'), self._build_page)
+
+    def _build_page(self, index):
+        """Builds the page at an index if it hasn't been built already.
+        """
+        page = self.parent().widget(index)
+        build = getattr(page, '_build_page', None)
+        if build is None:
+            return
+
+        del page._build_page
+        build(page.layout())
+
+        # Editors created after the UI has been prepared have missed the
+        # initial evaluation of any 'visible_when' and 'enabled_when'
+        # expressions, so bring them up to date.
+        ui = self._ui
+        if ui.info.initialized:
+            ui._evaluate_when()
+
 
 #-------------------------------------------------------------------------------
 #  Displays a help window for the specified UI's active Group:
@@ -508,7 +589,8 @@ class _GroupPanel(object):
             policy.setVerticalStretch(50)
             sub.setSizePolicy(policy)
 
-            _fill_panel(sub, content, self.ui, self._add_page_item)
+            _fill_panel(sub, content, self.ui, self._add_page_item,
+                        _defer_pages(group, ui))
 
             if outer is None:
                 outer = sub
@@ -620,19 +702,18 @@ class _GroupPanel(object):
         ui = self.ui
         info = ui.info
         handler = ui.handler
+        template = _template_for(ui)
 
         group = self.group
         show_left = group.show_left
         padding = group.padding
-        columns = group.columns
 
-        # See if a label is needed.
-        show_labels = False
-        for item in content:
-            show_labels |= item.show_label
+        # Get the (cached) order and grid positions of the items:
+        show_labels, is_grid, entries = \
+            template.layout_for(group, content, self.direction)
 
         # See if a grid layout is needed.
-        if show_labels or columns > 1:
+        if is_grid:
             inner = QtGui.QGridLayout()
 
             if outer is None:
@@ -640,7 +721,6 @@ class _GroupPanel(object):
             else:
                 outer.addLayout(inner)
 
-            row = 0
             if show_left:
                 label_alignment = QtCore.Qt.AlignRight
             else:
@@ -653,25 +733,13 @@ class _GroupPanel(object):
 
             inner = outer
 
-            row = -1
             label_alignment = 0
 
         # Process each Item in the list:
-        col = -1
-        for item in content:
-
-            # Keep a track of the current logical row and column unless the
-            # layout is not a grid.
-            col += 1
-            if row >= 0 and col >= columns:
-                col = 0
-                row += 1
-
-            # Get the name in order to determine its type:
-            name = item.name
+        for kind, item, row, col, extra in entries:
 
             # Check if is a label:
-            if name == '':
+            if kind == 'label':
                 label = item.label
                 if label != "":
 
@@ -689,25 +757,9 @@ class _GroupPanel(object):
                 # Continue on to the next Item in the list:
                 continue
 
-            # Check if it is a separator:
-            if name == '_':
-                cols = columns
-
-                # See if the layout is a grid.
-                if row >= 0:
-                    # Move to the start of the next row if necessary.
-                    if col > 0:
-                        col = 0
-                        row += 1
-
-                    # Skip the row we are about to do.
-                    row += 1
-
-                    # Allow for the columns.
-                    if show_labels:
-                        cols *= 2
-
-                for i in range(cols):
+            # Check if it is a separator (spanning 'extra' columns):
+            if kind == 'separator':
+                for i in range(extra):
                     line = QtGui.QFrame()
 
                     if self.direction == QtGui.QBoxLayout.LeftToRight:
@@ -730,50 +782,43 @@ class _GroupPanel(object):
                 # Continue on to the next Item in the list:
                 continue
 
-            # Convert a blank to a 5 pixel spacer:
-            if name == ' ':
-                name = '5'
-
-            # Check if it is a spacer:
-            if all_digits.match( name ):
+            # Check if it is a spacer (of 'extra' pixels):
+            if kind == 'spacer':
 
                 # If so, add the appropriate amount of space to the layout:
-                n = int( name )
                 if self.direction == QtGui.QBoxLayout.LeftToRight:
                     # Add a horizontal spacer:
-                    spacer = QtGui.QSpacerItem(n, 1)
+                    spacer = QtGui.QSpacerItem(extra, 1)
                 else:
                     # Add a vertical spacer:
-                    spacer = QtGui.QSpacerItem(1, n)
+                    spacer = QtGui.QSpacerItem(1, extra)
 
                 self._add_widget(inner, spacer, row, col, show_labels)
 
                 # Continue on to the next Item in the list:
                 continue
 
+            name = item.name
+
             # Otherwise, it must be a trait Item:
-            object      = eval( item.object_, globals(), ui.context )
-            trait       = object.base_trait( name )
+            object      = template.object_for( item, ui.context )
+            trait, editor_factory, item_label, item_help = \
+                template.item_for( item, object, ui )
             desc        = trait.desc or ''
             fixed_width = False
 
             # Handle any label.
             if item.show_label:
-                label = self._create_label(item, ui, desc)
+                label = self._create_label(item, ui, desc, label=item_label,
+                                           help=item_help)
                 self._add_widget(inner, label, row, col, show_labels,
                                  label_alignment)
             else:
                 label = None
 
-            # Get the editor factory associated with the Item:
-            editor_factory = item.editor
-            if editor_factory is None:
-                editor_factory = trait.get_editor()
-
-                # If still no editor factory found, use a default text editor:
-                if editor_factory is None:
-                    from text_editor import ToolkitEditorFactory
-                    editor_factory = ToolkitEditorFactory()
+            # The editor factory associated with the Item has already been
+            # found by the template:
+            if item.editor is None:
 
                 # If the item has formatting traits set them in the editor
                 # factory:
@@ -858,10 +903,14 @@ class _GroupPanel(object):
 
             # If the handler wants to be notified when the editor is created,
             # add it to the list of methods to be called when the UI is
-            # complete:
+            # complete (or call it now if this is a deferred page being built
+            # after the UI has been completed):
             defined = getattr( handler, id + '_defined', None )
             if defined is not None:
-                ui.add_defined( defined )
+                if info.initialized:
+                    defined( info )
+                else:
+                    ui.add_defined( defined )
 
             # If the editor is conditionally visible, add the visibility
             # 'expression' and the editor to the UI object's list of monitored
@@ -947,10 +996,13 @@ class _GroupPanel(object):
             else:
                 layout.addItem(w, row, column, 1, 1, label_alignment)
 
-    def _create_label(self, item, ui, desc, suffix = ':'):
-        """Creates an item label.
+    def _create_label(self, item, ui, desc, suffix = ':', label = None,
+                      help = None):
+        """Creates an item label.  The label text and help are found from the
+           item unless they are given.
         """
-        label = item.get_label(ui)
+        if label is None:
+            label = item.get_label(ui)
         if (label == '') or (label[-1:] in '?=:;,.<>/\\"\'-+#|'):
             suffix = ''
 
@@ -962,7 +1014,10 @@ class _GroupPanel(object):
         # FIXME: Decide what to do about the help.  (The non-standard wx way,
         # What's This style help, both?)
         #wx.EVT_LEFT_UP( control, show_help_popup )
-        control.help = item.get_help(ui)
+        if help is None:
+            help = item.get_help(ui)
+
+        control.help = help
 
         if desc != '':
             control.setToolTip('Specifies ' + desc)
@@ -984,6 +1039,182 @@ class _GroupPanel(object):
         control.setFont(font)
 
 
+#-------------------------------------------------------------------------------
+#  Compiled view templates:
+#-------------------------------------------------------------------------------
+
+def _template_for(ui):
+    """Returns the compiled template of the View displayed by a UI object,
+       creating it the first time the View is used.
+    """
+    view = ui.view
+    template = _templates.get(view)
+    if template is None:
+        template = _templates[view] = _ViewTemplate()
+
+    return template
+
+
+class _ViewTemplate(object):
+    """The resolved layout plan of a View.  It records everything about the
+       View's items that depends only on the View itself and the classes of
+       the objects being edited (compiled object expressions, editor
+       factories, labels and help), so that displaying the View again only
+       has to create and bind the editors.
+    """
+
+    def __init__(self):
+        """Initialise the object.
+        """
+        # The compiled 'object' expressions of the items, keyed by source.
+        self._code = {}
+
+        # The plans of the items, keyed by (item, class of edited object).
+        self._items = {}
+
+        # The layout plans of lists of items, keyed by the items (with their
+        # names and whether they show labels), the number of columns and the
+        # direction of the group.
+        self._layouts = {}
+
+    def object_for(self, item, context):
+        """Returns the object edited by an item in a given context.
+        """
+        source = item.object_
+        code = self._code.get(source)
+        if code is None:
+            code = self._code[source] = compile(source, '<string>', 'eval')
+
+        return eval(code, globals(), context)
+
+    def item_for(self, item, object, ui):
+        """Returns a tuple of the trait, the editor factory, the label text
+           and the help text of an item editing a given object.
+        """
+        name = item.name
+        trait = object.base_trait(name)
+        key = (item, object.__class__)
+        signature = (trait, item.editor, item.label, item.help)
+
+        plan = self._items.get(key)
+        if plan is not None and plan[0] == signature:
+            return plan[1]
+
+        # Get the editor factory associated with the Item:
+        editor_factory = item.editor
+        if editor_factory is None:
+            editor_factory = trait.get_editor()
+
+            # If still no editor factory found, use a default text editor:
+            if editor_factory is None:
+                from text_editor import ToolkitEditorFactory
+                editor_factory = ToolkitEditorFactory()
+
+        # A trait may compute its label from the object, in which case the
+        # label must be found each time the item is displayed.
+        label = None
+        if not callable(trait.label):
+            label = item.get_label(ui)
+
+        result = (trait, editor_factory, label, item.get_help(ui))
+
+        # Only remember the plan if the trait is the one defined by the class
+        # rather than one that was added to this particular object.
+        klass = object.__class__
+        if ((klass.__class_traits__.get(name) is trait) or
+            (klass.__base_traits__.get(name) is trait)):
+            self._items[key] = (signature, result)
+
+        return result
+
+    def layout_for(self, group, content, direction):
+        """Returns the layout plan of a list of items in a group, as a tuple
+           of whether any item has a label, whether a grid is needed, and a
+           list of the (kind, item, row, column, extra) of each item.  'kind'
+           is one of 'label', 'separator' (spanning 'extra' columns), 'spacer'
+           (of 'extra' pixels) or 'trait'.  'row' is -1 if there is no grid.
+        """
+        columns = group.columns
+        key = (tuple([ (item, item.name, item.show_label)
+                       for item in content ]),
+               columns, direction)
+        plan = self._layouts.get(key)
+        if plan is None:
+            plan = self._layouts[key] = _layout_plan(content, columns)
+
+        return plan
+
+
+def _layout_plan(content, columns):
+    """Works out the layout plan of a list of items (see
+       '_ViewTemplate.layout_for').
+    """
+    # See if a label is needed.
+    show_labels = False
+    for item in content:
+        show_labels |= item.show_label
+
+    # See if a grid layout is needed.
+    is_grid = show_labels or columns > 1
+    if is_grid:
+        row = 0
+    else:
+        row = -1
+
+    entries = []
+    col = -1
+    for item in content:
+
+        # Keep a track of the current logical row and column unless the
+        # layout is not a grid.
+        col += 1
+        if row >= 0 and col >= columns:
+            col = 0
+            row += 1
+
+        name = item.name
+
+        # Check if is a label:
+        if name == '':
+            entries.append(('label', item, row, col, None))
+            continue
+
+        # Check if it is a separator:
+        if name == '_':
+            cols = columns
+
+            # See if the layout is a grid.
+            if row >= 0:
+                # Move to the start of the next row if necessary.
+                if col > 0:
+                    col = 0
+                    row += 1
+
+                # Skip the row we are about to do.
+                row += 1
+
+                # Allow for the columns.
+                if show_labels:
+                    cols *= 2
+
+            entries.append(('separator', item, row, col, cols))
+            continue
+
+        # Convert a blank to a 5 pixel spacer:
+        if name == ' ':
+            name = '5'
+
+        # Check if it is a spacer:
+        if all_digits.match(name):
+            entries.append(('spacer', item, row, col, int(name)))
+            continue
+
+        # Otherwise, it must be a trait Item:
+        entries.append(('trait', item, row, col, None))
+
+    return (show_labels, is_grid, entries)
+
+
 class GroupEditor(Editor):
     """ A pseudo-editor that allows a group to be managed.
     """
@@ -0,0 +1,66 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2010, Enthought Inc
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD license.
+#------------------------------------------------------------------------------
+
+""" Times the repeated construction of the same View, which reuses the layout
+plans cached by the panel builder after the first one.
+
+Run this script directly (with ETS_TOOLKIT=qt4), optionally passing the number
+of items in the view (200 by default).
+"""
+
+import sys
+import time
+
+from enthought.qt import QtGui
+
+from enthought.traits.api import HasTraits, Int
+from enthought.traits.ui.api import Item, View, VGroup
+
+
+def make_class(count):
+    traits = dict([ ('value%d' % i, Int(i)) for i in xrange(count) ])
+    items = [ Item('value%d' % i) for i in xrange(count) ]
+    traits['view'] = View(VGroup(*items), resizable=True)
+
+    return type('Many', (HasTraits,), traits)
+
+
+def main(count=200, repeat=20):
+    app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv)
+
+    Many = make_class(count)
+    many = Many()
+
+    start = time.time()
+    many.edit_traits().dispose()
+    app.processEvents()
+    print '%-30s %8.3f ms' % ('First construction',
+                              (time.time() - start) * 1000.0)
+
+    start = time.time()
+    for i in xrange(repeat):
+        ui = many.edit_traits()
+        app.processEvents()
+        ui.dispose()
+    elapsed = time.time() - start
+    print '%-30s %8.3f ms per view' % ('Repeated construction',
+                                       elapsed * 1000.0 / repeat)
+
+    start = time.time()
+    for i in xrange(repeat):
+        Many().edit_traits().dispose()
+        app.processEvents()
+    elapsed = time.time() - start
+    print '%-30s %8.3f ms per view' % ('New object each time',
+                                       elapsed * 1000.0 / repeat)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()